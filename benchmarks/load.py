@@ -0,0 +1,247 @@
+"""
+Drives the client against the mock server at rising concurrency, and reports the throughput,
+latency, CPU time and memory of each level. Each level runs in its own process, so its peak RSS
+is not inflated by the levels before it.
+
+    python -m benchmarks.load --workload mixed --concurrency 1,8,32,128 --requests 2000 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from mal import Client
+from benchmarks.mock_server import CATALOG_SIZE
+
+WORKLOADS = {
+    "details": {"details": 1},
+    "search": {"search": 1},
+    "list": {"list": 1},
+    "user": {"user": 1},
+    "update": {"update": 1},
+    # Mostly catalog lookups, like an app rendering anime pages
+    "mixed": {"details": 70, "search": 15, "list": 10, "user": 4, "update": 1},
+}
+
+
+def _operations(client: Client, rnd: random.Random) -> dict[str, Callable]:
+    return {
+        "details": lambda: client.get_anime_details(
+            anime_id=str(rnd.randint(1, CATALOG_SIZE))
+        ),
+        "search": lambda: client.search_anime(
+            query=f"query {rnd.randint(1, 1000)}", limit=100
+        ),
+        "list": lambda: client.get_user_anime_list(
+            token="bench-token", limit=100, status=None
+        ),
+        "user": lambda: client.get_user_details(token="bench-token"),
+        "update": lambda: client.update_watch_status(
+            anime_id=str(rnd.randint(1, CATALOG_SIZE)),
+            episode=rnd.randint(1, 24),
+            token="bench-token",
+        ),
+    }
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    index = round(percentile / 100 * (len(values) - 1))
+    return values[max(0, min(index, len(values) - 1))]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+async def run_level(
+    base_url: str,
+    *,
+    workload: str,
+    concurrency: int,
+    requests: int,
+    seed: int,
+    client_options: dict,
+) -> dict:
+    """
+    Send `requests` calls from `concurrency` concurrent workers through a fresh client.
+    The reported peak RSS is the whole process's, use run_level_process to measure one level.
+    :return: The level's results
+    """
+    rnd = random.Random(seed)
+    weights = WORKLOADS[workload]
+    kinds = rnd.choices(list(weights), weights=list(weights.values()), k=requests)
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async with Client(
+        client_id="bench", base_url=base_url, auth_url=base_url, **client_options
+    ) as client:
+        operations = _operations(client, rnd)
+        queue = iter(kinds)
+
+        async def worker():
+            for kind in queue:
+                started = time.perf_counter()
+                try:
+                    await operations[kind]()
+                except Exception as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                latencies.append(time.perf_counter() - started)
+
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": requests / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "cpu_us_per_request": cpu / requests * 1e6,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """
+    Run the mock server in its own process, so that its CPU time is not counted as the client's
+    """
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.mock_server",
+        "--port=0",
+        f"--latency={args.latency}",
+        f"--jitter={args.jitter}",
+        f"--rate-limit-ratio={args.rate_limit_ratio}",
+        f"--error-ratio={args.error_ratio}",
+        f"--seed={args.seed}",
+    ]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        command, cwd=root, stdout=subprocess.PIPE, text=True, env=os.environ.copy()
+    )
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("The mock server failed to start")
+    return process, base_url
+
+
+def run_level_process(
+    base_url: str, args: argparse.Namespace, concurrency: int
+) -> dict:
+    """
+    Run a level in a new interpreter, so that its peak RSS only covers this level
+    :return: The level's results
+    """
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.load",
+        f"--base-url={base_url}",
+        f"--level={concurrency}",
+        f"--workload={args.workload}",
+        f"--requests={args.requests}",
+        f"--seed={args.seed}",
+    ]
+    if args.no_coalesce:
+        command.append("--no-coalesce")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        command, cwd=root, stdout=subprocess.PIPE, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def _print_header():
+    print(
+        f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'cpu us/req':>10} {'peak rss MB':>11}  errors"
+    )
+
+
+def _print_row(result: dict):
+    rss = result["peak_rss_mb"]
+    print(
+        f"{result['concurrency']:>11} {result['requests_per_second']:>9.1f} "
+        f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+        f"{result['cpu_us_per_request']:>10.1f} "
+        f"{'n/a' if rss is None else round(rss, 1):>11}  {result['errors'] or ''}",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workload", choices=WORKLOADS, default="mixed")
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--error-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-coalesce", action="store_true", help="disable request coalescing"
+    )
+    parser.add_argument("--json", metavar="PATH", help="also write the results here")
+    # Used by run_level_process to run a single level against a running server
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.level is not None:
+        result = asyncio.run(
+            run_level(
+                args.base_url,
+                workload=args.workload,
+                concurrency=args.level,
+                requests=args.requests,
+                seed=args.seed,
+                client_options={"coalesce_requests": not args.no_coalesce},
+            )
+        )
+        print(json.dumps(result))
+        return
+
+    process, base_url = _start_server(args)
+    try:
+        results = []
+        _print_header()
+        for concurrency in map(int, args.concurrency.split(",")):
+            results.append(run_level_process(base_url, args, concurrency))
+            _print_row(results[-1])
+    finally:
+        process.terminate()
+        process.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Micro-benchmarks of decoding responses and of building and reading models.
+
+    python -m benchmarks.micro --filter anime
+"""
+
+import argparse
+import json
+import timeit
+from typing import Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from mal.fields import ANIME_FIELDS
+from mal.models import Anime, WatchStatus
+from mal.records import record_factory
+from benchmarks.payloads import anime_payload, list_status_payload
+
+ANIME_PROPERTIES = [
+    name
+    for name, value in vars(Anime).items()
+    if isinstance(value, property) and name != "fields"
+]
+WATCH_STATUS_PROPERTIES = [
+    name for name, value in vars(WatchStatus).items() if isinstance(value, property)
+]
+
+
+def _read_all(model, properties: list[str]):
+    for name in properties:
+        getattr(model, name)
+
+
+def _benchmarks() -> dict[str, Callable[[], object]]:
+    payload = anime_payload(5114)
+    body = json.dumps(payload).encode()
+    page = json.dumps(
+        {"data": [{"node": anime_payload(i)} for i in range(1, 101)]}
+    ).encode()
+    nodes = [entry["node"] for entry in json.loads(page)["data"]]
+    list_status = list_status_payload(5114)
+
+    anime = Anime(payload, fields=ANIME_FIELDS)
+    _read_all(anime, ANIME_PROPERTIES)
+    watch_status = WatchStatus(list_status, anime_id="5114")
+    _read_all(watch_status, WATCH_STATUS_PROPERTIES)
+    make_record = record_factory(ANIME_FIELDS)
+
+    benchmarks = {
+        "decode anime (json)": lambda: json.loads(body),
+        "decode page of 100 anime (json)": lambda: json.loads(page),
+        "Anime()": lambda: Anime(payload),
+        "Anime(fields=...)": lambda: Anime(payload, fields=ANIME_FIELDS),
+        "Anime() x100 from a page": lambda: [
+            Anime(node, fields=ANIME_FIELDS) for node in nodes
+        ],
+        "anime record": lambda: make_record(payload),
+        "Anime every property, first access": lambda: _read_all(
+            Anime(payload, fields=ANIME_FIELDS), ANIME_PROPERTIES
+        ),
+        "Anime every property, cached": lambda: _read_all(anime, ANIME_PROPERTIES),
+        "Anime.title.canonical": lambda: anime.title.canonical,
+        "Anime.mean": lambda: anime.mean,
+        "WatchStatus()": lambda: WatchStatus(list_status, anime_id="5114"),
+        "WatchStatus every property, first access": lambda: _read_all(
+            WatchStatus(list_status, anime_id="5114"), WATCH_STATUS_PROPERTIES
+        ),
+        "WatchStatus every property, cached": lambda: _read_all(
+            watch_status, WATCH_STATUS_PROPERTIES
+        ),
+    }
+    if orjson is not None:
+        benchmarks["decode anime (orjson)"] = lambda: orjson.loads(body)
+        benchmarks["decode page of 100 anime (orjson)"] = lambda: orjson.loads(page)
+    return benchmarks
+
+
+def run(
+    name_filter: Optional[str] = None, min_time: float = 0.2, repeat: int = 5
+) -> dict[str, float]:
+    """
+    :param name_filter: Only run the benchmarks whose name contains this, case-insensitively
+    :param min_time: The min number of seconds each timing run lasts
+    :param repeat: The number of timing runs, the fastest one is kept
+    :return: Nanoseconds per call of every benchmark run
+    """
+    results = {}
+    for name, func in _benchmarks().items():
+        if name_filter and name_filter.lower() not in name.lower():
+            continue
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        number = max(1, int(number * min_time / 0.2))
+        best = min(timer.repeat(repeat=repeat, number=number))
+        results[name] = best / number * 1e9
+        print(f"{name:<45} {results[name]:>14,.0f} ns", flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="also write the results here")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.min_time, args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
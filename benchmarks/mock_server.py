@@ -0,0 +1,217 @@
+"""
+A local server emulating the MyAnimeList API endpoints used by the client, with configurable
+latency, jitter and fault injection.
+
+    python -m benchmarks.mock_server --port 8765 --latency 0.05 --jitter 0.02 --rate-limit-ratio 0.01
+"""
+
+import argparse
+import asyncio
+from functools import lru_cache
+import json
+import random
+import socket
+from typing import Optional
+import zlib
+
+from aiohttp import web
+
+from benchmarks.payloads import (
+    anime_payload,
+    list_status_payload,
+    token_payload,
+    user_payload,
+)
+
+CATALOG_SIZE = 20000
+LIST_SIZE = 300
+SEARCH_RESULTS = 200
+
+
+@lru_cache(maxsize=8192)
+def _anime_body(anime_id: int, fields: str) -> bytes:
+    return json.dumps(
+        anime_payload(anime_id, fields.split(",") if fields else None)
+    ).encode()
+
+
+class MockServer:
+    """
+    Serves `/v1/anime`, `/v1/anime/{id}`, `/v1/anime/{id}/my_list_status`, `/v1/users/@me`,
+    `/v1/users/@me/animelist` and `/v1/oauth2/token`.
+    Every response is delayed by `latency` seconds plus up to `jitter` seconds, and a share of
+    requests fail with a 429 or a 5xx response.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        error_ratio: float = 0.0,
+        retry_after: float = 0.0,
+        list_size: int = LIST_SIZE,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param latency: Seconds every response is delayed by
+        :param jitter: The max number of seconds added to the latency, drawn uniformly
+        :param rate_limit_ratio: The share of requests answered with 429
+        :param error_ratio: The share of requests answered with 500 or 503
+        :param retry_after: The Retry-After of 429 responses, in seconds
+        :param list_size: The number of anime on the user's list
+        :param seed: Seeds the latency and fault draws
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.error_ratio = error_ratio
+        self.retry_after = retry_after
+        self.list_size = list_size
+        self.requests = 0
+        self.faults = 0
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._emulate])
+        app.router.add_get("/v1/anime", self._search)
+        app.router.add_get("/v1/anime/{anime_id}", self._details)
+        app.router.add_put("/v1/anime/{anime_id}/my_list_status", self._update)
+        app.router.add_get("/v1/users/@me", self._user)
+        app.router.add_get("/v1/users/@me/animelist", self._anime_list)
+        app.router.add_post("/v1/oauth2/token", self._token)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        :param host: The interface to listen on
+        :param port: The port to listen on, any free port when 0
+        :return: The base URL to pass to the client, e.g. http://127.0.0.1:8765/v1
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock, backlog=1024).start()
+        host, port = sock.getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _emulate(self, request: web.Request, handler):
+        self.requests += 1
+        delay = self.latency + self._random.random() * self.jitter
+        if delay:
+            await asyncio.sleep(delay)
+
+        draw = self._random.random()
+        if draw < self.rate_limit_ratio:
+            self.faults += 1
+            return web.json_response(
+                {"error": "too_many_requests"},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if draw < self.rate_limit_ratio + self.error_ratio:
+            self.faults += 1
+            return web.Response(
+                text="<html>Internal Error</html>",
+                status=self._random.choice((500, 503)),
+                content_type="text/html",
+            )
+        return await handler(request)
+
+    async def _details(self, request: web.Request) -> web.Response:
+        try:
+            anime_id = int(request.match_info["anime_id"])
+        except ValueError:
+            return web.json_response({"error": "invalid_parameters"}, status=400)
+        if not 0 < anime_id <= CATALOG_SIZE:
+            return web.json_response({"error": "not_found"}, status=404)
+        body = _anime_body(anime_id, request.query.get("fields", ""))
+        return web.Response(body=body, content_type="application/json")
+
+    async def _search(self, request: web.Request) -> web.Response:
+        return self._page(
+            request, SEARCH_RESULTS, first_id=zlib.crc32(request.query["q"].encode())
+        )
+
+    async def _anime_list(self, request: web.Request) -> web.Response:
+        return self._page(request, self.list_size, first_id=1)
+
+    def _page(self, request: web.Request, total: int, first_id: int) -> web.Response:
+        limit = int(request.query.get("limit", 100))
+        offset = int(request.query.get("offset", 0))
+        fields = request.query.get("fields", "")
+        # Spliced from the cached bodies of each anime, so the server's CPU is not the bottleneck
+        nodes = b",".join(
+            b'{"node":%s}' % _anime_body((first_id + i) % CATALOG_SIZE + 1, fields)
+            for i in range(offset, min(offset + limit, total))
+        )
+        paging = {}
+        if offset + limit < total:
+            paging["next"] = str(request.url.update_query(offset=offset + limit))
+        body = b'{"data":[%s],"paging":%s}' % (nodes, json.dumps(paging).encode())
+        return web.Response(body=body, content_type="application/json")
+
+    async def _update(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        status = list_status_payload(int(request.match_info["anime_id"]))
+        status.update(
+            status=form.get("status", status["status"]),
+            num_episodes_watched=int(form.get("num_watched_episodes", 0)),
+        )
+        return web.json_response(status)
+
+    async def _user(self, request: web.Request) -> web.Response:
+        return web.json_response(user_payload())
+
+    async def _token(self, request: web.Request) -> web.Response:
+        return web.json_response(token_payload())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--error-ratio", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = MockServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_ratio=args.rate_limit_ratio,
+        error_ratio=args.error_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+    async def serve():
+        url = await server.start(args.host, args.port)
+        # Read by the load runner to find the server
+        print(url, flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
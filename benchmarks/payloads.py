@@ -0,0 +1,181 @@
+"""
+Deterministic payloads shaped like the MyAnimeList API's, with every field populated.
+The same ID always produces the same payload, so runs are comparable.
+"""
+
+from datetime import date, timedelta
+import random
+from typing import Iterable, Optional
+
+from mal.fields import ANIME_FIELDS, DEFAULT_FIELDS
+
+GENRES = [
+    "Action",
+    "Adventure",
+    "Comedy",
+    "Drama",
+    "Fantasy",
+    "Mystery",
+    "Romance",
+    "Sci-Fi",
+    "Slice of Life",
+    "Sports",
+    "Supernatural",
+    "Suspense",
+]
+STUDIOS = ["Bones", "Madhouse", "MAPPA", "Production I.G", "Sunrise", "Wit Studio"]
+WORDS = (
+    "the a of to and in is was his her that with for on as by young world "
+    "power journey city school friends war secret past future battle dream "
+    "family destiny hero demon spirit ancient kingdom memory promise"
+).split()
+MEDIA_TYPES = ["tv", "movie", "ova", "ona", "special"]
+SOURCES = ["manga", "light_novel", "original", "web_manga", "novel", "game"]
+RATINGS = ["g", "pg", "pg_13", "r", "r+"]
+SEASONS = ["winter", "spring", "summer", "fall"]
+LIST_STATUSES = ["watching", "completed", "on_hold", "dropped", "plan_to_watch"]
+RELATION_TYPES = ["sequel", "prequel", "side_story", "alternative_version"]
+
+
+def _sentence(rnd: random.Random, words: int) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _picture(anime_id: int, n: int = 0) -> dict:
+    base = f"https://cdn.myanimelist.net/images/anime/{anime_id % 13}/{anime_id}{n}"
+    return {"medium": f"{base}.jpg", "large": f"{base}l.jpg"}
+
+
+def _title(anime_id: int) -> str:
+    rnd = random.Random(anime_id * 7919)
+    return " ".join(rnd.choice(WORDS).capitalize() for _ in range(rnd.randint(2, 5)))
+
+
+def _node(anime_id: int) -> dict:
+    return {
+        "id": anime_id,
+        "title": _title(anime_id),
+        "main_picture": _picture(anime_id),
+    }
+
+
+def list_status_payload(anime_id: int) -> dict:
+    rnd = random.Random(anime_id * 31)
+    start = date(2015, 1, 1) + timedelta(days=rnd.randint(0, 3000))
+    return {
+        "status": rnd.choice(LIST_STATUSES),
+        "score": rnd.randint(0, 10),
+        "num_episodes_watched": rnd.randint(0, 24),
+        "is_rewatching": False,
+        "start_date": start.isoformat(),
+        "finish_date": (start + timedelta(days=rnd.randint(10, 200))).isoformat(),
+        "updated_at": f"{start.isoformat()}T12:{anime_id % 60:02d}:00+00:00",
+        "num_times_rewatched": 0,
+        "rewatch_value": 0,
+        "tags": [],
+        "comments": "",
+    }
+
+
+def anime_payload(anime_id: int, fields: Optional[Iterable[str]] = None) -> dict:
+    """
+    :param anime_id: The ID of the anime
+    :param fields: The requested fields, every field when None
+    :return: The anime's payload, holding only the requested fields like the API's
+    """
+    rnd = random.Random(anime_id)
+    start = date(1990, 1, 1) + timedelta(days=rnd.randint(0, 12000))
+    data = {
+        **_node(anime_id),
+        "alternative_titles": {
+            "synonyms": [_title(anime_id + 1_000_000)],
+            "en": _title(anime_id + 2_000_000),
+            "ja": "アニメ" * rnd.randint(1, 4),
+        },
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(weeks=rnd.randint(1, 52))).isoformat(),
+        "synopsis": " ".join(_sentence(rnd, rnd.randint(8, 20)) for _ in range(10)),
+        "mean": round(rnd.uniform(5.0, 9.2), 2),
+        "rank": rnd.randint(1, 20000),
+        "popularity": rnd.randint(1, 20000),
+        "num_list_users": rnd.randint(100, 3_500_000),
+        "num_scoring_users": rnd.randint(100, 2_500_000),
+        "nsfw": "white",
+        "genres": [
+            {"id": GENRES.index(genre) + 1, "name": genre}
+            for genre in rnd.sample(GENRES, rnd.randint(2, 5))
+        ],
+        "created_at": "2008-01-01T00:00:00+00:00",
+        "updated_at": f"2024-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}T10:00:00+00:00",
+        "media_type": rnd.choice(MEDIA_TYPES),
+        "status": "finished_airing",
+        "my_list_status": list_status_payload(anime_id),
+        "num_episodes": rnd.randint(1, 64),
+        "start_season": {"year": start.year, "season": SEASONS[start.month % 4]},
+        "broadcast": {"day_of_the_week": "saturday", "start_time": "01:23"},
+        "source": rnd.choice(SOURCES),
+        "average_episode_duration": rnd.randint(300, 1500),
+        "rating": rnd.choice(RATINGS),
+        "pictures": [_picture(anime_id, n) for n in range(1, 6)],
+        "background": _sentence(rnd, 40),
+        "related_anime": [
+            {
+                "node": _node(related_id),
+                "relation_type": relation_type,
+                "relation_type_formatted": relation_type.replace("_", " ").title(),
+            }
+            for related_id, relation_type in zip(
+                (anime_id + 1, anime_id + 2, anime_id + 3), RELATION_TYPES
+            )
+        ],
+        "related_manga": [],
+        "recommendations": [
+            {"node": _node(rnd.randint(1, 50000)), "num_recommendations": n}
+            for n in range(10, 0, -1)
+        ],
+        "statistics": {
+            "status": {
+                "watching": str(rnd.randint(0, 100000)),
+                "completed": str(rnd.randint(0, 2000000)),
+                "on_hold": str(rnd.randint(0, 50000)),
+                "dropped": str(rnd.randint(0, 50000)),
+                "plan_to_watch": str(rnd.randint(0, 500000)),
+            },
+            "num_list_users": rnd.randint(100, 3_500_000),
+        },
+        "studios": [{"id": 1, "name": rnd.choice(STUDIOS)}],
+    }
+    if fields is None:
+        return data
+
+    wanted = {*DEFAULT_FIELDS, *fields}
+    return {field: data[field] for field in ANIME_FIELDS if field in wanted}
+
+
+def user_payload() -> dict:
+    return {
+        "id": 1,
+        "name": "bench_user",
+        "picture": "https://cdn.myanimelist.net/images/userimages/1.jpg",
+        "gender": "female",
+        "birthday": "1995-04-01",
+        "location": "Tokyo",
+        "joined_at": "2012-03-04T05:06:07+00:00",
+        "anime_statistics": {
+            "num_items_watching": 12,
+            "num_items_completed": 340,
+            "num_days": 123.4,
+            "mean_score": 7.8,
+        },
+        "time_zone": "Asia/Tokyo",
+        "is_supporter": False,
+    }
+
+
+def token_payload() -> dict:
+    return {
+        "token_type": "Bearer",
+        "expires_in": 2_678_400,
+        "access_token": "bench-access-" + "a" * 600,
+        "refresh_token": "bench-refresh-" + "r" * 600,
+    }
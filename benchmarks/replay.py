@@ -0,0 +1,138 @@
+"""
+Replays the traffic of a recording through a client served by a ReplayTransport, with no
+network, and reports how much of it the cache and request coalescing absorb.
+
+    python -m benchmarks.replay capture.jsonl.gz --speed 10 --cache-size 4096
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from mal import Client, MemoryCache, ReplayTransport, load_exchanges
+from mal.replay import Exchange
+
+ANIME_DETAILS_PATH = re.compile(r"/anime/\d+$")
+
+
+def endpoint(url: str) -> Optional[str]:
+    """
+    :param url: The URL of a recorded GET request
+    :return: The client method that sends it, None if unknown
+    """
+    path = urlsplit(url).path
+    if path.endswith("/users/@me/animelist"):
+        return "get_user_anime_list"
+    if path.endswith("/users/@me"):
+        return "get_user_details"
+    if ANIME_DETAILS_PATH.search(path):
+        return "get_anime_details"
+    if path.endswith("/anime"):
+        return "search_anime"
+    return None
+
+
+def _token(exchange: Exchange) -> Optional[str]:
+    # The recording holds a digest of the header rather than the token. Sent as the token, it
+    # still identifies the user, which is all caching and fairness need, and ReplayTransport
+    # matches it to that user's exchanges
+    return exchange.headers.get("Authorization") or None
+
+
+async def replay(
+    path: str, *, speed: Optional[float], cache_size: int, coalesce: bool
+) -> dict:
+    exchanges = load_exchanges(path)
+    transport = ReplayTransport(exchanges, speed=speed)
+    cache = MemoryCache(max_size=cache_size) if cache_size else None
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async with Client(
+        client_id="replay",
+        transport=transport,
+        cache=cache,
+        coalesce_requests=coalesce,
+        retry_policy=None,
+    ) as client:
+
+        async def send(exchange: Exchange):
+            started = time.perf_counter()
+            try:
+                if exchange.method == "GET":
+                    await client._cached_get(
+                        endpoint(exchange.url) or "other",
+                        exchange.url,
+                        token=_token(exchange),
+                    )
+                else:
+                    await client._request(
+                        exchange.method,
+                        exchange.url,
+                        data=exchange.data,
+                        token=_token(exchange),
+                    )
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+        tasks = []
+        started = time.perf_counter()
+        for exchange in exchanges:
+            # Keep the recorded arrival times, compressed by the same factor as latencies
+            if speed is not None:
+                delay = exchange.offset / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(exchange)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        coalesced = client._inflight.coalesced if client._inflight else 0
+
+    latencies.sort()
+    return {
+        "requests": len(exchanges),
+        "sent_upstream": transport.replayed,
+        "cache_hit_rate": cache.stats.hit_rate if cache else 0.0,
+        "coalesced": coalesced,
+        "errors": errors,
+        "seconds": elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="a recording made by RecordingTransport")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="replay this many times faster than recorded, 0 for no delays",
+    )
+    parser.add_argument("--cache-size", type=int, default=0)
+    parser.add_argument("--no-coalesce", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        replay(
+            args.path,
+            speed=args.speed or None,
+            cache_size=args.cache_size,
+            coalesce=not args.no_coalesce,
+        )
+    )
+    for name, value in results.items():
+        print(
+            f"{name:<16} {value:.3f}"
+            if isinstance(value, float)
+            else f"{name:<16} {value}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,60 @@ __copyright__ = "Copyright 2026-present SageTendo"
 
 __all__ = (
     "Client",
+    "SyncClient",
+    "AnimeFrame",
+    "RateLimiter",
+    "TokenBucket",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "FairScheduler",
+    "SchedulerStats",
+    "priority",
+    "TokenManager",
+    "TokenStore",
+    "MemoryTokenStore",
+    "ManagedToken",
+    "WriteQueue",
+    "ListSyncer",
+    "RelationCrawler",
+    "RelationGraph",
+    "TitleIndex",
+    "Instrumentation",
+    "MetricsSink",
+    "CallbackSink",
+    "HistogramSink",
+    "Histogram",
+    "RequestMetrics",
+    "Transport",
+    "AiohttpTransport",
+    "HTTP2Transport",
+    "MemoryTransport",
+    "RecordingTransport",
+    "ReplayTransport",
+    "Exchange",
+    "load_exchanges",
+    "ListSnapshot",
+    "ListChange",
+    "SnapshotStore",
+    "MemorySnapshotStore",
+    "SQLiteSnapshotStore",
+    "CacheBackend",
+    "MemoryCache",
+    "SQLiteCache",
+    "CacheStats",
     "BadRequestError",
     "UnauthorizedError",
     "ForbiddenError",
     "NotFoundError",
+    "TooManyRequestsError",
     "HTTPError",
     "InputError",
     "AuthenticationError",
     "OAuthConfigError",
+    "CircuitOpenError",
+    "RequestShedError",
+    "ReplayError",
+    "FieldNotFetchedError",
     "Anime",
     "User",
     "Auth",
@@ -30,6 +76,11 @@ __all__ = (
     "ANIME_SOURCE",
     "ANIME_RATING",
     "RELATION_TYPE",
+    "FIELD_PROFILE",
+    "PRIORITY",
+    "FIELD_PROFILES",
+    "record_type",
+    "to_record",
 )
 
 from .types import (
@@ -42,17 +93,54 @@ from .types import (
     ANIME_SOURCE,
     ANIME_RATING,
     RELATION_TYPE,
+    FIELD_PROFILE,
+    PRIORITY,
 )
+from .cache import CacheBackend, CacheStats, MemoryCache, SQLiteCache
 from .client import Client
+from .sync_client import SyncClient
+from .frame import AnimeFrame
+from .fields import FIELD_PROFILES
+from .records import record_type, to_record
+from .ratelimit import RateLimiter, TokenBucket
+from .retry import CircuitBreaker, RetryPolicy
+from .scheduler import FairScheduler, SchedulerStats, priority
+from .tokens import ManagedToken, MemoryTokenStore, TokenManager, TokenStore
+from .writes import WriteQueue
+from .crawler import RelationCrawler, RelationGraph
+from .title_index import TitleIndex
+from .transport import AiohttpTransport, HTTP2Transport, MemoryTransport, Transport
+from .replay import Exchange, RecordingTransport, ReplayTransport, load_exchanges
+from .instrumentation import (
+    CallbackSink,
+    Histogram,
+    HistogramSink,
+    Instrumentation,
+    MetricsSink,
+    RequestMetrics,
+)
+from .list_sync import (
+    ListChange,
+    ListSnapshot,
+    ListSyncer,
+    MemorySnapshotStore,
+    SnapshotStore,
+    SQLiteSnapshotStore,
+)
 from .errors import (
     BadRequestError,
     UnauthorizedError,
     ForbiddenError,
     NotFoundError,
+    TooManyRequestsError,
     HTTPError,
     InputError,
     AuthenticationError,
     OAuthConfigError,
+    CircuitOpenError,
+    RequestShedError,
+    ReplayError,
+    FieldNotFetchedError,
 )
 from .models import (
     User,
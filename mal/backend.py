@@ -0,0 +1,23 @@
+from abc import ABC
+import asyncio
+from typing import Any
+
+
+class Backend(ABC):
+    """Base of the pluggable stores the client and its helpers keep data in"""
+
+    # Whether calls wait on I/O, such as a database. They are then run in a worker thread,
+    # so a slow store does not stall the event loop.
+    blocking = False
+
+    async def call(self, method: str, *args: Any) -> Any:
+        """
+        Call one of the backend's methods from the event loop, in a worker thread when the
+        backend blocks on I/O
+        :param method: The name of the method, e.g. "get"
+        :param args: Passed to the method
+        :return: The method's result
+        """
+        if self.blocking:
+            return await asyncio.to_thread(getattr(self, method), *args)
+        return getattr(self, method)(*args)
@@ -0,0 +1,289 @@
+from abc import abstractmethod
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Iterable, Optional
+
+from mal.backend import Backend
+
+
+class CacheStats:
+    """Counters describing how a cache has been used"""
+
+    __slots__ = ("hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return f"<CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, expirations={self.expirations})>"
+
+
+class CacheBackend(Backend):
+    """
+    Interface for response cache backends.
+    Values are raw, JSON serialisable API payloads.
+    """
+
+    stats: CacheStats
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get an entry
+        :param key: The cache key
+        :return: The cached value, or None if it is missing or expired
+        """
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Get many entries at once
+        :param keys: The cache keys
+        :return: The cached values of the keys that were found
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        """
+        Store an entry
+        :param key: The cache key
+        :param value: The value to cache
+        :param ttl: Seconds the entry stays valid for
+        """
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-memory response cache with per-entry TTLs and LRU eviction"""
+
+    def __init__(self, *, max_size: int = 1024):
+        """
+        :param max_size: The max number of entries held before the least recently used is evicted
+        """
+        if max_size < 1:
+            raise ValueError("Cache max_size must be at least 1")
+
+        self.max_size = max_size
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get an entry, refreshing its recency
+        :param key: The cache key
+        :return: The cached value, or None if it is missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """
+        Store an entry, evicting the least recently used entries when full
+        :param key: The cache key
+        :param value: The value to cache
+        :param ttl: Seconds the entry stays valid for
+        """
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Response cache persisted to a local SQLite database in WAL mode.
+    The database can be shared by every worker process on a host, so caches survive restarts.
+    Expired entries are removed, and their pages reclaimed, by a background thread.
+    Queries may wait on other processes' locks, so the client runs them in worker threads.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        vacuum_interval: Optional[float] = 300.0,
+        busy_timeout: float = 5.0,
+    ):
+        """
+        :param path: The path of the database file
+        :param vacuum_interval: Seconds between removals of expired entries (None disables it)
+        :param busy_timeout: Seconds to wait for another process to release a lock
+        """
+        self.path = path
+        self.stats = CacheStats()
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+        )
+
+        self._stop = threading.Event()
+        self._vacuum_thread = None
+        if vacuum_interval:
+            self._vacuum_thread = threading.Thread(
+                target=self._vacuum_loop,
+                args=(vacuum_interval,),
+                name="mal-sqlite-cache-vacuum",
+                daemon=True,
+            )
+            self._vacuum_thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self._busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        # Only takes effect on a new database, as it must be set before any table exists
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def __len__(self):
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE expires_at > ?", (time.time(),)
+            ).fetchone()
+        return count
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+        return json.loads(row[0])
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        # Stay well below SQLite's limit on the number of bound parameters
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND expires_at > ?",
+                    (*chunk, now),
+                ).fetchall()
+            found.update((key, json.loads(value)) for key, value in rows)
+
+        with self._lock:
+            self.stats.hits += len(found)
+            self.stats.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: Any, ttl: float):
+        blob = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, blob, time.time() + ttl),
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def vacuum(self) -> int:
+        """
+        Remove expired entries and return their pages to the filesystem
+        :return: The number of entries removed
+        """
+        conn = self._connect()
+        try:
+            removed = conn.execute(
+                "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self.stats.expirations += removed
+        return removed
+
+    def _vacuum_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.vacuum()
+            except sqlite3.Error:
+                # Another process may hold the lock for longer than the busy timeout,
+                # the entries will be removed on the next pass.
+                pass
+
+    def close(self):
+        self._stop.set()
+        if self._vacuum_thread is not None:
+            self._vacuum_thread.join()
+        with self._lock:
+            self._conn.close()
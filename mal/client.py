@@ -1,10 +1,18 @@
-from contextlib import asynccontextmanager
+import asyncio
 from datetime import date
+import hashlib
 import secrets
-from typing import Optional
+import time
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, TypeVar, Union
 
 import aiohttp
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from mal.cache import CacheBackend
 from mal.errors import (
     AuthenticationError,
     BadRequestError,
@@ -13,10 +21,29 @@ from mal.errors import (
     InputError,
     NotFoundError,
     OAuthConfigError,
+    TooManyRequestsError,
     UnauthorizedError,
 )
+from mal.fields import FIELDS, field_set, resolve_fields
+from mal.instrumentation import OTHER_ENDPOINT, Instrumentation, RequestMetrics
 from mal.models import Anime, Auth, User, WatchStatus
-from mal.types import USER_ANIME_STATUS, USER_LIST_SORT
+from mal.records import record_factory
+from mal.ratelimit import RateLimiter, parse_retry_after
+from mal.retry import CircuitBreaker, Deadline, RetryPolicy
+from mal.scheduler import FairScheduler
+from mal.singleflight import SingleFlight
+from mal.tokens import ManagedToken, TokenManager, TokenStore
+from mal.transport import (
+    CONNECTOR_LIMIT,
+    CONNECTOR_LIMIT_PER_HOST,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+    AiohttpTransport,
+    Response,
+    Transport,
+)
+from mal.types import PRIORITY, USER_ANIME_STATUS, USER_LIST_SORT
+from mal.writes import WRITE_DEBOUNCE, WriteQueue
 
 AUTH_URL = "https://myanimelist.net/v1"
 BASE_URL = "https://api.myanimelist.net/v1"
@@ -26,19 +53,26 @@ OFFSET_LIMIT = 100
 VERIFIER_LENGTH = 128
 CODE_CHALLENGE_METHOD = "plain"
 
+BULK_CONCURRENCY = 10
+
+ANIME_RESULT = Union[Anime, dict, tuple]
+T = TypeVar("T")
+TOKEN = Union[str, ManagedToken]
+
+# Stands in for a RetryPolicy built per client, so clients never share one by default
+DEFAULT_RETRY_POLICY: Any = object()
+
+CACHE_TTLS = {
+    "get_anime_details": 3600.0,
+    "search_anime": 600.0,
+}
+
 
 class Client:
     """
     Client used to interact with MyAnimeList API
     """
 
-    __ANIME_FIELDS = (
-        "id,title,main_picture,alternative_titles,start_date,end_date,synopsis,"
-        "mean,rank,popularity,num_list_users,num_scoring_users,nsfw,genres,created_at,updated_at,"
-        "media_type,status,my_list_status,num_episodes,start_season,broadcast,source,average_episode_duration,"
-        "rating,pictures,background,related_anime,related_manga,recommendations,statistics,studios"
-    )
-
     __USER_FIELDS = "id,name,picture,gender,birthday,location,joined_at,anime_statistics,time_zone,is_supporter"
 
     def __init__(
@@ -48,23 +82,113 @@ class Client:
         client_id: Optional[str] = None,
         callback_url: Optional[str] = None,
         session: Optional[aiohttp.ClientSession] = None,
-        resuse_session: bool = False,
+        resuse_session: bool = True,
+        connector_limit: int = CONNECTOR_LIMIT,
+        connector_limit_per_host: int = CONNECTOR_LIMIT_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: Optional[int] = DNS_CACHE_TTL,
+        coalesce_requests: bool = True,
+        cache: Optional[CacheBackend] = None,
+        cache_ttls: Optional[dict[str, float]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[FairScheduler] = None,
+        loads: Callable[[bytes], Any] = json_loads,
+        token_store: Optional[TokenStore] = None,
+        write_debounce: float = WRITE_DEBOUNCE,
+        on_write_error: Optional[Callable[[str, Exception], None]] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        base_url: Optional[str] = None,
+        auth_url: Optional[str] = None,
+        transport: Optional[Transport] = None,
     ):
+        """
+        :param client_secret: The MAL app's client secret (OAuth flow only)
+        :param client_id: The MAL app's client ID
+        :param callback_url: The redirect URI registered for the MAL app (OAuth flow only)
+        :param session: An externally managed session, the client will not close it
+        :param resuse_session: Kept for backwards compatibility, the client always
+            reuses a single pooled session
+        :param connector_limit: Max number of open connections in the pool
+        :param connector_limit_per_host: Max number of open connections per host
+        :param keepalive_timeout: Seconds an idle connection is kept alive for reuse
+        :param dns_cache_ttl: Seconds resolved addresses are cached for (None caches forever)
+        :param coalesce_requests: Share one network call between concurrent identical GETs
+        :param cache: Cache responses of catalog endpoints in this backend (disabled when None)
+        :param cache_ttls: Seconds responses stay cached per endpoint, overriding CACHE_TTLS.
+            An endpoint with a TTL of 0 is not cached.
+        :param rate_limiter: Limit the rate requests are sent at (disabled when None)
+        :param retry_policy: Retry transient failures of idempotent requests, defaults to a
+            RetryPolicy() of the client's own (disabled when None)
+        :param circuit_breaker: Fail requests fast while the API is degraded (disabled when None)
+        :param scheduler: Share the upstream fairly between tokens (disabled when None)
+        :param loads: Decodes JSON response bodies, defaults to orjson when it is installed
+        :param token_store: Holds the tokens of users managed by `client.tokens`,
+            defaults to an in-memory store
+        :param write_debounce: Seconds `client.writes` waits for further updates of an anime
+            before sending them
+        :param on_write_error: Called with the anime's ID and the error when a write queued on
+            `client.writes` fails
+        :param instrumentation: Record the timings of every request and model built
+            (disabled when None)
+        :param base_url: The root URL of the API, defaults to BASE_URL. Point it at a proxy or
+            a mock server
+        :param auth_url: The root URL of the OAuth endpoints, defaults to AUTH_URL
+        :param transport: Sends the requests, defaults to an AiohttpTransport using the session
+            and connection options above, which are ignored when a transport is given
+        """
         self._client_id = client_id
         self._client_secret = client_secret
-        self._session = session
         self._callback_url = callback_url
+        self._tasks: set[asyncio.Task] = set()
+        self._inflight: Optional[SingleFlight] = (
+            SingleFlight() if coalesce_requests else None
+        )
+        self.cache = cache
+        self._cache_ttls = {**CACHE_TTLS, **(cache_ttls or {})}
+        self.rate_limiter = rate_limiter
+        self.retry_policy = (
+            RetryPolicy() if retry_policy is DEFAULT_RETRY_POLICY else retry_policy
+        )
+        self.circuit_breaker = circuit_breaker
+        self.scheduler = scheduler
+        self._loads = loads
+        self.tokens = TokenManager(self, store=token_store)
+        self.writes = WriteQueue(self, debounce=write_debounce, on_error=on_write_error)
+        self.instrumentation = instrumentation
+        self._base_url = (base_url or BASE_URL).rstrip("/")
+        self._auth_url = (auth_url or AUTH_URL).rstrip("/")
 
-        if resuse_session and not self._session:
-            self._session = aiohttp.ClientSession()
+        if transport is None:
+            trace_configs = None
+            if instrumentation is not None:
+                trace_configs = [instrumentation.trace_config()]
+            transport = AiohttpTransport(
+                session=session,
+                connector_limit=connector_limit,
+                connector_limit_per_host=connector_limit_per_host,
+                keepalive_timeout=keepalive_timeout,
+                dns_cache_ttl=dns_cache_ttl,
+                trace_configs=trace_configs,
+            )
+        self.transport = transport
+
+    async def __aenter__(self) -> "Client":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
-    @asynccontextmanager
-    async def _get_session(self):
-        if self._session:
-            yield self._session
-        else:
-            async with aiohttp.ClientSession() as session:
-                yield session
+    def _spawn(self, coro) -> asyncio.Task:
+        """
+        Run a coroutine in the background, tracked so that close() can cancel it
+        :return: asyncio.Task
+        """
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
 
     def _set_headers(self, args: dict):
         headers = args.pop("headers", {})
@@ -82,7 +206,7 @@ class Client:
         headers["User-Agent"] = "Mal.py (https://github.com/SageTendo/mal.py)"
         args["headers"] = headers
 
-    def _handle_error(self, resp: aiohttp.ClientResponse, data: dict):
+    def _handle_error(self, resp: Response, data: dict):
         if resp.status == 400:
             raise BadRequestError(resp, data.get("error", "Bad Request"))
         if resp.status == 401:
@@ -100,45 +224,332 @@ class Client:
             )
         if resp.status == 404:
             raise NotFoundError(resp, data.get("error", "Resource Not Found"))
+        if resp.status == 429:
+            raise TooManyRequestsError(
+                resp,
+                data.get("error", "Too Many Requests"),
+                parse_retry_after(resp.headers.get("Retry-After")),
+            )
 
-    async def _get(self, url: str, **kwargs) -> dict:
-        self._set_headers(kwargs)
-        async with self._get_session() as session:
-            async with session.get(url, **kwargs) as resp:
-                data = await resp.json()
+    async def _request(self, method: str, url: str, **kwargs) -> dict:
+        """
+        Send a request, resolving a managed token to the user's current access token.
+        When the API rejects the access token it is refreshed and the request sent once more.
+        :param method: The HTTP method
+        :param url: The URL to send the request to
+        :return: The decoded response body
+        """
+        token = kwargs.get("token")
+        if not isinstance(token, ManagedToken):
+            return await self._request_with_retry(method, url, **kwargs)
 
-                if resp.status == 200:
-                    return data
+        access_token = await token.access_token()
+        try:
+            return await self._request_with_retry(
+                method, url, **{**kwargs, "token": access_token}
+            )
+        except UnauthorizedError:
+            access_token = await token.refresh(stale_token=access_token)
+        return await self._request_with_retry(
+            method, url, **{**kwargs, "token": access_token}
+        )
 
-                if 400 <= resp.status < 500:
-                    self._handle_error(resp, data)
-                raise HTTPError(resp, await resp.text() or "Unknown Error")
+    async def _request_with_retry(
+        self, method: str, url: str, *, retry: Optional[bool] = None, **kwargs
+    ) -> dict:
+        """
+        Send a request, retrying transient failures according to the retry policy
+        :param method: The HTTP method
+        :param url: The URL to send the request to
+        :param retry: Whether to retry the request, by default only the policy's methods are
+        :return: The decoded response body
+        """
+        policy = self.retry_policy
+        if policy is None or not (
+            retry if retry is not None else method in policy.methods
+        ):
+            return await self._send(method, url, **kwargs)
 
-    async def _post(self, url: str, **kwargs) -> dict:
+        deadline = Deadline(policy.deadline)
+        attempt = 1
+        while True:
+            try:
+                return await self._send(method, url, deadline=deadline, **kwargs)
+            except Exception as e:
+                if attempt >= policy.attempts or not policy.should_retry(e):
+                    raise
+
+                delay = policy.backoff(attempt, getattr(e, "retry_after", None))
+                if not deadline.allows(delay):
+                    raise
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(
+        self, method: str, url: str, *, priority: Optional[PRIORITY] = None, **kwargs
+    ) -> dict:
+        if self.scheduler is None:
+            return await self._send_guarded(method, url, **kwargs)
+
+        async with self.scheduler.slot(kwargs.get("token"), priority):
+            return await self._send_guarded(method, url, **kwargs)
+
+    async def _send_guarded(self, method: str, url: str, **kwargs) -> dict:
+        if self.circuit_breaker is None:
+            return await self._send_once(method, url, **kwargs)
+
+        with self.circuit_breaker.guard():
+            return await self._send_once(method, url, **kwargs)
+
+    async def _send_once(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        **kwargs,
+    ) -> dict:
+        token = kwargs.get("token")
         self._set_headers(kwargs)
-        async with self._get_session() as session:
-            async with session.post(url, **kwargs) as resp:
-                data = await resp.json()
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(token)
+
+        metrics = None
+        if self.instrumentation is not None:
+            metrics = RequestMetrics(endpoint or OTHER_ENDPOINT, method, url)
+
+        try:
+            sent = self.transport.request(method, url, trace=metrics, **kwargs)
+            if deadline is None:
+                resp = await sent
+            else:
+                # Only bound the attempt once it has its turn, a hung connection would outlive
+                # the deadline but a long queue is the scheduler or rate limiter doing its job
+                resp = await asyncio.wait_for(sent, deadline.remaining())
+            body = resp.body
+
+            if metrics is not None:
+                metrics.total = time.perf_counter() - metrics.started
+                metrics.status = resp.status
+                metrics.bytes_received = len(body)
+
+            if resp.status == 200:
+                return self._decode(body, metrics)
+
+            if resp.status == 429:
+                if self.rate_limiter is not None:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    self.rate_limiter.throttle(token, retry_after)
+                if self.scheduler is not None:
+                    self.scheduler.throttled()
+
+            # Error responses are not always JSON, e.g. HTML pages served by a proxy
+            try:
+                data = self._decode(body, metrics) if body else {}
+            except ValueError:
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+
+            if 400 <= resp.status < 500:
+                self._handle_error(resp, data)
+            message = body.decode(resp.get_encoding(), errors="replace")
+            raise HTTPError(resp, message or "Unknown Error", resp.status)
+        except BaseException as e:
+            if metrics is not None:
+                metrics.error = e
+            raise
+        finally:
+            if metrics is not None:
+                self.instrumentation.record_request(metrics)
 
-                if resp.status == 200:
-                    return data
+    def _decode(self, body: bytes, metrics: Optional[RequestMetrics]) -> Any:
+        if metrics is None:
+            return self._loads(body)
 
-                if 400 <= resp.status < 500:
-                    self._handle_error(resp, data)
-                raise HTTPError(resp, await resp.text() or "Unknown Error")
+        started = time.perf_counter()
+        try:
+            return self._loads(body)
+        finally:
+            metrics.decode = time.perf_counter() - started
+
+    def _timed(self, endpoint: str, make: Callable[..., T]) -> Callable[..., T]:
+        """
+        Time every model built by `make` when instrumentation is enabled
+        :param endpoint: The name of the method building the models
+        :param make: Builds a model from a payload
+        :return: Callable
+        """
+        if self.instrumentation is None:
+            return make
+        return self.instrumentation.timed(endpoint, make)
+
+    async def _get(self, url: str, **kwargs) -> dict:
+        if self._inflight is None or kwargs.keys() - {"token", "priority", "endpoint"}:
+            return await self._request("GET", url, **kwargs)
+
+        # The fields and nsfw flag are part of the URL, the token decides whose view is returned.
+        # A coalesced call is sent with the priority of the caller that started it.
+        key = (url, kwargs.get("token"))
+        return await self._inflight.do(key, lambda: self._request("GET", url, **kwargs))
+
+    async def _post(self, url: str, **kwargs) -> dict:
+        return await self._request("POST", url, **kwargs)
 
     async def _put(self, url: str, **kwargs) -> dict:
-        self._set_headers(kwargs)
-        async with self._get_session() as session:
-            async with session.put(url, **kwargs) as resp:
-                data = await resp.json()
+        return await self._request("PUT", url, **kwargs)
 
-                if resp.status == 200:
-                    return data
+    async def _cached_get(
+        self,
+        endpoint: str,
+        url: str,
+        *,
+        token: Optional[TOKEN] = None,
+        priority: Optional[PRIORITY] = None,
+    ) -> dict:
+        """
+        GET a response through the cache when one is configured for the endpoint.
+        Responses fetched with a token are scoped to that token, so user specific data
+        such as `my_list_status` is never served to another user.
+        :param endpoint: The name of the endpoint, used to look up its TTL
+        :param url: The full URL, including the fields and nsfw flag
+        :param token: The user's access token, or a ManagedToken
+        :param priority: The priority of the request
+        :return: dict
+        """
+        ttl = self._cache_ttls.get(endpoint) if self.cache is not None else None
+        if not ttl:
+            return await self._get(
+                url, token=token, priority=priority, endpoint=endpoint
+            )
 
-                if 400 <= resp.status < 500:
-                    self._handle_error(resp, data)
-                raise HTTPError(resp, await resp.text() or "Unknown Error")
+        key = self._cache_key(endpoint, url, token)
+        data = await self.cache.call("get", key)
+        if data is None:
+            data = await self._get(
+                url, token=token, priority=priority, endpoint=endpoint
+            )
+            await self.cache.call("set", key, data, ttl)
+        return data
+
+    @staticmethod
+    def _cache_scope(token: Optional[TOKEN]) -> str:
+        if isinstance(token, ManagedToken):
+            # Scoped to the user rather than their access token, so it survives refreshes
+            token = f"user:{token.user_id}"
+        return hashlib.sha256(token.encode()).hexdigest()[:16] if token else "public"
+
+    @classmethod
+    def _cache_key(cls, endpoint: str, url: str, token: Optional[TOKEN]) -> str:
+        digest = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+        return f"{endpoint}:{cls._cache_scope(token)}:{digest}"
+
+    @classmethod
+    def _anime_cache_key(cls, anime_id: str, token: Optional[TOKEN]) -> str:
+        return f"get_anime_details:{cls._cache_scope(token)}:anime:{anime_id}"
+
+    async def _get_anime_payload(
+        self,
+        anime_id: str,
+        fields: tuple[str, ...],
+        *,
+        token: Optional[TOKEN] = None,
+        priority: Optional[PRIORITY] = None,
+    ) -> dict:
+        """
+        GET an anime's details through the cache when one is configured.
+        Entries are keyed by the anime's ID and hold the fields they were fetched with, so an
+        entry fetched with the "full" profile also serves requests for fewer fields. A request
+        for fields the entry lacks fetches them along with the entry's, then replaces it.
+        :param anime_id: The ID of the anime
+        :param fields: The resolved fields to fetch
+        :param token: The user's access token, or a ManagedToken
+        :param priority: The priority of the request
+        :return: dict
+        """
+        ttl = (
+            self._cache_ttls.get("get_anime_details")
+            if self.cache is not None
+            else None
+        )
+        if not ttl:
+            return await self._get(
+                self._anime_details_url(anime_id, fields),
+                token=token,
+                priority=priority,
+                endpoint="get_anime_details",
+            )
+
+        key = self._anime_cache_key(anime_id, token)
+        entry = await self.cache.call("get", key)
+        if entry is not None:
+            cached_fields = tuple(entry["fields"])
+            if field_set(fields) <= field_set(cached_fields):
+                return entry["data"]
+            fields = tuple(sorted({*fields, *cached_fields}))
+
+        data = await self._get(
+            self._anime_details_url(anime_id, fields),
+            token=token,
+            priority=priority,
+            endpoint="get_anime_details",
+        )
+        entry = {"fields": fields, "data": data}
+        await self.cache.call("set", key, entry, ttl)
+        return data
+
+    async def _paginate(
+        self, url: str, *, prefetch: bool = True, **kwargs
+    ) -> AsyncIterator[dict]:
+        """
+        Walk a paged endpoint by following its `paging.next` links.
+        The next page is fetched in the background while the current one is consumed,
+        and any pending fetch is cancelled when the caller stops iterating.
+        :param url: The URL of the first page
+        :param prefetch: Fetch the next page early, disable it when iteration usually stops early
+        :return: The `node` of every entry across all pages
+        """
+        page = self._spawn(self._get(url, **kwargs))
+        try:
+            while page is not None:
+                resp = await page
+                next_url = resp.get("paging", {}).get("next")
+                page = None
+                if next_url and prefetch:
+                    page = self._spawn(self._get(next_url, **kwargs))
+                for entry in resp["data"]:
+                    yield entry["node"]
+                if next_url and not prefetch:
+                    page = self._spawn(self._get(next_url, **kwargs))
+        finally:
+            if page is not None:
+                page.cancel()
+                if page.done() and not page.cancelled():
+                    page.exception()
+
+    def _anime_factory(
+        self, endpoint: str, fields: tuple[str, ...], raw: bool, as_records: bool
+    ) -> Callable[[dict], ANIME_RESULT]:
+        """
+        Get the function that wraps each anime payload a call returns
+        :param endpoint: The name of the method the payloads are returned by
+        :param fields: The resolved fields the call fetches
+        :param raw: Return payloads as they are, they may be shared with the cache and must not be mutated
+        :param as_records: Return payloads as AnimeRecord named tuples
+        :return: Callable[[dict], Anime | dict | AnimeRecord]
+        """
+        if raw and as_records:
+            raise InputError("Only One Of raw And as_records May Be Set")
+
+        if raw:
+            return lambda data: data
+        if as_records:
+            return self._timed(endpoint, record_factory(fields))
+        return self._timed(
+            endpoint, lambda data: Anime(data, client=self, fields=fields)
+        )
 
     def _check_required_oauth_info(self):
         if not self._client_id:
@@ -202,7 +613,7 @@ class Client:
             f"&code_challenge_method={CODE_CHALLENGE_METHOD}"
             f"&redirect_uri={self._callback_url}"
         )
-        return f"{AUTH_URL}/oauth2/authorize?{query_params}", code_verifier
+        return f"{self._auth_url}/oauth2/authorize?{query_params}", code_verifier
 
     async def get_access_token(
         self, authorization_code: str, code_verifier: str
@@ -223,8 +634,10 @@ class Client:
             "redirect_uri": self._callback_url,
         }
 
-        resp = await self._post(url=f"{AUTH_URL}/oauth2/token", data=data)
-        return Auth(resp)
+        resp = await self._post(
+            url=f"{self._auth_url}/oauth2/token", data=data, endpoint="get_access_token"
+        )
+        return self._timed("get_access_token", Auth)(resp)
 
     async def refresh_token(self, refresh_token: str) -> Auth:
         """
@@ -240,40 +653,55 @@ class Client:
             "refresh_token": refresh_token,
         }
 
-        resp = await self._post(url=f"{AUTH_URL}/oauth2/token", data=data)
-        return Auth(resp)
+        resp = await self._post(
+            url=f"{self._auth_url}/oauth2/token", data=data, endpoint="refresh_token"
+        )
+        return self._timed("refresh_token", Auth)(resp)
 
-    async def get_user_details(self, *, token: str) -> User:
+    async def get_user_details(
+        self, *, token: TOKEN, priority: Optional[PRIORITY] = None
+    ) -> User:
         """
         Get the user's details from MyAnimeList
-        :param token: The user's access token
+        :param token: The user's access token, or a ManagedToken
+        :param priority: The priority requests are dispatched with, defaults to the context's
         :return: User
         """
         if not token:
             raise InputError("User Access Token Must Be Provided")
 
-        url = f"{BASE_URL}/users/@me?fields={self.__USER_FIELDS}"
-        resp = await self._get(url, token=token)
-        return User(resp)
+        url = f"{self._base_url}/users/@me?fields={self.__USER_FIELDS}"
+        resp = await self._get(
+            url, token=token, priority=priority, endpoint="get_user_details"
+        )
+        return self._timed("get_user_details", User)(resp)
 
     async def get_user_anime_list(
         self,
         *,
-        token: str,
+        token: TOKEN,
         limit: int = 1,
         offset: int = 0,
         sort: USER_LIST_SORT = "list_updated_at",
-        status: USER_ANIME_STATUS = "watching",
+        status: Optional[USER_ANIME_STATUS] = "watching",
         nsfw: bool = False,
-    ) -> list[Anime]:
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+    ) -> list[ANIME_RESULT]:
         """
         Get a user's list of anime from MyAnimeList
-        :param token: The user's access token
+        :param token: The user's access token, or a ManagedToken
         :param limit: The number of results to return
         :param offset: The number of results to skip (used for pagination)
         :param sort: Sort results by the given sort type
-        :param status: Filter results by the status of the anime
-        :return: list[Anime]
+        :param status: Filter results by the status of the anime, None returns every status
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :return: list[Anime | dict | AnimeRecord]
         """
         if not token:
             raise InputError("User Access Token Must Be Provided")
@@ -281,17 +709,85 @@ class Client:
         limit = max(0, min(limit, QUERY_LIMIT))
         offset = max(0, min(offset, OFFSET_LIMIT))
 
-        url = (
-            f"{BASE_URL}/users/@me/animelist"
+        fields = resolve_fields(fields)
+        make = self._anime_factory("get_user_anime_list", fields, raw, as_records)
+        url = self._user_anime_list_url(limit, offset, sort, status, nsfw, fields)
+        resp = await self._get(
+            url, token=token, priority=priority, endpoint="get_user_anime_list"
+        )
+        return [make(anime["node"]) for anime in resp["data"]]
+
+    async def iter_user_anime_list(
+        self,
+        *,
+        token: TOKEN,
+        page_size: int = QUERY_LIMIT,
+        offset: int = 0,
+        sort: USER_LIST_SORT = "list_updated_at",
+        status: Optional[USER_ANIME_STATUS] = "watching",
+        nsfw: bool = False,
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+        prefetch: bool = True,
+    ) -> AsyncIterator[ANIME_RESULT]:
+        """
+        Iterate over a user's entire list of anime, page by page
+        :param token: The user's access token, or a ManagedToken
+        :param page_size: The number of results to request per page
+        :param offset: The number of results to skip before the first page
+        :param sort: Sort results by the given sort type
+        :param status: Filter results by the status of the anime, None returns every status
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :param prefetch: Fetch the next page while the current one is consumed, disable it
+            when the iteration is likely to stop early
+        :return: AsyncIterator[Anime | dict | AnimeRecord]
+        """
+        if not token:
+            raise InputError("User Access Token Must Be Provided")
+
+        page_size = max(1, min(page_size, QUERY_LIMIT))
+        offset = max(0, offset)
+
+        fields = resolve_fields(fields)
+        make = self._anime_factory("get_user_anime_list", fields, raw, as_records)
+        url = self._user_anime_list_url(page_size, offset, sort, status, nsfw, fields)
+        pages = self._paginate(
+            url,
+            token=token,
+            priority=priority,
+            prefetch=prefetch,
+            endpoint="get_user_anime_list",
+        )
+        try:
+            async for node in pages:
+                yield make(node)
+        finally:
+            await pages.aclose()
+
+    def _user_anime_list_url(
+        self,
+        limit: int,
+        offset: int,
+        sort: USER_LIST_SORT,
+        status: Optional[USER_ANIME_STATUS],
+        nsfw: bool,
+        fields: tuple[str, ...],
+    ) -> str:
+        status_filter = f"&status={status}" if status else ""
+        return (
+            f"{self._base_url}/users/@me/animelist"
             f"?limit={limit}"
             f"&offset={offset}"
             f"&sort={sort}"
-            f"&status={status}"
-            f"&fields={self.__ANIME_FIELDS}"
+            f"{status_filter}"
+            f"&fields={','.join(fields)}"
             f"&nsfw={nsfw}"
         )
-        resp = await self._get(url, token=token)
-        return [Anime(anime["node"], client=self) for anime in resp["data"]]
 
     async def search_anime(
         self,
@@ -300,41 +796,256 @@ class Client:
         limit: int = 100,
         offset: int = 0,
         nsfw: bool = False,
-    ) -> list[Anime]:
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+    ) -> list[ANIME_RESULT]:
         """
         Get a list of anime from MyAnimeList
         :param token: The user's access token
         :param query: The search query
-        :return: list[Anime]
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :return: list[Anime | dict | AnimeRecord]
         """
+        self._check_search_query(query)
+
+        limit = max(0, min(limit, QUERY_LIMIT))
+        offset = max(0, min(offset, OFFSET_LIMIT))
+
+        fields = resolve_fields(fields)
+        make = self._anime_factory("search_anime", fields, raw, as_records)
+        url = self._search_anime_url(query, limit, offset, nsfw, fields)
+        resp = await self._cached_get("search_anime", url, priority=priority)
+        return [make(anime["node"]) for anime in resp["data"]]
+
+    async def iter_search_anime(
+        self,
+        *,
+        query: str,
+        page_size: int = QUERY_LIMIT,
+        offset: int = 0,
+        nsfw: bool = False,
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+        prefetch: bool = True,
+    ) -> AsyncIterator[ANIME_RESULT]:
+        """
+        Iterate over every search result from MyAnimeList, page by page
+        :param query: The search query
+        :param page_size: The number of results to request per page
+        :param offset: The number of results to skip before the first page
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :param prefetch: Fetch the next page while the current one is consumed, disable it
+            when the iteration is likely to stop early
+        :return: AsyncIterator[Anime | dict | AnimeRecord]
+        """
+        self._check_search_query(query)
+
+        page_size = max(1, min(page_size, QUERY_LIMIT))
+        offset = max(0, offset)
+
+        fields = resolve_fields(fields)
+        make = self._anime_factory("search_anime", fields, raw, as_records)
+        url = self._search_anime_url(query, page_size, offset, nsfw, fields)
+        pages = self._paginate(
+            url, priority=priority, prefetch=prefetch, endpoint="search_anime"
+        )
+        try:
+            async for node in pages:
+                yield make(node)
+        finally:
+            await pages.aclose()
+
+    def _check_search_query(self, query: str):
         if not query:
             raise InputError("A Valid Query Must Be Provided")
 
         if len(query) < 3:
             raise InputError("Query Must Be At Least 3 Characters")
 
-        limit = max(0, min(limit, QUERY_LIMIT))
-        offset = max(0, min(offset, OFFSET_LIMIT))
-
-        url = f"{BASE_URL}/anime?q={query}&limit={limit}&offset={offset}&fields={self.__ANIME_FIELDS}&nsfw={nsfw}"
-        resp = await self._get(url)
-        return [Anime(anime["node"], client=self) for anime in resp["data"]]
+    def _search_anime_url(
+        self, query: str, limit: int, offset: int, nsfw: bool, fields: tuple[str, ...]
+    ) -> str:
+        return f"{self._base_url}/anime?q={query}&limit={limit}&offset={offset}&fields={','.join(fields)}&nsfw={nsfw}"
 
     async def get_anime_details(
-        self, *, anime_id: str, token: Optional[str] = None
-    ) -> Anime:
+        self,
+        *,
+        anime_id: str,
+        token: Optional[TOKEN] = None,
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+    ) -> ANIME_RESULT:
         """
         Get anime details from MyAnimeList
-        :param token: The user's access token
+        :param token: The user's access token, or a ManagedToken
         :param anime_id: The ID of the anime to get details for
-        :return: Anime
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :return: Anime | dict | AnimeRecord
         """
         if not anime_id:
             raise InputError("A Valid Anime ID Must Be Provided")
 
-        url = f"{BASE_URL}/anime/{anime_id}?fields={self.__ANIME_FIELDS}"
-        resp = await self._get(url, token=token)
-        return Anime(resp, client=self)
+        fields = resolve_fields(fields)
+        make = self._anime_factory("get_anime_details", fields, raw, as_records)
+        resp = await self._get_anime_payload(
+            anime_id, fields, token=token, priority=priority
+        )
+        return make(resp)
+
+    def _anime_details_url(self, anime_id: str, fields: tuple[str, ...]) -> str:
+        return f"{self._base_url}/anime/{anime_id}?fields={','.join(fields)}"
+
+    async def get_anime_details_many(
+        self,
+        *,
+        anime_ids: Iterable[str],
+        token: Optional[TOKEN] = None,
+        concurrency: int = BULK_CONCURRENCY,
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+    ) -> list[Union[ANIME_RESULT, Exception]]:
+        """
+        Get the details of many anime concurrently from MyAnimeList.
+        A failed lookup does not abort the batch, its exception is returned in place of the anime.
+        :param anime_ids: The IDs of the anime to get details for
+        :param token: The user's access token, or a ManagedToken
+        :param concurrency: The max number of requests in flight at once
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :return: list[Anime | dict | AnimeRecord | Exception], in the same order as `anime_ids`
+        """
+        anime_ids = list(anime_ids)
+        fields = resolve_fields(fields)
+        make = self._anime_factory("get_anime_details", fields, raw, as_records)
+        results = await self._cached_anime_details(anime_ids, token, fields, make)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        tasks = {
+            anime_id: self._spawn(
+                self._fetch_anime_details(
+                    anime_id, token, fields, make, priority, semaphore
+                )
+            )
+            for anime_id in anime_ids
+            if anime_id not in results
+        }
+        try:
+            results.update(await asyncio.gather(*tasks.values()))
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return [results[anime_id] for anime_id in anime_ids]
+
+    async def iter_anime_details_many(
+        self,
+        *,
+        anime_ids: Iterable[str],
+        token: Optional[TOKEN] = None,
+        concurrency: int = BULK_CONCURRENCY,
+        fields: FIELDS = "full",
+        raw: bool = False,
+        as_records: bool = False,
+        priority: Optional[PRIORITY] = None,
+    ) -> AsyncIterator[tuple[str, Union[ANIME_RESULT, Exception]]]:
+        """
+        Get the details of many anime concurrently, yielding each one as soon as it completes.
+        A failed lookup does not abort the batch, its exception is yielded in place of the anime.
+        :param anime_ids: The IDs of the anime to get details for
+        :param token: The user's access token, or a ManagedToken
+        :param concurrency: The max number of requests in flight at once
+        :param fields: A field profile ("minimal", "list", "full") or the names of the fields to fetch
+        :param raw: Return the API's payloads as dicts instead of Anime
+        :param as_records: Return AnimeRecord named tuples holding the fetched fields instead of Anime
+        :param priority: The priority requests are dispatched with, defaults to the context's
+        :return: AsyncIterator[tuple[anime_id, Anime | dict | AnimeRecord | Exception]]
+        """
+        anime_ids = list(anime_ids)
+        fields = resolve_fields(fields)
+        make = self._anime_factory("get_anime_details", fields, raw, as_records)
+        cached = await self._cached_anime_details(anime_ids, token, fields, make)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        tasks = [
+            self._spawn(
+                self._fetch_anime_details(
+                    anime_id, token, fields, make, priority, semaphore
+                )
+            )
+            for anime_id in dict.fromkeys(anime_ids)
+            if anime_id not in cached
+        ]
+        try:
+            for anime_id, anime in cached.items():
+                yield anime_id, anime
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _cached_anime_details(
+        self,
+        anime_ids: list[str],
+        token: Optional[TOKEN],
+        fields: tuple[str, ...],
+        make: Callable[[dict], ANIME_RESULT],
+    ) -> dict[str, Union[ANIME_RESULT, Exception]]:
+        """
+        Look up the details of many anime in the cache with a single bulk read
+        :return: The anime whose entry holds every requested field, keyed by their ID
+        """
+        if self.cache is None or not self._cache_ttls.get("get_anime_details"):
+            return {}
+
+        keys = {
+            self._anime_cache_key(anime_id, token): anime_id for anime_id in anime_ids
+        }
+        entries = await self.cache.call("get_many", keys)
+        requested = field_set(fields)
+        return {
+            keys[key]: make(entry["data"])
+            for key, entry in entries.items()
+            if requested <= field_set(tuple(entry["fields"]))
+        }
+
+    async def _fetch_anime_details(
+        self,
+        anime_id: str,
+        token: Optional[TOKEN],
+        fields: tuple[str, ...],
+        make: Callable[[dict], ANIME_RESULT],
+        priority: Optional[PRIORITY],
+        semaphore: asyncio.Semaphore,
+    ) -> tuple[str, Union[ANIME_RESULT, Exception]]:
+        async with semaphore:
+            try:
+                if not anime_id:
+                    raise InputError("A Valid Anime ID Must Be Provided")
+                resp = await self._get_anime_payload(
+                    anime_id, fields, token=token, priority=priority
+                )
+                return anime_id, make(resp)
+            except Exception as e:
+                return anime_id, e
 
     async def update_watch_status(
         self,
@@ -344,22 +1055,52 @@ class Client:
         status: USER_ANIME_STATUS = "watching",
         start_date: str = "",
         finish_date: str = "",
-        token: Optional[str] = None,
+        token: Optional[TOKEN] = None,
+        retry: bool = False,
+        priority: Optional[PRIORITY] = None,
     ) -> WatchStatus:
         """
         Update the watch status of an anime in a user's watchlist
-        :param token: The user's access token
+        :param token: The user's access token, or a ManagedToken
         :param anime_id: The ID of the anime
         :param episode: The episode that is being watched
         :param status: The status to update the anime to
         :param start_date: The date the user started watching the anime
         :param finish_date: The date the user finished watching the anime
+        :param retry: Retry transient failures, only safe if no conflicting update may be sent
+        :param priority: The priority requests are dispatched with, defaults to the context's
         :return: WatchStatus
         """
+        url = f"{self._base_url}/anime/{anime_id}/my_list_status"
+        body = self._watch_status_body(
+            anime_id=anime_id,
+            episode=episode,
+            status=status,
+            start_date=start_date,
+            finish_date=finish_date,
+        )
+        resp = await self._put(
+            url,
+            data=body,
+            token=token,
+            retry=retry,
+            priority=priority,
+            endpoint="update_watch_status",
+        )
+        return self._timed("update_watch_status", WatchStatus)(resp, anime_id=anime_id)
+
+    def _watch_status_body(
+        self,
+        *,
+        anime_id: str,
+        episode: int,
+        status: USER_ANIME_STATUS,
+        start_date: str,
+        finish_date: str,
+    ) -> dict:
         if not anime_id:
             raise InputError("A Valid Anime ID Must Be Provided")
 
-        url = f"{BASE_URL}/anime/{anime_id}/my_list_status"
         body = {"status": status, "num_watched_episodes": episode}
 
         if start_date:
@@ -375,10 +1116,17 @@ class Client:
                 body["finish_date"] = finish_date
             except ValueError:
                 raise InputError("Invalid Finish Date Provided")
-
-        resp = await self._put(url, data=body, token=token)
-        return WatchStatus(resp, anime_id=anime_id)
+        return body
 
     async def close(self):
-        if self._session:
-            await self._session.close()
+        """
+        Send the pending writes and finish the token refreshes in flight, then close the
+        transport and release its connections.
+        Externally provided sessions are left open for their owner to close.
+        """
+        await self.writes.flush()
+        for task in list(self._tasks):
+            task.cancel()
+
+        await self.tokens.close()
+        await self.transport.close()
@@ -0,0 +1,201 @@
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+from mal.fields import FIELDS, resolve_fields
+from mal.models import Anime
+from mal.types import RELATION_TYPE
+
+if TYPE_CHECKING:
+    from mal.client import TOKEN, Client
+
+MAX_NODES = 500
+CRAWL_CONCURRENCY = 10
+
+
+class RelationGraph:
+    """The anime reached by a crawl and the relations between them"""
+
+    __slots__ = ("nodes", "edges", "depths", "errors", "truncated", "fields")
+
+    def __init__(self, fields: Optional[tuple[str, ...]] = None):
+        """
+        :param fields: The fields fetched for each anime, None when unknown
+        """
+        # The payload of every anime fetched, keyed by its ID
+        self.nodes: dict[str, dict] = {}
+        # The (anime ID, relation type) pairs each fetched anime relates to
+        self.edges: dict[str, list[tuple[str, RELATION_TYPE]]] = {}
+        # The number of hops from the closest starting anime
+        self.depths: dict[str, int] = {}
+        self.errors: dict[str, Exception] = {}
+        # Whether anime were left unexplored because the node budget was spent
+        self.truncated = False
+        self.fields = fields
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, anime_id: str):
+        return str(anime_id) in self.nodes
+
+    def neighbours(self, anime_id: str) -> list[str]:
+        """
+        :param anime_id: The ID of a fetched anime
+        :return: The IDs of the anime it relates to
+        """
+        return [related_id for related_id, _ in self.edges.get(str(anime_id), ())]
+
+    def anime(self, anime_id: str, *, client: Optional["Client"] = None) -> Anime:
+        """
+        :param anime_id: The ID of a fetched anime
+        :param client: The client used to fetch related anime
+        :return: Anime, raising FieldNotFetchedError for the fields the crawl did not fetch
+        """
+        return Anime(self.nodes[str(anime_id)], client=client, fields=self.fields)
+
+    def components(self) -> list[list[str]]:
+        """
+        Group the anime into franchises, the sets of anime connected by relations in either
+        direction, including related anime that were not fetched
+        :return: The IDs of each franchise's anime, largest franchise first
+        """
+        parents: dict[str, str] = {}
+
+        def find(anime_id: str) -> str:
+            root = parents.setdefault(anime_id, anime_id)
+            while root != parents[root]:
+                parents[root] = parents[parents[root]]
+                root = parents[root]
+            return root
+
+        for anime_id in self.nodes:
+            find(anime_id)
+        for anime_id, related in self.edges.items():
+            for related_id, _ in related:
+                parents[find(related_id)] = find(anime_id)
+
+        groups: dict[str, list[str]] = {}
+        for anime_id in parents:
+            groups.setdefault(find(anime_id), []).append(anime_id)
+        return sorted(
+            (sorted(group, key=_id_order) for group in groups.values()),
+            key=len,
+            reverse=True,
+        )
+
+    def franchise(self, anime_id: str) -> list[str]:
+        """
+        :param anime_id: The ID of an anime in the graph
+        :return: The IDs of every anime connected to it
+        """
+        anime_id = str(anime_id)
+        for component in self.components():
+            if anime_id in component:
+                return component
+        return []
+
+    def __repr__(self):
+        return f"<RelationGraph(nodes={len(self.nodes)}, edges={sum(map(len, self.edges.values()))}, truncated={self.truncated})>"
+
+
+def _id_order(anime_id: str) -> tuple[int, Union[int, str]]:
+    return (0, int(anime_id)) if anime_id.isdigit() else (1, anime_id)
+
+
+class RelationCrawler:
+    """
+    Explores the relation graph of anime breadth-first.
+    Each level of the graph is fetched concurrently through `get_anime_details`, so its
+    response cache and request coalescing are reused, and every anime is fetched at most once.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        *,
+        relation_types: Optional[Iterable[RELATION_TYPE]] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: int = MAX_NODES,
+        concurrency: int = CRAWL_CONCURRENCY,
+        fields: FIELDS = ("related_anime",),
+    ):
+        """
+        :param client: The client used to fetch the anime
+        :param relation_types: Only follow these relations, by default every relation is followed
+        :param max_depth: The max number of hops from the starting anime (unlimited when None)
+        :param max_nodes: The max number of anime fetched per crawl
+        :param concurrency: The max number of requests in flight at once
+        :param fields: A field profile or the names of the fields fetched for each anime,
+        `related_anime` is always included
+        """
+        self._client = client
+        self.relation_types = (
+            frozenset(relation_types) if relation_types is not None else None
+        )
+        self.max_depth = max_depth
+        self.max_nodes = max(1, max_nodes)
+        self.concurrency = concurrency
+        fields = resolve_fields(fields)
+        if "related_anime" not in fields:
+            fields = resolve_fields((*fields, "related_anime"))
+        self.fields = fields
+
+    async def crawl(
+        self,
+        anime_ids: Union[str, Iterable[str]],
+        *,
+        token: Optional["TOKEN"] = None,
+    ) -> RelationGraph:
+        """
+        Crawl the relation graph from one or more anime
+        :param anime_ids: The ID, or IDs, of the anime to start from
+        :param token: The user's access token, or a ManagedToken
+        :return: RelationGraph
+        """
+        if isinstance(anime_ids, str):
+            anime_ids = [anime_ids]
+
+        graph = RelationGraph(self.fields)
+        frontier = list(dict.fromkeys(str(anime_id) for anime_id in anime_ids))
+        for anime_id in frontier:
+            graph.depths[anime_id] = 0
+
+        depth = 0
+        while frontier:
+            budget = self.max_nodes - len(graph.nodes) - len(graph.errors)
+            if len(frontier) > budget:
+                frontier = frontier[:budget]
+                graph.truncated = True
+
+            next_frontier = []
+            results = self._client.iter_anime_details_many(
+                anime_ids=frontier,
+                token=token,
+                concurrency=self.concurrency,
+                fields=self.fields,
+                raw=True,
+            )
+            async for anime_id, result in results:
+                if isinstance(result, Exception):
+                    graph.errors[anime_id] = result
+                    continue
+
+                graph.nodes[anime_id] = result
+                graph.edges[anime_id] = related = self._relations(result)
+                for related_id, _ in related:
+                    if related_id not in graph.depths:
+                        graph.depths[related_id] = depth + 1
+                        next_frontier.append(related_id)
+
+            depth += 1
+            if self.max_depth is not None and depth > self.max_depth:
+                break
+            frontier = next_frontier
+        return graph
+
+    def _relations(self, data: dict) -> list[tuple[str, RELATION_TYPE]]:
+        return [
+            (str(relation["node"]["id"]), relation.get("relation_type"))
+            for relation in data.get("related_anime") or ()
+            if self.relation_types is None
+            or relation.get("relation_type") in self.relation_types
+        ]
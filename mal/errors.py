@@ -1,11 +1,13 @@
-from aiohttp import ClientResponse
+from typing import Optional
+
+from mal.transport import Response
 
 
 class HTTPError(Exception):
     """Generic HTTP exception error"""
 
-    def __init__(self, response: ClientResponse, message: str, code: int):
-        self.response: ClientResponse = response
+    def __init__(self, response: Response, message: str, code: int):
+        self.response: Response = response
         self.message: str = message
         self.code: int = code
         super().__init__(message)
@@ -38,29 +40,73 @@ class OAuthConfigError(Exception):
         super().__init__(message)
 
 
+class FieldNotFetchedError(Exception):
+    """Exception when accessing a field that was not requested from the API"""
+
+    def __init__(self, field: str):
+        self.field: str = field
+        self.message: str = (
+            f"Field '{field}' Was Not Fetched, Request It Via The `fields` Parameter"
+        )
+        super().__init__(self.message)
+
+
+class RequestShedError(Exception):
+    """Exception when a low priority request is dropped while the API is under pressure"""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(message)
+
+
+class ReplayError(Exception):
+    """Exception when a replayed request matches no recorded exchange"""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(message)
+
+
+class CircuitOpenError(Exception):
+    """Exception when requests are failed fast because the API is unavailable"""
+
+    def __init__(self, message, retry_in: float):
+        self.message = message
+        self.retry_in: float = retry_in
+        super().__init__(message)
+
+
 class BadRequestError(HTTPError):
     """Exception when the API returns a 400 status code"""
 
-    def __init__(self, response: ClientResponse, message: str):
+    def __init__(self, response: Response, message: str):
         super().__init__(response, message, 400)
 
 
 class UnauthorizedError(HTTPError):
     """Exception when the API returns a 401 status code"""
 
-    def __init__(self, response: ClientResponse, message: str):
+    def __init__(self, response: Response, message: str):
         super().__init__(response, message, 401)
 
 
 class ForbiddenError(HTTPError):
     """Exception when the API returns a 403 status code"""
 
-    def __init__(self, response: ClientResponse, message: str):
+    def __init__(self, response: Response, message: str):
         super().__init__(response, message, 403)
 
 
 class NotFoundError(HTTPError):
     """Exception when the API returns a 404 status code"""
 
-    def __init__(self, response: ClientResponse, message: str):
+    def __init__(self, response: Response, message: str):
         super().__init__(response, message, 404)
+
+
+class TooManyRequestsError(HTTPError):
+    """Exception when the API returns a 429 status code"""
+
+    def __init__(self, response: Response, message: str, retry_after: Optional[float]):
+        self.retry_after: Optional[float] = retry_after
+        super().__init__(response, message, 429)
@@ -0,0 +1,93 @@
+from functools import lru_cache
+from typing import Iterable, Union
+
+from mal.errors import InputError
+from mal.types import FIELD_PROFILE
+
+ANIME_FIELDS = (
+    "id",
+    "title",
+    "main_picture",
+    "alternative_titles",
+    "start_date",
+    "end_date",
+    "synopsis",
+    "mean",
+    "rank",
+    "popularity",
+    "num_list_users",
+    "num_scoring_users",
+    "nsfw",
+    "genres",
+    "created_at",
+    "updated_at",
+    "media_type",
+    "status",
+    "my_list_status",
+    "num_episodes",
+    "start_season",
+    "broadcast",
+    "source",
+    "average_episode_duration",
+    "rating",
+    "pictures",
+    "background",
+    "related_anime",
+    "related_manga",
+    "recommendations",
+    "statistics",
+    "studios",
+)
+
+FIELD_PROFILES: dict[str, tuple[str, ...]] = {
+    "minimal": ("id", "title", "main_picture"),
+    "list": ("id", "title", "main_picture", "my_list_status"),
+    "full": ANIME_FIELDS,
+}
+
+# Returned by the API for every anime, whichever fields are requested
+DEFAULT_FIELDS = ("id", "title", "main_picture")
+
+FIELDS = Union[FIELD_PROFILE, Iterable[str]]
+
+
+def resolve_fields(fields: FIELDS) -> tuple[str, ...]:
+    """
+    Resolve a field profile or a custom set of fields to the fields to request
+    :param fields: The name of a profile in FIELD_PROFILES, or an iterable of names from
+        ANIME_FIELDS
+    :return: The field names, in a stable order so equal sets produce equal URLs
+    """
+    if isinstance(fields, str):
+        try:
+            return FIELD_PROFILES[fields]
+        except KeyError:
+            raise InputError(
+                f"Unknown Field Profile '{fields}', Expected One Of: {', '.join(FIELD_PROFILES)}"
+            )
+    fields = {*DEFAULT_FIELDS, *fields}
+    unknown = fields.difference(ANIME_FIELDS)
+    if unknown:
+        raise InputError(
+            f"Unknown Anime Fields: {', '.join(sorted(unknown))}, Expected Names From ANIME_FIELDS"
+        )
+    return tuple(sorted(fields))
+
+
+def field_set(fields: Iterable[str]) -> frozenset[str]:
+    """
+    Get the set of fields an anime was fetched with, including the fields the API always returns
+    :param fields: The requested field names
+    :return: frozenset[str]
+    """
+    if isinstance(fields, frozenset):
+        return fields
+    if isinstance(fields, tuple):
+        return _tuple_field_set(fields)
+    return frozenset((*DEFAULT_FIELDS, *fields))
+
+
+@lru_cache(maxsize=64)
+def _tuple_field_set(fields: tuple[str, ...]) -> frozenset[str]:
+    # Every anime of a response shares the tuple returned by resolve_fields
+    return frozenset((*DEFAULT_FIELDS, *fields))
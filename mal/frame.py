@@ -0,0 +1,351 @@
+from array import array
+from collections import Counter
+import heapq
+from math import isnan, nan
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from mal.errors import InputError
+from mal.models import Anime, _parse_date
+from mal.records import record_to_payload
+
+if TYPE_CHECKING:
+    from mal.client import Client
+
+NUMERIC_COLUMNS = (
+    "mean",
+    "rank",
+    "popularity",
+    "num_list_users",
+    "num_scoring_users",
+    "num_episodes",
+    "average_episode_duration",
+    "start_date",
+    "end_date",
+)
+CATEGORICAL_COLUMNS = ("media_type", "status", "rating", "source", "nsfw", "genres")
+DATE_COLUMNS = ("start_date", "end_date")
+
+
+def _payload(item: Union[Anime, dict, tuple]) -> dict:
+    if isinstance(item, Anime):
+        return item._data
+    if isinstance(item, tuple):
+        return record_to_payload(item)
+    return item
+
+
+def _date_ordinal(value: Optional[str]) -> Optional[int]:
+    parsed = _parse_date(value)
+    return parsed.toordinal() if parsed else None
+
+
+class _Columns:
+    """
+    Column buffers built once from the payloads, and shared by every frame derived from them.
+    Genres hold many values per anime, so they are stored as (row, code) pairs.
+    """
+
+    __slots__ = ("payloads", "numeric", "codes", "categories", "lookups", "genre_rows")
+
+    def __init__(self, payloads: list[dict]):
+        self.payloads = payloads
+        self.numeric = {}
+        self.codes = {}
+        self.categories = {}
+        self.lookups = {}
+
+        for name in NUMERIC_COLUMNS:
+            values = [data.get(name) for data in payloads]
+            if name in DATE_COLUMNS:
+                values = [_date_ordinal(value) for value in values]
+            self.numeric[name] = array(
+                "d", [nan if value is None else value for value in values]
+            )
+
+        for name in CATEGORICAL_COLUMNS:
+            self.lookups[name] = {}
+            if name != "genres":
+                self.codes[name] = array(
+                    "i", [self._encode(name, data.get(name)) for data in payloads]
+                )
+
+        self.genre_rows = array("l")
+        genre_codes = array("i")
+        for row, data in enumerate(payloads):
+            for genre in data.get("genres") or ():
+                self.genre_rows.append(row)
+                genre_codes.append(self._encode("genres", genre["name"]))
+        self.codes["genres"] = genre_codes
+
+        for name, lookup in self.lookups.items():
+            self.categories[name] = list(lookup)
+
+        if np is not None:
+            self.numeric = {name: np.asarray(col) for name, col in self.numeric.items()}
+            self.codes = {name: np.asarray(col) for name, col in self.codes.items()}
+            self.genre_rows = np.asarray(self.genre_rows)
+
+    def _encode(self, name: str, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        lookup = self.lookups[name]
+        return lookup.setdefault(value, len(lookup))
+
+
+class AnimeFrame:
+    """
+    Columnar container for filtering, sorting and ranking many anime without building models.
+
+    Numeric columns are held in NumPy arrays when NumPy is installed, and in `array` buffers
+    otherwise, with missing values stored as NaN and dates as proleptic Gregorian ordinals.
+    Categorical columns (media_type, status, rating, source, nsfw and genres) are dictionary
+    encoded. Filtering and sorting return new frames sharing the columns of the original one.
+    """
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, items: Iterable[Union[Anime, dict, tuple]] = ()):
+        """
+        :param items: Anime, raw anime payloads or AnimeRecords
+        """
+        payloads = [_payload(item) for item in items]
+        self._columns = _Columns(payloads)
+        self._index = (
+            np.arange(len(payloads)) if np is not None else range(len(payloads))
+        )
+
+    @classmethod
+    def _view(cls, columns: _Columns, index: Sequence[int]) -> "AnimeFrame":
+        frame = cls.__new__(cls)
+        frame._columns = columns
+        frame._index = index
+        return frame
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def ids(self) -> list[str]:
+        payloads = self._columns.payloads
+        return [str(payloads[i].get("id")) for i in self._index]
+
+    def column(self, name: str) -> Sequence[Any]:
+        """
+        Get the values of a column, in the frame's order
+        :param name: The name of a numeric or categorical column
+        :return: An array of floats for numeric columns, a list of values for categorical ones
+        (a list of genre names per anime for genres)
+        """
+        if name in NUMERIC_COLUMNS:
+            values = self._columns.numeric[name]
+            if np is not None:
+                return values[self._index]
+            return array("d", [values[i] for i in self._index])
+
+        if name == "genres":
+            payloads = self._columns.payloads
+            return [
+                [genre["name"] for genre in payloads[i].get("genres") or ()]
+                for i in self._index
+            ]
+
+        self._check_categorical(name)
+        codes = self._columns.codes[name]
+        categories = self._columns.categories[name]
+        return [categories[codes[i]] if codes[i] >= 0 else None for i in self._index]
+
+    def filter(
+        self, mask: Optional[Sequence[bool]] = None, **conditions: Any
+    ) -> "AnimeFrame":
+        """
+        Keep the anime matching every condition.
+        Numeric columns match a (low, high) range, with None for an open bound, or a single value.
+        Categorical columns match a value or any of an iterable of values, genres match anime
+        having any of the given genres. Anime missing a value never match.
+        :param mask: Booleans selecting the anime to keep, in the frame's order
+        :param conditions: Conditions on columns, e.g. mean=(8, None), media_type="tv"
+        :return: AnimeFrame
+        """
+        masks = [] if mask is None else [self._check_mask(mask)]
+        for name, condition in conditions.items():
+            if name in NUMERIC_COLUMNS:
+                masks.append(self._range_mask(name, condition))
+            else:
+                masks.append(self._category_mask(name, condition))
+
+        if not masks:
+            return self
+
+        if np is not None:
+            return self._view(self._columns, self._index[np.logical_and.reduce(masks)])
+        return self._view(
+            self._columns,
+            [i for i, keep in zip(self._index, map(all, zip(*masks))) if keep],
+        )
+
+    def sort(
+        self, by: Union[str, Sequence[float]], *, descending: bool = False
+    ) -> "AnimeFrame":
+        """
+        Sort the anime by a numeric column or by scores. Missing values are placed last.
+        :param by: The name of a numeric column, or a score per anime in the frame's order
+        :param descending: Sort from the highest to the lowest value
+        :return: AnimeFrame
+        """
+        values = self._values(by)
+        if np is not None:
+            order = np.argsort(-values if descending else values, kind="stable")
+            return self._view(self._columns, self._index[order])
+
+        sign = -1 if descending else 1
+        order = sorted(
+            range(len(values)),
+            key=lambda i: (isnan(values[i]), sign * values[i]),
+        )
+        return self._view(self._columns, [self._index[i] for i in order])
+
+    def top_k(
+        self, by: Union[str, Sequence[float]], k: int, *, descending: bool = True
+    ) -> "AnimeFrame":
+        """
+        Get the k anime with the highest (or lowest) values, skipping missing values
+        :param by: The name of a numeric column, or a score per anime in the frame's order
+        :param k: The number of anime to keep
+        :param descending: Keep the highest values, set to False to keep the lowest
+        :return: AnimeFrame, sorted by the values
+        """
+        values = self._values(by)
+        if k <= 0:
+            return self._view(self._columns, self._index[:0])
+
+        if np is not None:
+            keys = -values if descending else values
+            candidates = np.flatnonzero(~np.isnan(keys))
+            if k < len(candidates):
+                # Break ties at the cut-off by position, like the sorts do
+                kth = np.partition(keys[candidates], k - 1)[k - 1]
+                below = candidates[keys[candidates] < kth]
+                tied = candidates[keys[candidates] == kth][: k - len(below)]
+                candidates = np.concatenate((below, tied))
+            order = candidates[np.argsort(keys[candidates], kind="stable")]
+            return self._view(self._columns, self._index[order])
+
+        select = heapq.nlargest if descending else heapq.nsmallest
+        order = select(
+            k,
+            (i for i in range(len(values)) if not isnan(values[i])),
+            key=values.__getitem__,
+        )
+        return self._view(self._columns, [self._index[i] for i in order])
+
+    def group_counts(self, column: str) -> dict[str, int]:
+        """
+        Count the anime per value of a categorical column
+        :param column: The name of a categorical column
+        :return: dict[value, count], from the most to the least common value
+        """
+        self._check_categorical(column)
+        columns = self._columns
+        codes = columns.codes[column]
+        categories = columns.categories[column]
+
+        if np is not None:
+            if column == "genres":
+                selected = np.zeros(len(columns.payloads), dtype=bool)
+                selected[self._index] = True
+                codes = codes[selected[columns.genre_rows]]
+            else:
+                codes = codes[self._index]
+            counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+            order = np.argsort(-counts, kind="stable")
+            return {categories[c]: int(counts[c]) for c in order if counts[c]}
+
+        if column == "genres":
+            selected = set(self._index)
+            counts = Counter(
+                code for row, code in zip(columns.genre_rows, codes) if row in selected
+            )
+        else:
+            counts = Counter(codes[i] for i in self._index if codes[i] >= 0)
+        return {categories[c]: n for c, n in counts.most_common()}
+
+    def to_payloads(self) -> list[dict]:
+        """
+        :return: The raw anime payloads, in the frame's order
+        """
+        payloads = self._columns.payloads
+        return [payloads[i] for i in self._index]
+
+    def to_anime(self, *, client: Optional["Client"] = None) -> list[Anime]:
+        """
+        Build models for the anime, in the frame's order
+        :param client: The client used to fetch related anime
+        :return: list[Anime]
+        """
+        return [Anime(data, client=client) for data in self.to_payloads()]
+
+    def _values(self, by: Union[str, Sequence[float]]) -> Sequence[float]:
+        if isinstance(by, str):
+            if by not in NUMERIC_COLUMNS:
+                raise InputError(f"Cannot Sort By Non-Numeric Column: {by}")
+            return self.column(by)
+
+        values = np.asarray(by, dtype=float) if np is not None else array("d", by)
+        if len(values) != len(self):
+            raise InputError("Scores Must Be Given For Every Anime In The Frame")
+        return values
+
+    def _check_mask(self, mask: Sequence[bool]) -> Sequence[bool]:
+        if len(mask) != len(self):
+            raise InputError("Mask Must Be Given For Every Anime In The Frame")
+        return np.asarray(mask, dtype=bool) if np is not None else mask
+
+    def _check_categorical(self, name: str):
+        if name not in CATEGORICAL_COLUMNS:
+            raise InputError(f"Unknown Categorical Column: {name}")
+
+    def _range_mask(self, name: str, condition: Any) -> Sequence[bool]:
+        if isinstance(condition, tuple):
+            low, high = condition
+        else:
+            low = high = condition
+        if low is None:
+            low = -float("inf")
+        if high is None:
+            high = float("inf")
+
+        values = self.column(name)
+        if np is not None:
+            return (values >= low) & (values <= high)
+        return [low <= value <= high for value in values]
+
+    def _category_mask(self, name: str, condition: Any) -> Sequence[bool]:
+        self._check_categorical(name)
+        wanted_values = [condition] if isinstance(condition, str) else condition
+        lookup = self._columns.lookups[name]
+        wanted = [lookup[value] for value in wanted_values if value in lookup]
+        columns = self._columns
+        codes = columns.codes[name]
+
+        if np is not None:
+            if name != "genres":
+                return np.isin(codes[self._index], wanted)
+            matches = np.zeros(len(columns.payloads), dtype=bool)
+            matches[columns.genre_rows[np.isin(codes, wanted)]] = True
+            return matches[self._index]
+
+        wanted = set(wanted)
+        if name != "genres":
+            return [codes[i] in wanted for i in self._index]
+        matches = {
+            row for row, code in zip(columns.genre_rows, codes) if code in wanted
+        }
+        return [i in matches for i in self._index]
+
+    def __repr__(self):
+        return f"<AnimeFrame(len={len(self)})>"
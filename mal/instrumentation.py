@@ -0,0 +1,336 @@
+from abc import ABC, abstractmethod
+from math import log
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+# The timings recorded per endpoint, in seconds
+PHASES = ("dns", "connect", "first_byte", "total", "decode", "build")
+# Requests not sent by one of the client's public methods
+OTHER_ENDPOINT = "other"
+
+HISTOGRAM_MIN = 1e-5
+# Each bucket is ~19% wider than the last, so percentiles are within ~10% of the true value
+HISTOGRAM_GROWTH = 2**0.25
+
+
+class RequestMetrics:
+    """
+    Timings of a single HTTP request, in seconds since it was sent.
+    `dns` and `connect` are only set when a new connection had to be opened. `connect` includes
+    the DNS lookup and both the TCP and TLS handshakes, which aiohttp does not time separately.
+    """
+
+    __slots__ = (
+        "endpoint",
+        "method",
+        "url",
+        "status",
+        "bytes_received",
+        "connection_reused",
+        "error",
+        "dns",
+        "connect",
+        "first_byte",
+        "total",
+        "decode",
+        "started",
+        "_dns_started",
+        "_connect_started",
+    )
+
+    def __init__(self, endpoint: str, method: str, url: str):
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.status: Optional[int] = None
+        self.bytes_received = 0
+        self.connection_reused = False
+        # The exception the request raised, including HTTP errors such as NotFoundError
+        self.error: Optional[BaseException] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        # Until the response's status line and headers were received
+        self.first_byte: Optional[float] = None
+        # Until the whole body was received
+        self.total: Optional[float] = None
+        # Spent decoding the JSON body
+        self.decode: Optional[float] = None
+        self.started = time.perf_counter()
+        self._dns_started = 0.0
+        self._connect_started = 0.0
+
+    def __repr__(self):
+        return f"<RequestMetrics(endpoint={self.endpoint}, status={self.status}, total={self.total})>"
+
+
+class MetricsSink(ABC):
+    """Interface for sinks receiving the metrics recorded by an Instrumentation"""
+
+    @abstractmethod
+    def record_request(self, metrics: RequestMetrics):
+        """
+        Called once per HTTP request sent, including each retry
+        :param metrics: The request's timings
+        """
+
+    @abstractmethod
+    def record_build(self, endpoint: str, seconds: float):
+        """
+        Called once per model built from a response
+        :param endpoint: The client method that built the model
+        :param seconds: The time spent building it
+        """
+
+
+class CallbackSink(MetricsSink):
+    """Forwards the metrics to callbacks, e.g. to export them to a metrics system"""
+
+    def __init__(
+        self,
+        on_request: Optional[Callable[[RequestMetrics], None]] = None,
+        on_build: Optional[Callable[[str, float], None]] = None,
+    ):
+        """
+        :param on_request: Called with the metrics of every request
+        :param on_build: Called with the endpoint and duration of every model built
+        """
+        self.on_request = on_request
+        self.on_build = on_build
+
+    def record_request(self, metrics: RequestMetrics):
+        if self.on_request is not None:
+            self.on_request(metrics)
+
+    def record_build(self, endpoint: str, seconds: float):
+        if self.on_build is not None:
+            self.on_build(endpoint, seconds)
+
+
+class Histogram:
+    """Log-scale histogram of durations in seconds, using constant memory"""
+
+    __slots__ = ("buckets", "count", "sum", "max")
+
+    def __init__(self):
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        index = (
+            0
+            if value <= HISTOGRAM_MIN
+            else int(log(value / HISTOGRAM_MIN, HISTOGRAM_GROWTH)) + 1
+        )
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        :param percentile: Between 0 and 100
+        :return: The upper bound of the bucket holding the given percentile
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(percentile / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(HISTOGRAM_MIN * HISTOGRAM_GROWTH**index, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+    def __repr__(self):
+        return f"<Histogram(count={self.count}, p50={self.percentile(50):.4f}, p99={self.percentile(99):.4f})>"
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "errors", "statuses", "bytes_received", "timings")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.statuses: dict[int, int] = {}
+        self.bytes_received = 0
+        self.timings = {phase: Histogram() for phase in PHASES}
+
+
+class HistogramSink(MetricsSink):
+    """Aggregates the metrics in memory into per-endpoint histograms"""
+
+    def __init__(self):
+        self._endpoints: dict[str, _EndpointStats] = {}
+
+    def _stats(self, endpoint: str) -> _EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = _EndpointStats()
+        return stats
+
+    def record_request(self, metrics: RequestMetrics):
+        stats = self._stats(metrics.endpoint)
+        stats.requests += 1
+        if metrics.error is not None:
+            stats.errors += 1
+        if metrics.status is not None:
+            stats.statuses[metrics.status] = stats.statuses.get(metrics.status, 0) + 1
+        stats.bytes_received += metrics.bytes_received
+        for phase in PHASES[:-1]:
+            value = getattr(metrics, phase)
+            if value is not None:
+                stats.timings[phase].add(value)
+
+    def record_build(self, endpoint: str, seconds: float):
+        self._stats(endpoint).timings["build"].add(seconds)
+
+    def histogram(self, endpoint: str, phase: str) -> Histogram:
+        """
+        :param endpoint: The name of a client method, e.g. "get_anime_details"
+        :param phase: One of PHASES
+        :return: Histogram
+        """
+        return self._stats(endpoint).timings[phase]
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        :return: The counters and the percentiles of every timing recorded so far, per endpoint
+        """
+        return {
+            endpoint: {
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "statuses": dict(stats.statuses),
+                "bytes_received": stats.bytes_received,
+                "timings": {
+                    phase: histogram.to_dict()
+                    for phase, histogram in stats.timings.items()
+                    if histogram.count
+                },
+            }
+            for endpoint, stats in self._endpoints.items()
+        }
+
+    def reset(self):
+        self._endpoints.clear()
+
+    def __repr__(self):
+        return f"<HistogramSink(endpoints={len(self._endpoints)})>"
+
+
+class Instrumentation:
+    """
+    Records the timings, status codes and sizes of the client's requests, and the time spent
+    turning responses into models, broken down by the client method that sent them.
+    The connection timings come from an aiohttp TraceConfig, which is added to the client's
+    session. Pass `trace_configs=[instrumentation.trace_config()]` when creating a session
+    yourself to record them too.
+    """
+
+    def __init__(self, sinks: Iterable[MetricsSink] = ()):
+        """
+        :param sinks: Receive the metrics, more can be added with `add_sink`
+        """
+        self.sinks = list(sinks)
+        self._trace_config: Optional[aiohttp.TraceConfig] = None
+
+    def add_sink(self, sink: MetricsSink) -> MetricsSink:
+        self.sinks.append(sink)
+        return sink
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        if self._trace_config is None:
+            config = aiohttp.TraceConfig()
+            config.on_dns_resolvehost_start.append(_on_dns_start)
+            config.on_dns_resolvehost_end.append(_on_dns_end)
+            config.on_connection_create_start.append(_on_connect_start)
+            config.on_connection_create_end.append(_on_connect_end)
+            config.on_connection_reuseconn.append(_on_connection_reused)
+            config.on_request_end.append(_on_headers_received)
+            self._trace_config = config
+        return self._trace_config
+
+    def record_request(self, metrics: RequestMetrics):
+        for sink in self.sinks:
+            sink.record_request(metrics)
+
+    def record_build(self, endpoint: str, seconds: float):
+        for sink in self.sinks:
+            sink.record_build(endpoint, seconds)
+
+    def timed(self, endpoint: str, make: Callable[..., T]) -> Callable[..., T]:
+        """
+        Wrap a model factory so that every model it builds is timed
+        :param endpoint: The client method building the models
+        :param make: Builds a model from a payload
+        :return: The wrapped factory
+        """
+
+        def timed_make(*args: Any, **kwargs: Any) -> T:
+            started = time.perf_counter()
+            model = make(*args, **kwargs)
+            self.record_build(endpoint, time.perf_counter() - started)
+            return model
+
+        return timed_make
+
+    def __repr__(self):
+        return f"<Instrumentation(sinks={len(self.sinks)})>"
+
+
+def _metrics(context: SimpleNamespace) -> Optional[RequestMetrics]:
+    metrics = context.trace_request_ctx
+    return metrics if isinstance(metrics, RequestMetrics) else None
+
+
+async def _on_dns_start(session, context: SimpleNamespace, params):
+    metrics = _metrics(context)
+    if metrics is not None:
+        metrics._dns_started = time.perf_counter()
+
+
+async def _on_dns_end(session, context: SimpleNamespace, params):
+    metrics = _metrics(context)
+    if metrics is not None:
+        metrics.dns = time.perf_counter() - metrics._dns_started
+
+
+async def _on_connect_start(session, context: SimpleNamespace, params):
+    metrics = _metrics(context)
+    if metrics is not None:
+        metrics._connect_started = time.perf_counter()
+
+
+async def _on_connect_end(session, context: SimpleNamespace, params):
+    metrics = _metrics(context)
+    if metrics is not None:
+        metrics.connect = time.perf_counter() - metrics._connect_started
+
+
+async def _on_connection_reused(session, context: SimpleNamespace, params):
+    metrics = _metrics(context)
+    if metrics is not None:
+        metrics.connection_reused = True
+
+
+async def _on_headers_received(session, context: SimpleNamespace, params):
+    metrics = _metrics(context)
+    if metrics is not None:
+        metrics.first_byte = time.perf_counter() - metrics.started
@@ -0,0 +1,368 @@
+from abc import abstractmethod
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable, Literal, Optional, Union
+
+from mal.backend import Backend
+from mal.client import QUERY_LIMIT
+from mal.fields import FIELDS, resolve_fields
+from mal.models import Anime, WatchStatus, _parse_datetime
+
+if TYPE_CHECKING:
+    from mal.client import TOKEN, Client
+
+RECONCILE_INTERVAL = 24 * 3600.0
+SYNC_CONCURRENCY = 10
+
+CHANGE_KIND = Literal["added", "changed", "removed"]
+
+
+class ListSnapshot:
+    """A user's anime list as it was when last synced"""
+
+    __slots__ = ("entries", "updated_at", "reconciled_at")
+
+    def __init__(
+        self,
+        entries: Optional[dict[str, dict]] = None,
+        *,
+        updated_at: Optional[str] = None,
+        reconciled_at: float = 0.0,
+    ):
+        """
+        :param entries: Every anime on the list, keyed by its ID
+        :param updated_at: The most recent list update seen, as returned by the API
+        :param reconciled_at: The UNIX timestamp of the last full sync
+        """
+        self.entries = entries if entries is not None else {}
+        self.updated_at = updated_at
+        self.reconciled_at = reconciled_at
+
+    def __len__(self):
+        return len(self.entries)
+
+    def to_dict(self) -> dict:
+        return {
+            "entries": self.entries,
+            "updated_at": self.updated_at,
+            "reconciled_at": self.reconciled_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ListSnapshot":
+        return cls(
+            data["entries"],
+            updated_at=data.get("updated_at"),
+            reconciled_at=data.get("reconciled_at", 0.0),
+        )
+
+    def __repr__(self):
+        return (
+            f"<ListSnapshot(entries={len(self.entries)}, updated_at={self.updated_at})>"
+        )
+
+
+class ListChange:
+    """An anime added to, changed on or removed from a user's list since the last sync"""
+
+    __slots__ = ("kind", "anime_id", "entry", "previous", "fields")
+
+    def __init__(
+        self,
+        kind: CHANGE_KIND,
+        anime_id: str,
+        entry: Optional[dict],
+        previous: Optional[dict],
+        *,
+        fields: Optional[tuple[str, ...]] = None,
+    ):
+        """
+        :param kind: Whether the anime was added, changed or removed
+        :param anime_id: The anime's ID
+        :param entry: The anime's payload now, None when removed
+        :param previous: The anime's payload at the last sync, None when added
+        :param fields: The fields synced for each anime, None when unknown
+        """
+        self.kind = kind
+        self.anime_id = anime_id
+        self.entry = entry
+        self.previous = previous
+        self.fields = fields
+
+    @property
+    def anime(self) -> Anime:
+        """
+        The anime as it is now, or as it was before being removed.
+        Fields that were not synced raise FieldNotFetchedError.
+        """
+        data = self.entry if self.entry is not None else self.previous
+        return Anime(data, fields=self.fields)
+
+    @property
+    def watch_status(self) -> Optional[WatchStatus]:
+        return self._watch_status(self.entry)
+
+    @property
+    def previous_watch_status(self) -> Optional[WatchStatus]:
+        return self._watch_status(self.previous)
+
+    def _watch_status(self, entry: Optional[dict]) -> Optional[WatchStatus]:
+        if entry is None or entry.get("my_list_status") is None:
+            return None
+        return WatchStatus(entry["my_list_status"], anime_id=self.anime_id)
+
+    def __repr__(self):
+        return f"<ListChange(kind={self.kind}, anime_id={self.anime_id})>"
+
+
+class SnapshotStore(Backend):
+    """Interface for stores holding each user's list snapshot"""
+
+    @abstractmethod
+    def get(self, user_id: Hashable) -> Optional[ListSnapshot]:
+        pass
+
+    @abstractmethod
+    def set(self, user_id: Hashable, snapshot: ListSnapshot):
+        pass
+
+    @abstractmethod
+    def delete(self, user_id: Hashable):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemorySnapshotStore(SnapshotStore):
+    """In-memory snapshot store, snapshots are lost when the process exits"""
+
+    def __init__(self):
+        self._snapshots: dict[Hashable, ListSnapshot] = {}
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def get(self, user_id: Hashable) -> Optional[ListSnapshot]:
+        return self._snapshots.get(user_id)
+
+    def set(self, user_id: Hashable, snapshot: ListSnapshot):
+        self._snapshots[user_id] = snapshot
+
+    def delete(self, user_id: Hashable):
+        self._snapshots.pop(user_id, None)
+
+
+class SQLiteSnapshotStore(SnapshotStore):
+    """
+    Snapshot store persisted to a local SQLite database in WAL mode.
+    Queries may wait on other processes' locks, so the syncer runs them in worker threads.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, *, busy_timeout: float = 5.0):
+        """
+        :param path: The path of the database file
+        :param busy_timeout: Seconds to wait for another process to release a lock
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "user_id TEXT PRIMARY KEY, snapshot BLOB NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def get(self, user_id: Hashable) -> Optional[ListSnapshot]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot FROM snapshots WHERE user_id = ?", (str(user_id),)
+            ).fetchone()
+        return ListSnapshot.from_dict(json.loads(row[0])) if row else None
+
+    def set(self, user_id: Hashable, snapshot: ListSnapshot):
+        blob = json.dumps(snapshot.to_dict(), separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots (user_id, snapshot) VALUES (?, ?)",
+                (str(user_id), blob),
+            )
+
+    def delete(self, user_id: Hashable):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM snapshots WHERE user_id = ?", (str(user_id),)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ListSyncer:
+    """
+    Keeps local snapshots of users' anime lists up to date.
+
+    A sync walks the list sorted by `list_updated_at`, newest first, and stops at the first
+    entry updated before the snapshot's most recent update, so an unchanged list costs a
+    single request. Removed anime cannot be seen that way, so the whole list is walked, and
+    missing anime reported as removed, when there is no snapshot yet or every
+    `reconcile_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        *,
+        store: Optional[SnapshotStore] = None,
+        fields: FIELDS = "list",
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        on_change: Optional[Callable[[Hashable, ListChange], None]] = None,
+    ):
+        """
+        :param client: The client used to fetch the lists
+        :param store: Holds the users' snapshots, defaults to an in-memory store
+        :param fields: A field profile or the names of the fields kept for each anime,
+        `my_list_status` is always included
+        :param reconcile_interval: Seconds between full syncs of a user's list
+        :param on_change: Called with the user's ID and each change found
+        """
+        self._client = client
+        self.store = store if store is not None else MemorySnapshotStore()
+        fields = resolve_fields(fields)
+        if "my_list_status" not in fields:
+            fields = resolve_fields((*fields, "my_list_status"))
+        self.fields = fields
+        self.reconcile_interval = reconcile_interval
+        self.on_change = on_change
+
+    async def sync(
+        self, user_id: Hashable, *, token: "TOKEN", full: Optional[bool] = None
+    ) -> list[ListChange]:
+        """
+        Sync a user's snapshot with their list on MyAnimeList
+        :param user_id: Identifies the user within the app
+        :param token: The user's access token, or a ManagedToken
+        :param full: Walk the whole list, by default only when a reconciliation is due
+        :return: The changes since the last sync
+        """
+        snapshot = await self.store.call("get", user_id)
+        if full is None:
+            full = (
+                snapshot is None
+                or time.time() - snapshot.reconciled_at >= self.reconcile_interval
+            )
+        if snapshot is None:
+            snapshot = ListSnapshot()
+
+        watermark = None if full else _parse_datetime(snapshot.updated_at)
+        entries = dict(snapshot.entries) if not full else {}
+        changes = []
+        updated_at = snapshot.updated_at
+        latest = _parse_datetime(updated_at)
+        seen = set()
+
+        # An incremental sync usually stops within the first page, don't prefetch the next
+        pages = self._client.iter_user_anime_list(
+            token=token,
+            page_size=QUERY_LIMIT,
+            sort="list_updated_at",
+            status=None,
+            nsfw=True,
+            fields=self.fields,
+            raw=True,
+            prefetch=full,
+        )
+        try:
+            async for node in pages:
+                anime_id = str(node.get("id"))
+                list_updated_at = (node.get("my_list_status") or {}).get("updated_at")
+                entry_updated_at = _parse_datetime(list_updated_at)
+                if (
+                    watermark is not None
+                    and entry_updated_at is not None
+                    and entry_updated_at < watermark
+                ):
+                    break
+
+                seen.add(anime_id)
+                entries[anime_id] = node
+                change = self._diff(anime_id, snapshot.entries.get(anime_id), node)
+                if change is not None:
+                    changes.append(change)
+                if entry_updated_at is not None and (
+                    latest is None or entry_updated_at > latest
+                ):
+                    latest, updated_at = entry_updated_at, list_updated_at
+        finally:
+            await pages.aclose()
+
+        if full:
+            changes.extend(
+                ListChange("removed", anime_id, None, previous, fields=self.fields)
+                for anime_id, previous in snapshot.entries.items()
+                if anime_id not in seen
+            )
+
+        await self.store.call(
+            "set",
+            user_id,
+            ListSnapshot(
+                entries,
+                updated_at=updated_at,
+                reconciled_at=time.time() if full else snapshot.reconciled_at,
+            ),
+        )
+
+        if self.on_change is not None:
+            for change in changes:
+                self.on_change(user_id, change)
+        return changes
+
+    async def sync_many(
+        self,
+        users: Iterable[tuple[Hashable, "TOKEN"]],
+        *,
+        concurrency: int = SYNC_CONCURRENCY,
+    ) -> dict[Hashable, Union[list[ListChange], Exception]]:
+        """
+        Sync many users concurrently. A failed sync does not abort the others.
+        :param users: Pairs of the user's ID and their token
+        :param concurrency: The max number of users synced at once
+        :return: The changes, or the error, of each user keyed by their ID
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def sync_one(user_id: Hashable, token: "TOKEN"):
+            async with semaphore:
+                try:
+                    return user_id, await self.sync(user_id, token=token)
+                except Exception as e:
+                    return user_id, e
+
+        tasks = [asyncio.ensure_future(sync_one(*user)) for user in users]
+        try:
+            return dict(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _diff(
+        self, anime_id: str, previous: Optional[dict], entry: dict
+    ) -> Optional[ListChange]:
+        if previous is None:
+            return ListChange("added", anime_id, entry, None, fields=self.fields)
+        # Catalog fields such as the mean score change all the time, only the user's own
+        # list status matters
+        if previous.get("my_list_status") != entry.get("my_list_status"):
+            return ListChange("changed", anime_id, entry, previous, fields=self.fields)
+        return None
@@ -1,6 +1,10 @@
 from datetime import date, datetime
-from typing import TYPE_CHECKING, Optional
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
+from mal.errors import FieldNotFetchedError
+from mal.fields import FIELDS, field_set
+from mal.records import record_to_payload
 from mal.types import (
     ANIME_RATING,
     ANIME_SOURCE,
@@ -17,10 +21,33 @@ if TYPE_CHECKING:
     from mal.client import Client
 
 
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_datetime(
+    value: Optional[str], fmt: Optional[str] = None
+) -> Optional[datetime]:
+    try:
+        if fmt:
+            return datetime.strptime(value, fmt)
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
 class Auth:
     """MyAnimeList authorization model"""
 
+    __slots__ = ("_data",)
+
     def __init__(self, data):
+        # Record when the token expires, as expires_in is relative to when it was issued
+        if data.get("expires_at") is None and data.get("expires_in") is not None:
+            data = {**data, "expires_at": time.time() + data["expires_in"]}
         self._data = data
 
     @property
@@ -31,6 +58,11 @@ class Auth:
     def expires_in(self) -> int:
         return self._data.get("expires_in")
 
+    @property
+    def expires_at(self) -> Optional[float]:
+        """The UNIX timestamp at which the access token expires"""
+        return self._data.get("expires_at")
+
     @property
     def access_token(self) -> str:
         return self._data.get("access_token")
@@ -42,10 +74,18 @@ class Auth:
     def __repr__(self):
         return f"<Auth(token_type={self.token_type}, expires_in={self.expires_in}, access_token={self.access_token}, refresh_token={self.refresh_token})>"
 
+    def to_dict(self) -> dict:
+        """
+        :return: The tokens as a JSON serialisable dict, `Auth(data)` restores them
+        """
+        return dict(self._data)
+
 
 class User:
     """MyAnimeList user model"""
 
+    __slots__ = ("_data", "_birthday", "_joined_at")
+
     def __init__(self, data):
         self._data = data
 
@@ -68,10 +108,11 @@ class User:
     @property
     def birthday(self) -> Optional[date]:
         try:
-            date_string = self._data["birthday"]
-            return date.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._birthday
+        except AttributeError:
+            pass
+        self._birthday = _parse_date(self._data.get("birthday"))
+        return self._birthday
 
     @property
     def location(self) -> Optional[str]:
@@ -80,10 +121,13 @@ class User:
     @property
     def joined_at(self) -> Optional[datetime]:
         try:
-            date_string = self._data["joined_at"]
-            return datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%SZ")
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._joined_at
+        except AttributeError:
+            pass
+        self._joined_at = _parse_datetime(
+            self._data.get("joined_at"), "%Y-%m-%dT%H:%M:%SZ"
+        )
+        return self._joined_at
 
     @property
     def anime_stats(self) -> Optional[dict]:
@@ -104,199 +148,309 @@ class User:
 class Anime:
     """MyAnimeList anime model"""
 
-    def __init__(self, data, *, client: Optional["Client"] = None):
+    __slots__ = (
+        "_data",
+        "_client",
+        "_fields",
+        # Values derived from `_data`, set on first access
+        "_id",
+        "_title",
+        "_start_date",
+        "_end_date",
+        "_genres",
+        "_created_at",
+        "_updated_at",
+        "_my_list_status",
+        "_related_anime",
+        "_recommendations",
+        "_statistics",
+        "_studios",
+    )
+
+    def __init__(
+        self,
+        data,
+        *,
+        client: Optional["Client"] = None,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        """
+        :param data: The anime's payload
+        :param client: The client used to fetch related anime
+        :param fields: The fields that were requested, None if unknown.
+            Accessing a field that was not requested raises FieldNotFetchedError.
+        """
         self._data = data
         self._client = client
+        self._fields = field_set(fields) if fields is not None else None
+
+    @classmethod
+    def from_record(
+        cls, record: tuple, *, client: Optional["Client"] = None
+    ) -> "Anime":
+        """
+        Build an anime from a record returned by a client call made with `as_records=True`
+        :param record: AnimeRecord
+        :param client: The client used to fetch related anime
+        :return: Anime, limited to the fields the record holds
+        """
+        return cls(record_to_payload(record), client=client, fields=record._fields)
+
+    def _get(self, field: str, default: Any = None) -> Any:
+        if self._fields is not None and field not in self._fields:
+            raise FieldNotFetchedError(field)
+        return self._data.get(field, default)
+
+    @property
+    def fields(self) -> Optional[frozenset[str]]:
+        """The fields that were requested for this anime, None if unknown"""
+        return self._fields
 
     @property
     def id(self) -> str:
-        return str(self._data.get("id"))
+        try:
+            return self._id
+        except AttributeError:
+            pass
+        self._id = str(self._data.get("id"))
+        return self._id
 
     @property
     def title(self) -> "Title":
-        data = {
-            "canonical": self._data.get("title"),
-            "english": self._data.get("alternative_titles", {}).get("en"),
-            "japanese": self._data.get("alternative_titles", {}).get("ja"),
-            "synonyms": self._data.get("alternative_titles", {}).get("synonyms"),
-        }
-        return Title(data)
+        try:
+            return self._title
+        except AttributeError:
+            pass
+        data = {"canonical": self._get("title")}
+        # The canonical title is always returned, the others only when fetched
+        if self._fields is None or "alternative_titles" in self._fields:
+            alternative_titles = self._get("alternative_titles") or {}
+            data["english"] = alternative_titles.get("en")
+            data["japanese"] = alternative_titles.get("ja")
+            data["synonyms"] = alternative_titles.get("synonyms")
+        self._title = Title(data)
+        return self._title
 
     def main_picture(self, size: IMAGE_SIZE = "large") -> Optional[str]:
-        return self._data.get("main_picture", {}).get(size)
+        return self._get("main_picture", {}).get(size)
 
     def pictures(self, size: IMAGE_SIZE = "large") -> list[str]:
-        return [
-            image[size] for image in self._data.get("pictures", []) if image.get(size)
-        ]
+        return [image[size] for image in self._get("pictures", []) if image.get(size)]
 
     @property
     def start_date(self) -> Optional[date]:
         try:
-            date_string = self._data["start_date"]
-            return date.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._start_date
+        except AttributeError:
+            pass
+        self._start_date = _parse_date(self._get("start_date"))
+        return self._start_date
 
     @property
     def end_date(self) -> Optional[date]:
         try:
-            date_string = self._data["end_date"]
-            return date.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._end_date
+        except AttributeError:
+            pass
+        self._end_date = _parse_date(self._get("end_date"))
+        return self._end_date
 
     @property
     def synopsis(self) -> Optional[str]:
-        return self._data.get("synopsis")
+        return self._get("synopsis")
 
     @property
     def mean(self) -> Optional[float]:
-        return self._data.get("mean")
+        return self._get("mean")
 
     @property
     def rank(self) -> Optional[int]:
-        return self._data.get("rank")
+        return self._get("rank")
 
     @property
     def popularity(self) -> Optional[int]:
-        return self._data.get("popularity")
+        return self._get("popularity")
 
     @property
     def num_list_users(self) -> Optional[int]:
-        return self._data.get("num_list_users")
+        return self._get("num_list_users")
 
     @property
     def num_scoring_users(self) -> int:
-        return self._data.get("num_scoring_users")
+        return self._get("num_scoring_users")
 
     @property
     def nsfw(self) -> Optional[NSFW]:
-        return self._data.get("nsfw")
+        return self._get("nsfw")
 
     @property
     def genres(self) -> list[str]:
-        return [genre["name"] for genre in self._data.get("genres", [])]
+        try:
+            return self._genres
+        except AttributeError:
+            pass
+        self._genres = [genre["name"] for genre in self._get("genres", [])]
+        return self._genres
 
     @property
     def created_at(self) -> Optional[datetime]:
         try:
-            date_string = self._data["created_at"]
-            return datetime.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._created_at
+        except AttributeError:
+            pass
+        self._created_at = _parse_datetime(self._get("created_at"))
+        return self._created_at
 
     @property
     def updated_at(self) -> Optional[datetime]:
         try:
-            date_string = self._data["updated_at"]
-            return datetime.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._updated_at
+        except AttributeError:
+            pass
+        self._updated_at = _parse_datetime(self._get("updated_at"))
+        return self._updated_at
 
     @property
     def media_type(self) -> Optional[MEDIA_TYPE]:
-        return self._data.get("media_type")
+        return self._get("media_type")
 
     @property
     def status(self) -> Optional[ANIME_STATUS]:
-        return self._data.get("status")
+        return self._get("status")
 
     @property
     def my_list_status(self) -> Optional["WatchStatus"]:
-        if not self._data.get("my_list_status"):
-            return None
-        return WatchStatus(self._data.get("my_list_status"), anime_id=self.id)
+        try:
+            return self._my_list_status
+        except AttributeError:
+            pass
+        data = self._get("my_list_status")
+        self._my_list_status = WatchStatus(data, anime_id=self.id) if data else None
+        return self._my_list_status
 
     @property
     def num_episodes(self) -> Optional[int]:
-        return self._data.get("num_episodes")
+        return self._get("num_episodes")
 
     @property
     def year(self) -> Optional[str]:
-        return self._data.get("start_season", {}).get("year")
+        return self._get("start_season", {}).get("year")
 
     @property
     def season(self) -> Optional[str]:
-        return self._data.get("start_season", {}).get("season")
+        return self._get("start_season", {}).get("season")
 
     @property
     def broadcast(self) -> Optional[str]:
-        return self._data.get("broadcast")
+        return self._get("broadcast")
 
     @property
     def source(self) -> Optional[ANIME_SOURCE]:
-        return self._data.get("source")
+        return self._get("source")
 
     @property
     def average_episode_duration(self) -> Optional[int]:
-        return self._data.get("average_episode_duration")
+        return self._get("average_episode_duration")
 
     @property
     def rating(self) -> Optional[ANIME_RATING]:
-        return self._data.get("rating")
+        return self._get("rating")
 
     @property
     def background(self) -> Optional[str]:
-        return self._data.get("background")
+        return self._get("background")
 
     @property
     def related_anime(self) -> list["Relation"]:
-        data = self._data.get("related_anime", [])
-        return [Relation(anime, client=self._client) for anime in data]
+        try:
+            return self._related_anime
+        except AttributeError:
+            pass
+        data = self._get("related_anime", [])
+        self._related_anime = [Relation(anime, client=self._client) for anime in data]
+        return self._related_anime
 
     @property
     def recommendations(self) -> Optional[list["Recommendation"]]:
-        data = self._data.get("recommendations", [])
-        return [Recommendation(anime, client=self._client) for anime in data]
+        try:
+            return self._recommendations
+        except AttributeError:
+            pass
+        data = self._get("recommendations", [])
+        self._recommendations = [
+            Recommendation(anime, client=self._client) for anime in data
+        ]
+        return self._recommendations
 
     @property
     def statistics(self) -> Optional["Statistics"]:
-        data = self._data.get("statistics")
-        if not data:
-            return None
-        return Statistics(data)
+        try:
+            return self._statistics
+        except AttributeError:
+            pass
+        data = self._get("statistics")
+        self._statistics = Statistics(data) if data else None
+        return self._statistics
 
     @property
     def studios(self) -> Optional[list[str]]:
-        return [studio["name"] for studio in self._data.get("studios", [])]
+        try:
+            return self._studios
+        except AttributeError:
+            pass
+        self._studios = [studio["name"] for studio in self._get("studios", [])]
+        return self._studios
 
     def __repr__(self):
         return f"<Anime(id={self.id}, title={self.title})>"
 
 
 class Title:
-    """Represents the title of an anime"""
+    """
+    Represents the title of an anime.
+    The English and Japanese titles and the synonyms raise FieldNotFetchedError when
+    `alternative_titles` was not fetched.
+    """
+
+    __slots__ = ("_data",)
 
     def __init__(self, data):
         self._data = data
 
+    def _get(self, key: str) -> Any:
+        try:
+            return self._data[key]
+        except KeyError:
+            raise FieldNotFetchedError("alternative_titles")
+
     @property
     def canonical(self) -> Optional[str]:
         return self._data.get("canonical")
 
     @property
     def english(self) -> Optional[str]:
-        return self._data.get("english")
+        return self._get("english")
 
     @property
     def japanese(self) -> Optional[str]:
-        return self._data.get("japanese")
+        return self._get("japanese")
 
     @property
     def synonyms(self) -> Optional[list[str]]:
-        return self._data.get("synonyms")
+        return self._get("synonyms")
 
     def __str__(self):
         return f"{self.canonical}"
 
     def __repr__(self):
-        return f"<Title(original={self.canonical}, english={self.english}, japanese={self.japanese})>"
+        return f"<Title(original={self.canonical}, english={self._data.get('english')}, japanese={self._data.get('japanese')})>"
 
 
 class Statistics:
     """Represents the statistics of an anime"""
 
+    __slots__ = ("_data",)
+
     def __init__(self, data):
         self._data = data
 
@@ -331,6 +485,8 @@ class Statistics:
 class Relation:
     """Represents a relationship between anime, made by MAL"""
 
+    __slots__ = ("_data", "_client", "_id")
+
     def __init__(
         self,
         data,
@@ -342,7 +498,12 @@ class Relation:
 
     @property
     def id(self) -> str:
-        return str(self._data.get("node", {}).get("id"))
+        try:
+            return self._id
+        except AttributeError:
+            pass
+        self._id = str(self._data.get("node", {}).get("id"))
+        return self._id
 
     @property
     def title(self) -> str:
@@ -360,10 +521,10 @@ class Relation:
     def relation_type_formatted(self) -> str:
         return self._data.get("relation_type_formatted")
 
-    async def anime(self) -> Optional[Anime]:
+    async def anime(self, *, fields: FIELDS = "full") -> Optional[Anime]:
         if not self._client:
             raise ValueError("Client instance not provided for relation fetching")
-        return await self._client.get_anime_details(anime_id=self.id)
+        return await self._client.get_anime_details(anime_id=self.id, fields=fields)
 
     def __repr__(self):
         return f"<Relation(id={self.id}, relation_type={self.relation_type}, relation_type_formatted={self.relation_type_formatted})>"
@@ -372,13 +533,20 @@ class Relation:
 class Recommendation:
     """Represents an anime recommendation, made by MAL"""
 
+    __slots__ = ("_data", "_client", "_id")
+
     def __init__(self, data, *, client: Optional["Client"] = None):
         self._data = data
         self._client = client
 
     @property
     def id(self) -> str:
-        return str(self._data.get("node", {}).get("id"))
+        try:
+            return self._id
+        except AttributeError:
+            pass
+        self._id = str(self._data.get("node", {}).get("id"))
+        return self._id
 
     @property
     def title(self) -> str:
@@ -392,10 +560,10 @@ class Recommendation:
     def num_recommendations(self) -> int:
         return self._data.get("num_recommendations")
 
-    async def anime(self) -> Anime:
+    async def anime(self, *, fields: FIELDS = "full") -> Anime:
         if not self._client:
             raise ValueError("Client instance not provided to Recommendation instance")
-        return await self._client.get_anime_details(anime_id=self.id)
+        return await self._client.get_anime_details(anime_id=self.id, fields=fields)
 
     def __repr__(self):
         return f"<Recommendation(id={self.id}, title={self.title}, num_recommendations={self.num_recommendations})>"
@@ -404,6 +572,8 @@ class Recommendation:
 class WatchStatus:
     """Represents as user's watch status for an anime"""
 
+    __slots__ = ("_data", "_anime_id", "_start_date", "_finish_date", "_updated_at")
+
     def __init__(self, data, *, anime_id: str):
         self._data = data
         self._anime_id = anime_id
@@ -431,26 +601,29 @@ class WatchStatus:
     @property
     def start_date(self) -> Optional[date]:
         try:
-            date_string = self._data["start_date"]
-            return date.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._start_date
+        except AttributeError:
+            pass
+        self._start_date = _parse_date(self._data.get("start_date"))
+        return self._start_date
 
     @property
     def finish_date(self) -> Optional[date]:
         try:
-            date_string = self._data["finish_date"]
-            return date.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._finish_date
+        except AttributeError:
+            pass
+        self._finish_date = _parse_date(self._data.get("finish_date"))
+        return self._finish_date
 
     @property
     def updated_at(self) -> Optional[datetime]:
         try:
-            date_string = self._data["updated_at"]
-            return datetime.fromisoformat(date_string)
-        except (KeyError, TypeError, ValueError):
-            return None
+            return self._updated_at
+        except AttributeError:
+            pass
+        self._updated_at = _parse_datetime(self._data.get("updated_at"))
+        return self._updated_at
 
     @property
     def num_rewatches(self) -> int:
@@ -0,0 +1,174 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import time
+from typing import Optional
+
+RETRY_AFTER_DEFAULT = 5.0
+MAX_TOKEN_BUCKETS = 10_000
+
+
+class TokenBucket:
+    """
+    Async token bucket that adapts its rate to throttling.
+    When throttled, the bucket stops handing out tokens until the throttle expires, halves
+    its rate and then linearly recovers back to the configured rate over `recovery_period`.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: int,
+        min_rate: Optional[float] = None,
+        recovery_period: float = 60.0,
+    ):
+        """
+        :param rate: The sustained number of requests per second
+        :param burst: The max number of requests allowed back to back
+        :param min_rate: The lowest rate the bucket slows down to (defaults to a tenth of `rate`)
+        :param recovery_period: Seconds taken to recover from the lowest rate to `rate`
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1")
+
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.rate = rate
+        self.burst = burst
+        self.recovery_period = recovery_period
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        # Created on first use so that it binds to the loop the bucket is used from
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rate < self.max_rate:
+            recovered = self.max_rate * elapsed / self.recovery_period
+            self.rate = min(self.max_rate, self.rate + recovered)
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    async def acquire(self):
+        """Wait until a request may be sent. Waiters are served in arrival order."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def throttle(self, retry_after: float):
+        """
+        Stop handing out tokens for `retry_after` seconds and halve the rate
+        :param retry_after: Seconds to wait before the next request
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+        self._tokens = 0.0
+        self.rate = max(self.min_rate, self.rate / 2)
+
+
+class RateLimiter:
+    """
+    Client side rate limiter.
+    Requests made with a user's access token are limited by a bucket for that token,
+    requests made with only the app's client ID share a single app-level bucket.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 5.0,
+        burst: int = 10,
+        token_rate: float = 2.0,
+        token_burst: int = 5,
+        recovery_period: float = 60.0,
+    ):
+        """
+        :param rate: Requests per second sent with only the client ID
+        :param burst: Max number of back to back requests sent with only the client ID
+        :param token_rate: Requests per second sent with each user token
+        :param token_burst: Max number of back to back requests sent with each user token
+        :param recovery_period: Seconds a bucket takes to recover its rate after being throttled
+        """
+        self._token_rate = token_rate
+        self._token_burst = token_burst
+        self._recovery_period = recovery_period
+        self.app = TokenBucket(rate=rate, burst=burst, recovery_period=recovery_period)
+        self._tokens: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def bucket(self, token: Optional[str] = None) -> TokenBucket:
+        """
+        Get the bucket that limits requests sent with the given token
+        :param token: The user's access token, or None for app-level requests
+        :return: TokenBucket
+        """
+        if not token:
+            return self.app
+
+        bucket = self._tokens.get(token)
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=self._token_rate,
+                burst=self._token_burst,
+                recovery_period=self._recovery_period,
+            )
+            self._tokens[token] = bucket
+            self._evict_idle_buckets()
+        self._tokens.move_to_end(token)
+        return bucket
+
+    def _evict_idle_buckets(self):
+        while len(self._tokens) > MAX_TOKEN_BUCKETS:
+            self._tokens.popitem(last=False)
+
+    async def acquire(self, token: Optional[str] = None):
+        await self.bucket(token).acquire()
+
+    def throttle(
+        self, token: Optional[str] = None, retry_after: Optional[float] = None
+    ):
+        """
+        Slow down after the API responded with 429 Too Many Requests
+        :param token: The token the throttled request was sent with
+        :param retry_after: Seconds the API asked to wait for, if it said
+        """
+        self.bucket(token).throttle(
+            retry_after if retry_after is not None else RETRY_AFTER_DEFAULT
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header, given either as seconds or as an HTTP date
+    :param value: The header's value
+    :return: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,50 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable
+
+
+@lru_cache(maxsize=64)
+def record_type(fields: tuple[str, ...]) -> type:
+    """
+    Get the named tuple type holding the given anime fields
+    :param fields: The field names, as returned by resolve_fields
+    :return: A namedtuple type called AnimeRecord
+    """
+    return namedtuple("AnimeRecord", fields)
+
+
+def to_record(data: dict, fields: tuple[str, ...]) -> tuple:
+    """
+    Convert a raw anime payload to a record holding the given fields
+    :param data: The anime's payload
+    :param fields: The field names, as returned by resolve_fields
+    :return: AnimeRecord, with None for fields missing from the payload
+    """
+    return record_type(fields)._make(map(data.get, fields))
+
+
+def record_factory(fields: tuple[str, ...]) -> Callable[[dict], tuple]:
+    """
+    Get a function converting raw anime payloads to records holding the given fields
+    :param fields: The field names, as returned by resolve_fields
+    :return: Callable[[dict], AnimeRecord]
+    """
+    make = record_type(fields)._make
+
+    def factory(data: dict) -> tuple:
+        return make(map(data.get, fields))
+
+    return factory
+
+
+def record_to_payload(record: tuple) -> dict[str, Any]:
+    """
+    Convert a record back to an anime payload, dropping fields that were missing
+    :param record: AnimeRecord
+    :return: dict
+    """
+    return {
+        field: value
+        for field, value in zip(record._fields, record)
+        if value is not None
+    }
@@ -0,0 +1,365 @@
+import asyncio
+import base64
+from collections import deque
+import gzip
+import hashlib
+import json
+import threading
+import time
+from typing import IO, Any, Iterable, Optional, Union
+
+import aiohttp
+from multidict import CIMultiDict
+
+from mal.errors import ReplayError
+from mal.transport import Response, Transport
+
+# Replaced by a digest, so requests of the same user can still be told apart
+REDACTED_HEADERS = ("Authorization",)
+# Replaced in request forms and JSON response bodies
+REDACTED_FIELDS = (
+    "access_token",
+    "refresh_token",
+    "client_secret",
+    "code",
+    "code_verifier",
+)
+RECORDED_RESPONSE_HEADERS = ("Content-Type", "Retry-After")
+
+
+def _redact(value: str) -> str:
+    return "redacted:" + hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+def _user_digest(headers: Optional[dict[str, str]]) -> Optional[str]:
+    """
+    Tell apart the users requests were sent for, by the digest of their Authorization header
+    :param headers: A request's headers, live or recorded
+    :return: The digest, None for requests sent with only the client ID
+    """
+    value = next(
+        (v for k, v in (headers or {}).items() if k.lower() == "authorization"), None
+    )
+    if value is None:
+        return None
+    if value.startswith("redacted:"):
+        return value
+    # A recorded digest replayed as the token, e.g. by benchmarks.replay
+    _, _, credentials = value.partition(" ")
+    if credentials.startswith("redacted:"):
+        return credentials
+    return _redact(value)
+
+
+class Exchange:
+    """A recorded request and the response it received"""
+
+    __slots__ = (
+        "offset",
+        "method",
+        "url",
+        "headers",
+        "data",
+        "status",
+        "response_headers",
+        "body",
+        "latency",
+        "error",
+    )
+
+    def __init__(
+        self,
+        *,
+        offset: float,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: Optional[dict[str, Any]],
+        status: Optional[int],
+        response_headers: dict[str, str],
+        body: bytes,
+        latency: float,
+        error: Optional[str] = None,
+    ):
+        """
+        :param offset: Seconds between the start of the recording and the request
+        :param method: The HTTP method
+        :param url: The full URL
+        :param headers: The request's headers, redacted
+        :param data: The request's form, redacted
+        :param status: The response's status code, None if the request failed
+        :param response_headers: The response's headers needed to handle it
+        :param body: The response's body, redacted
+        :param latency: Seconds until the whole response was received, or the request failed
+        :param error: "timeout" or "connection" when the request failed without a response
+        """
+        self.offset = offset
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.data = data
+        self.status = status
+        self.response_headers = response_headers
+        self.body = body
+        self.latency = latency
+        self.error = error
+
+    def to_dict(self) -> dict:
+        data = {
+            "t": round(self.offset, 6),
+            "method": self.method,
+            "url": self.url,
+            "headers": self.headers,
+            "status": self.status,
+            "response_headers": self.response_headers,
+            "latency": round(self.latency, 6),
+        }
+        if self.data:
+            data["data"] = self.data
+        if self.error:
+            data["error"] = self.error
+        try:
+            data["body"] = self.body.decode()
+        except UnicodeDecodeError:
+            data["body_b64"] = base64.b64encode(self.body).decode()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Exchange":
+        if "body_b64" in data:
+            body = base64.b64decode(data["body_b64"])
+        else:
+            body = data.get("body", "").encode()
+        return cls(
+            offset=data["t"],
+            method=data["method"],
+            url=data["url"],
+            headers=data.get("headers", {}),
+            data=data.get("data"),
+            status=data.get("status"),
+            response_headers=data.get("response_headers", {}),
+            body=body,
+            latency=data.get("latency", 0.0),
+            error=data.get("error"),
+        )
+
+    def __repr__(self):
+        return f"<Exchange(method={self.method}, url={self.url}, status={self.status})>"
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def load_exchanges(path: str) -> list[Exchange]:
+    """
+    Read a recording made by a RecordingTransport
+    :param path: The recording's path, gzipped when it ends with .gz
+    :return: The exchanges in the order they were recorded
+    """
+    with _open(path, "r") as f:
+        return [Exchange.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+class RecordingTransport(Transport):
+    """
+    Records every exchange sent through another transport to a JSON Lines file, appending to
+    it if it exists. Credentials are redacted: tokens and secrets in forms and token responses
+    are replaced, and the Authorization header is replaced by a digest that still tells users
+    apart. Each exchange is written and flushed in a worker thread as it completes, so the
+    recording survives a crash without the disk stalling the event loop.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        path: str,
+        *,
+        redact_headers: Iterable[str] = REDACTED_HEADERS,
+        redact_fields: Iterable[str] = REDACTED_FIELDS,
+    ):
+        """
+        :param transport: Sends the requests, e.g. an AiohttpTransport
+        :param path: The file the exchanges are appended to, gzipped when it ends with .gz
+        :param redact_headers: The request headers replaced by a digest
+        :param redact_fields: The form fields and JSON response keys replaced by a digest
+        """
+        self._transport = transport
+        self.path = path
+        self.redact_headers = {header.lower() for header in redact_headers}
+        self.redact_fields = frozenset(redact_fields)
+        self.recorded = 0
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+        trace: Optional[Any] = None,
+    ) -> Response:
+        started_at = time.monotonic()
+        if self._started_at is None:
+            self._started_at = started_at
+
+        exchange = Exchange(
+            offset=started_at - self._started_at,
+            method=method,
+            url=url,
+            headers={
+                name: _redact(value) if name.lower() in self.redact_headers else value
+                for name, value in (headers or {}).items()
+            },
+            data=self._redact_fields(data) if data else None,
+            status=None,
+            response_headers={},
+            body=b"",
+            latency=0.0,
+        )
+        try:
+            resp = await self._transport.request(
+                method, url, headers=headers, data=data, trace=trace
+            )
+        except asyncio.TimeoutError:
+            exchange.error = "timeout"
+            raise
+        except aiohttp.ClientConnectionError:
+            exchange.error = "connection"
+            raise
+        finally:
+            exchange.latency = time.monotonic() - started_at
+            if exchange.error is not None:
+                await self._write(exchange)
+
+        exchange.status = resp.status
+        exchange.response_headers = {
+            name: resp.headers[name]
+            for name in RECORDED_RESPONSE_HEADERS
+            if name in resp.headers
+        }
+        exchange.body = self._redact_body(resp.body)
+        await self._write(exchange)
+        return resp
+
+    def _redact_fields(self, data: dict) -> dict:
+        return {
+            key: (
+                _redact(str(value))
+                if key in self.redact_fields and value is not None
+                else value
+            )
+            for key, value in data.items()
+        }
+
+    def _redact_body(self, body: bytes) -> bytes:
+        # Only token responses hold credentials, skip decoding anything else
+        if not any(field.encode() in body for field in self.redact_fields):
+            return body
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+        if not isinstance(data, dict) or not self.redact_fields & data.keys():
+            return body
+        return json.dumps(self._redact_fields(data), separators=(",", ":")).encode()
+
+    async def _write(self, exchange: Exchange):
+        line = json.dumps(exchange.to_dict(), separators=(",", ":")) + "\n"
+        await asyncio.to_thread(self._append, line)
+        self.recorded += 1
+
+    def _append(self, line: str):
+        with self._lock:
+            if self._file is None:
+                self._file = _open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+
+    async def close(self):
+        """Close the recording and the underlying transport"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        await self._transport.close()
+
+    def __repr__(self):
+        return f"<RecordingTransport(path={self.path}, recorded={self.recorded})>"
+
+
+class ReplayTransport(Transport):
+    """
+    Serves recorded exchanges without a network.
+    Requests are matched on their method, URL and user, told apart by the digest of their
+    Authorization header, so the same URL such as /users/@me serves each user their own
+    response. Sending a recorded digest as the token matches that user's exchanges. Each match
+    is served in the order it was recorded. Once only one is left it is served again for every
+    later request, unless `strict`.
+    """
+
+    def __init__(
+        self,
+        exchanges: Union[str, Iterable[Exchange]],
+        *,
+        speed: Optional[float] = 1.0,
+        strict: bool = False,
+    ):
+        """
+        :param exchanges: The path of a recording, or the exchanges to serve
+        :param speed: Divides the recorded latencies, e.g. 2 responds twice as fast as recorded
+            (None responds at once)
+        :param strict: Serve each exchange once, and raise ReplayError once they are used up
+        """
+        if isinstance(exchanges, str):
+            exchanges = load_exchanges(exchanges)
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive")
+
+        self.speed = speed
+        self.strict = strict
+        self.replayed = 0
+        self.misses = 0
+        self._exchanges: dict[tuple[str, str, Optional[str]], deque[Exchange]] = {}
+        for exchange in exchanges:
+            key = (exchange.method, exchange.url, _user_digest(exchange.headers))
+            self._exchanges.setdefault(key, deque()).append(exchange)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+        trace: Optional[Any] = None,
+    ) -> Response:
+        queue = self._exchanges.get((method, url, _user_digest(headers)))
+        if not queue:
+            self.misses += 1
+            raise ReplayError(f"No Recorded Exchange For: {method} {url}")
+        exchange = queue.popleft() if len(queue) > 1 or self.strict else queue[0]
+
+        if self.speed is not None and exchange.latency:
+            await asyncio.sleep(exchange.latency / self.speed)
+        self.replayed += 1
+
+        if exchange.error == "timeout":
+            raise asyncio.TimeoutError()
+        if exchange.error is not None:
+            raise aiohttp.ClientConnectionError(f"Recorded Connection Error: {url}")
+        return Response(
+            method,
+            url,
+            exchange.status,
+            CIMultiDict(exchange.response_headers),
+            exchange.body,
+        )
+
+    def __repr__(self):
+        return f"<ReplayTransport(replayed={self.replayed}, misses={self.misses})>"
@@ -0,0 +1,180 @@
+import asyncio
+from contextlib import contextmanager
+import random
+import time
+from typing import Iterable, Iterator, Optional
+
+import aiohttp
+
+from mal.errors import CircuitOpenError, HTTPError
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Whether an error is caused by the network or a degraded upstream, rather than the request
+    :param exc: The error raised by the request
+    :return: bool
+    """
+    if isinstance(exc, HTTPError):
+        return exc.code >= 500
+    return isinstance(
+        exc,
+        (
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            asyncio.TimeoutError,
+        ),
+    )
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with capped exponential backoff and full jitter.
+    Only idempotent methods are retried unless a request explicitly opts in.
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        deadline: float = 30.0,
+        statuses: Iterable[int] = RETRY_STATUSES,
+        methods: Iterable[str] = ("GET",),
+    ):
+        """
+        :param attempts: The max number of attempts, including the first one
+        :param base_delay: Seconds to back off for after the first failure, doubled after each retry
+        :param max_delay: The max number of seconds to back off for between attempts
+        :param deadline: Seconds after the first attempt is sent by which the request must
+            complete. Time queued for a scheduler slot or the rate limiter before that does not
+            count. No retry is started past it, and an attempt still waiting on its response is
+            cancelled with asyncio.TimeoutError
+        :param statuses: Response status codes that are retried
+        :param methods: HTTP methods that are retried by default
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    def should_retry(self, exc: Exception) -> bool:
+        if isinstance(exc, HTTPError):
+            return exc.code in self.statuses
+        return is_transient(exc)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        :param attempt: The number of attempts made so far
+        :param retry_after: Seconds the API asked to wait for, if it said
+        :return: Seconds to wait before the next attempt
+        """
+        delay = random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class Deadline:
+    """
+    The time a request and its retries have left, counted from when its first attempt is sent
+    """
+
+    __slots__ = ("seconds", "expires_at")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at: Optional[float] = None
+
+    def remaining(self) -> float:
+        """
+        Start the deadline if no attempt was sent yet
+        :return: Seconds left before it expires
+        """
+        if self.expires_at is None:
+            self.expires_at = time.monotonic() + self.seconds
+        return self.expires_at - time.monotonic()
+
+    def allows(self, delay: float) -> bool:
+        """
+        :param delay: Seconds to wait for before the next attempt
+        :return: Whether the next attempt would start before the deadline
+        """
+        return self.expires_at is None or time.monotonic() + delay <= self.expires_at
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the API is degraded.
+    After `failure_threshold` consecutive transient failures the circuit opens and requests
+    raise CircuitOpenError without being sent. Once `recovery_timeout` has passed a single
+    probe request is let through, closing the circuit if it succeeds or reopening it if not.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        :param failure_threshold: Consecutive transient failures that open the circuit
+        :param recovery_timeout: Seconds the circuit stays open before a probe is let through
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Guard a request, raising CircuitOpenError instead of running it while the circuit is open
+        """
+        self._before_request()
+        try:
+            yield
+        except Exception as e:
+            self._record(failed=is_transient(e))
+            raise
+        except BaseException:
+            # Cancelled, so nothing was learned about the API's health
+            self._probing = False
+            raise
+        else:
+            self._record(failed=False)
+
+    def _before_request(self):
+        if self.state == self.CLOSED:
+            return
+
+        retry_in = self._opened_at + self.recovery_timeout - time.monotonic()
+        if self.state == self.OPEN and retry_in <= 0:
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(
+            "Circuit Open: MyAnimeList API Is Unavailable", max(0.0, retry_in)
+        )
+
+    def _record(self, *, failed: bool):
+        self._probing = False
+        if not failed:
+            self.state = self.CLOSED
+            self.failures = 0
+            return
+
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
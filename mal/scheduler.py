@@ -0,0 +1,334 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import time
+from typing import AsyncIterator, Hashable, Iterator, Optional
+
+from mal.errors import InputError, RequestShedError
+from mal.types import PRIORITY
+
+WAIT_SAMPLES = 1024
+PRIORITIES: tuple[PRIORITY, ...] = ("interactive", "normal", "background")
+DEFAULT_PRIORITY: PRIORITY = "normal"
+LATENCY_SMOOTHING = 0.2
+
+_priority: ContextVar[PRIORITY] = ContextVar("mal_priority", default=DEFAULT_PRIORITY)
+
+
+@contextmanager
+def priority(level: PRIORITY) -> Iterator[None]:
+    """
+    Send every request made within the block, including from tasks it creates, with a priority
+    :param level: "interactive", "normal" or "background"
+    """
+    if level not in PRIORITIES:
+        raise InputError(f"Unknown Priority: {level}")
+
+    reset_token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(reset_token)
+
+
+def current_priority() -> PRIORITY:
+    """
+    :return: The priority requests made from the current context are sent with
+    """
+    return _priority.get()
+
+
+class SchedulerStats:
+    """Counters and recent queue wait times of a scheduler"""
+
+    __slots__ = ("dispatched", "cancelled", "shed", "waits")
+
+    def __init__(self):
+        self.dispatched = 0
+        self.cancelled = 0
+        self.shed = 0
+        self.waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def wait_percentile(self, percentile: float) -> float:
+        """
+        :param percentile: Between 0 and 100
+        :return: Seconds spent queued by the given percentile of recent requests
+        """
+        if not self.waits:
+            return 0.0
+        waits = sorted(self.waits)
+        index = round(percentile / 100 * (len(waits) - 1))
+        return waits[max(0, min(index, len(waits) - 1))]
+
+    def __repr__(self):
+        return f"<SchedulerStats(dispatched={self.dispatched}, cancelled={self.cancelled}, shed={self.shed}, p50_wait={self.wait_percentile(50):.3f}, p99_wait={self.wait_percentile(99):.3f})>"
+
+
+class _Tenant:
+    __slots__ = ("key", "in_flight", "queues")
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.in_flight = 0
+        self.queues = 0
+
+
+class _Queue:
+    """The requests of a tenant waiting in one priority lane"""
+
+    __slots__ = ("tenant", "waiters", "turns")
+
+    def __init__(self, tenant: _Tenant):
+        self.tenant = tenant
+        self.waiters: deque[tuple[asyncio.Future, float]] = deque()
+        self.turns = 0
+
+
+class FairScheduler:
+    """
+    Schedules requests by priority, and fairly between the tokens they are sent with.
+
+    Queued requests are dispatched from the highest priority lane first. Within a lane, every
+    token has its own queue and the queues are served in round-robin order (`weights` lets a
+    token be served several times per round). Each token has a cap on requests in flight,
+    under a global cap. Requests sent with only the client ID share a queue.
+
+    The scheduler is under pressure for `pressure_window` seconds after a 429 response, or
+    while the smoothed request latency exceeds `latency_threshold`. Background requests are
+    then limited to `pressure_background_concurrency` in flight, and those queued for longer
+    than `shed_after` seconds are dropped with RequestShedError.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 20,
+        per_token_concurrency: int = 4,
+        weights: Optional[dict[str, int]] = None,
+        pressure_window: float = 30.0,
+        latency_threshold: Optional[float] = None,
+        pressure_background_concurrency: int = 1,
+        shed_after: Optional[float] = None,
+    ):
+        """
+        :param max_concurrency: The max number of requests in flight across every token
+        :param per_token_concurrency: The max number of requests in flight per token
+        :param weights: Requests dispatched per round for each token, defaults to 1
+        :param pressure_window: Seconds the scheduler stays under pressure after a 429 response
+        :param latency_threshold: Smoothed latency in seconds above which the scheduler is
+        under pressure (disabled when None)
+        :param pressure_background_concurrency: The max number of background requests in flight
+        while under pressure
+        :param shed_after: Seconds a background request may be queued for under pressure before
+        it is dropped (disabled when None)
+        """
+        if max_concurrency < 1 or per_token_concurrency < 1:
+            raise ValueError("Concurrency limits must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.per_token_concurrency = per_token_concurrency
+        self.weights = dict(weights or {})
+        self.pressure_window = pressure_window
+        self.latency_threshold = latency_threshold
+        self.pressure_background_concurrency = max(1, pressure_background_concurrency)
+        self.shed_after = shed_after
+        self.stats = SchedulerStats()
+        self.latency = 0.0
+
+        self._tenants: dict[Hashable, _Tenant] = {}
+        # Per lane, the queues with waiting requests in the order they are served
+        self._lanes: dict[PRIORITY, OrderedDict[Hashable, _Queue]] = {
+            level: OrderedDict() for level in PRIORITIES
+        }
+        self._lane_in_flight = dict.fromkeys(PRIORITIES, 0)
+        self._in_flight = 0
+        self._queued = 0
+        self._throttled_until = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def under_pressure(self) -> bool:
+        if time.monotonic() < self._throttled_until:
+            return True
+        return (
+            self.latency_threshold is not None and self.latency > self.latency_threshold
+        )
+
+    def queue_depth(
+        self, token: Optional[str] = None, *, priority: Optional[PRIORITY] = None
+    ) -> int:
+        """
+        :param token: The token, or None for requests sent with only the client ID
+        :param priority: Only count requests queued with this priority
+        :return: The number of requests queued for the token
+        """
+        levels = PRIORITIES if priority is None else (priority,)
+        return sum(
+            len(self._lanes[level][token].waiters)
+            for level in levels
+            if token in self._lanes[level]
+        )
+
+    def throttled(self):
+        """Put the scheduler under pressure after the API responded with 429"""
+        self._throttled_until = time.monotonic() + self.pressure_window
+
+    @asynccontextmanager
+    async def slot(
+        self, token: Optional[str] = None, priority: Optional[PRIORITY] = None
+    ) -> AsyncIterator[None]:
+        """
+        Wait for the turn of a request sent with the given token, and hold its slot until done
+        :param token: The token, or None for requests sent with only the client ID
+        :param priority: The request's priority, defaults to the current context's
+        """
+        level = priority or current_priority()
+        if level not in PRIORITIES:
+            raise InputError(f"Unknown Priority: {level}")
+
+        tenant = await self._acquire(token, level)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            latency = time.monotonic() - started_at
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+            self._release(tenant, level)
+
+    def _tenant(self, key: Hashable) -> _Tenant:
+        tenant = self._tenants.get(key)
+        if tenant is None:
+            tenant = self._tenants[key] = _Tenant(key)
+        return tenant
+
+    def _can_start(self, tenant: _Tenant, level: PRIORITY) -> bool:
+        if tenant.in_flight >= self.per_token_concurrency:
+            return False
+        if level == "background" and self.under_pressure:
+            return self._lane_in_flight[level] < self.pressure_background_concurrency
+        return True
+
+    async def _acquire(self, key: Hashable, level: PRIORITY) -> _Tenant:
+        tenant = self._tenant(key)
+        if (
+            not self._queued
+            and self._in_flight < self.max_concurrency
+            and self._can_start(tenant, level)
+        ):
+            self._start(tenant, level, 0.0)
+            return tenant
+
+        lane = self._lanes[level]
+        queue = lane.get(key)
+        if queue is None:
+            queue = lane[key] = _Queue(tenant)
+            tenant.queues += 1
+        waiter = asyncio.get_running_loop().create_future()
+        queue.waiters.append((waiter, time.monotonic()))
+        self._queued += 1
+        self._dispatch()
+
+        try:
+            await self._wait(waiter, level)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Given a slot just as the wait ended, hand it to the next request
+                self._release(tenant, level)
+            else:
+                waiter.cancel()
+                self._discard(queue, level, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                self.stats.cancelled += 1
+            raise
+        return tenant
+
+    async def _wait(self, waiter: asyncio.Future, level: PRIORITY):
+        if level != "background" or self.shed_after is None:
+            await waiter
+            return
+
+        while True:
+            done, _ = await asyncio.wait((waiter,), timeout=self.shed_after)
+            if done:
+                return
+            if self.under_pressure:
+                self.stats.shed += 1
+                raise RequestShedError(
+                    "Background Request Dropped: MyAnimeList API Is Under Pressure"
+                )
+
+    def _start(self, tenant: _Tenant, level: PRIORITY, waited: float):
+        tenant.in_flight += 1
+        self._lane_in_flight[level] += 1
+        self._in_flight += 1
+        self.stats.dispatched += 1
+        self.stats.waits.append(waited)
+
+    def _release(self, tenant: _Tenant, level: PRIORITY):
+        tenant.in_flight -= 1
+        self._lane_in_flight[level] -= 1
+        self._in_flight -= 1
+        self._forget_if_idle(tenant)
+        self._dispatch()
+
+    def _discard(self, queue: _Queue, level: PRIORITY, waiter: asyncio.Future):
+        for entry in queue.waiters:
+            if entry[0] is waiter:
+                queue.waiters.remove(entry)
+                self._queued -= 1
+                break
+        if not queue.waiters:
+            self._drop_queue(queue, level)
+        self._forget_if_idle(queue.tenant)
+
+    def _drop_queue(self, queue: _Queue, level: PRIORITY):
+        if self._lanes[level].get(queue.tenant.key) is queue:
+            del self._lanes[level][queue.tenant.key]
+            queue.tenant.queues -= 1
+
+    def _forget_if_idle(self, tenant: _Tenant):
+        if not tenant.in_flight and not tenant.queues:
+            self._tenants.pop(tenant.key, None)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._in_flight < self.max_concurrency:
+            found = self._next_queue()
+            if found is None:
+                return
+
+            queue, level = found
+            waiter, enqueued_at = queue.waiters.popleft()
+            self._queued -= 1
+            if not queue.waiters:
+                self._drop_queue(queue, level)
+            if waiter.done():
+                # Cancelled, its task has yet to resume and clean up after itself
+                self._forget_if_idle(queue.tenant)
+                continue
+
+            queue.turns += 1
+            if queue.waiters and queue.turns >= self.weights.get(queue.tenant.key, 1):
+                queue.turns = 0
+                self._lanes[level].move_to_end(queue.tenant.key)
+
+            self._start(queue.tenant, level, now - enqueued_at)
+            waiter.set_result(None)
+
+    def _next_queue(self) -> Optional[tuple[_Queue, PRIORITY]]:
+        for level, lane in self._lanes.items():
+            for queue in lane.values():
+                if self._can_start(queue.tenant, level):
+                    return queue, level
+        return None
+
+    def __repr__(self):
+        return f"<FairScheduler(in_flight={self._in_flight}, queued={self._queued}, tenants={len(self._tenants)})>"
@@ -0,0 +1,198 @@
+import asyncio
+from concurrent.futures import Future
+import os
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, TypeVar, Union
+
+from mal.client import ANIME_RESULT, Client
+from mal.models import Auth, User, WatchStatus
+
+T = TypeVar("T")
+
+
+class SyncClient:
+    """
+    Blocking facade of Client for synchronous code, e.g. Django views or Celery tasks.
+    Calls run on a single event loop in a background thread, which owns the Client, so every
+    thread calling it shares the same pooled connections, cache and in-flight requests.
+    The loop is started on first use, and again in a forked child process.
+    """
+
+    def __init__(self, *, timeout: Optional[float] = None, **options: Any):
+        """
+        :param timeout: Seconds a call may take before it is cancelled and raises
+            concurrent.futures.TimeoutError (None waits forever)
+        :param options: Passed to Client, e.g. client_id, cache or rate_limiter
+        """
+        self.timeout = timeout
+        self._options = options
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[Client] = None
+        self._pid: Optional[int] = None
+
+    def __enter__(self) -> "SyncClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=loop.run_forever, name="mal-sync-client", daemon=True
+        )
+        thread.start()
+
+        async def create_client() -> Client:
+            # Built on the loop, so that anything it binds to a loop is bound to this one
+            return Client(**self._options)
+
+        try:
+            client = self._submit(create_client(), loop).result()
+        except BaseException:
+            self._stop(loop, thread)
+            raise
+
+        # The loop is published last, other threads only check it before using the client
+        self._client, self._thread, self._pid = client, thread, os.getpid()
+        self._loop = loop
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the background loop, starting it on first use. A forked child does not inherit the
+        parent's thread, so it starts its own loop and client.
+        :return: asyncio.AbstractEventLoop
+        """
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    self._start()
+        return self._loop
+
+    @staticmethod
+    def _stop(loop: asyncio.AbstractEventLoop, thread: threading.Thread):
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _submit(
+        self,
+        coro: Coroutine[Any, Any, T],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> "Future[T]":
+        return asyncio.run_coroutine_threadsafe(coro, loop or self._loop)
+
+    @property
+    def client(self) -> Client:
+        """The async Client owned by the background loop, only use it through `run`"""
+        self._get_loop()
+        return self._client
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a coroutine on the background loop and wait for its result,
+        e.g. `sync.run(sync.client.tokens.access_token(user_id))`
+        :param coro: The coroutine to run
+        :return: The coroutine's result
+        """
+        loop = self._get_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("SyncClient cannot be called from its own event loop")
+
+        future = self._submit(coro, loop)
+        try:
+            return future.result(self.timeout)
+        except BaseException:
+            # Timed out or interrupted, don't leave the request running on the loop
+            future.cancel()
+            raise
+
+    def _iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        loop = self._get_loop()
+        try:
+            while True:
+                try:
+                    yield self.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Skipped when abandoned after close, rather than starting a new loop to close it
+            if self._loop is loop:
+                self.run(iterator.aclose())
+
+    def get_auth(self) -> tuple[str, str]:
+        """See Client.get_auth"""
+        return self.client.get_auth()
+
+    def get_access_token(self, authorization_code: str, code_verifier: str) -> Auth:
+        """See Client.get_access_token"""
+        return self.run(self.client.get_access_token(authorization_code, code_verifier))
+
+    def refresh_token(self, refresh_token: str) -> Auth:
+        """See Client.refresh_token"""
+        return self.run(self.client.refresh_token(refresh_token))
+
+    def get_user_details(self, **kwargs: Any) -> User:
+        """See Client.get_user_details"""
+        return self.run(self.client.get_user_details(**kwargs))
+
+    def get_user_anime_list(self, **kwargs: Any) -> list[ANIME_RESULT]:
+        """See Client.get_user_anime_list"""
+        return self.run(self.client.get_user_anime_list(**kwargs))
+
+    def iter_user_anime_list(self, **kwargs: Any) -> Iterator[ANIME_RESULT]:
+        """See Client.iter_user_anime_list, pages are fetched as the iterator advances"""
+        return self._iterate(self.client.iter_user_anime_list(**kwargs))
+
+    def search_anime(self, **kwargs: Any) -> list[ANIME_RESULT]:
+        """See Client.search_anime"""
+        return self.run(self.client.search_anime(**kwargs))
+
+    def iter_search_anime(self, **kwargs: Any) -> Iterator[ANIME_RESULT]:
+        """See Client.iter_search_anime, pages are fetched as the iterator advances"""
+        return self._iterate(self.client.iter_search_anime(**kwargs))
+
+    def get_anime_details(self, **kwargs: Any) -> ANIME_RESULT:
+        """See Client.get_anime_details"""
+        return self.run(self.client.get_anime_details(**kwargs))
+
+    def get_anime_details_many(
+        self, **kwargs: Any
+    ) -> list[Union[ANIME_RESULT, Exception]]:
+        """See Client.get_anime_details_many"""
+        return self.run(self.client.get_anime_details_many(**kwargs))
+
+    def iter_anime_details_many(
+        self, **kwargs: Any
+    ) -> Iterator[tuple[str, Union[ANIME_RESULT, Exception]]]:
+        """See Client.iter_anime_details_many"""
+        return self._iterate(self.client.iter_anime_details_many(**kwargs))
+
+    def update_watch_status(self, **kwargs: Any) -> WatchStatus:
+        """See Client.update_watch_status"""
+        return self.run(self.client.update_watch_status(**kwargs))
+
+    def close(self):
+        """
+        Close the client, sending its pending writes, then stop the background loop.
+        The next call starts a new one.
+        """
+        with self._lock:
+            if self._loop is None:
+                return
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = None
+
+            # A forked child has no loop thread to stop, the parent's loop is left to it
+            if self._pid != os.getpid():
+                return
+            try:
+                self._submit(client.close(), loop).result(self.timeout)
+            finally:
+                self._stop(loop, thread)
+
+    def __repr__(self):
+        return f"<SyncClient(running={self._loop is not None})>"
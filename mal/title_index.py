@@ -0,0 +1,276 @@
+from bisect import bisect_left, insort
+import heapq
+from math import ceil, inf
+from typing import TYPE_CHECKING, Iterable, Literal, Optional, Union, get_args
+import unicodedata
+
+from mal.errors import InputError
+from mal.fields import resolve_fields
+from mal.frame import _payload
+from mal.models import Anime
+
+if TYPE_CHECKING:
+    from mal.client import Client
+
+# The fields an anime needs to be indexed and ranked
+INDEX_FIELDS = resolve_fields(("alternative_titles", "mean", "popularity"))
+MIN_SIMILARITY = 0.6
+# Fetched by the API fallback, so a miss also warms the index
+FALLBACK_LIMIT = 20
+
+RANK_BY = Literal["popularity", "mean"]
+
+# Match quality, a fuzzy match scores its trigram similarity, between 0 and 1
+_TITLE_PREFIX = 3.0
+_WORD_PREFIX = 2.0
+_EXACT_BONUS = 1.0
+
+
+def _normalize(text: str) -> str:
+    """Casefold, strip accents and collapse punctuation, so "Pokémon: XY" becomes "pokemon xy" """
+    text = unicodedata.normalize("NFKD", text.casefold())
+    chars = []
+    for char in text:
+        if char.isalnum():
+            chars.append(char)
+        elif char in "'’" or unicodedata.combining(char):
+            continue
+        else:
+            chars.append(" ")
+    return " ".join("".join(chars).split())
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _titles(data: dict) -> list[str]:
+    alternative_titles = data.get("alternative_titles") or {}
+    titles = [
+        data.get("title"),
+        alternative_titles.get("en"),
+        alternative_titles.get("ja"),
+        *(alternative_titles.get("synonyms") or ()),
+    ]
+    return [title for title in titles if title]
+
+
+class TitleIndex:
+    """
+    In-process index of anime titles, for autocomplete without a request per keystroke.
+
+    Every title of an anime is indexed: the canonical title, the English and Japanese titles and
+    the synonyms. A query matches an anime when it is a prefix of one of its titles, or of a word
+    within one, and, for queries of 3 or more characters, when enough of its trigrams appear in
+    one (so typos still match). Matches are ranked by quality, then by popularity or mean score.
+    """
+
+    def __init__(self, items: Iterable[Union[Anime, dict, tuple]] = ()):
+        """
+        :param items: Anime, API payloads or AnimeRecords to index, e.g. cached search results or
+        the entries of a ListSnapshot
+        """
+        self._anime: dict[str, dict] = {}
+        # Normalized titles, and their word suffixes, in sorted order for prefix lookups
+        self._keys: list[str] = []
+        self._postings: dict[str, dict[str, float]] = {}
+        self._trigram_postings: dict[str, set[str]] = {}
+        self._anime_keys: dict[str, list[str]] = {}
+        self._anime_trigrams: dict[str, set[str]] = {}
+        self.add(items)
+
+    def __len__(self):
+        return len(self._anime)
+
+    def __contains__(self, anime_id: str):
+        return str(anime_id) in self._anime
+
+    def add(
+        self, items: Union[Anime, dict, tuple, Iterable[Union[Anime, dict, tuple]]]
+    ):
+        """
+        Index anime, replacing the entries of anime already indexed
+        :param items: An anime, API payload or AnimeRecord, or an iterable of them.
+        `alternative_titles`, `popularity` and `mean` are used when fetched
+        """
+        # A single AnimeRecord is a named tuple, not an iterable of anime
+        if isinstance(items, (Anime, dict)) or hasattr(items, "_fields"):
+            items = [items]
+
+        new_keys = []
+        for item in items:
+            data = _payload(item)
+            anime_id = str(data["id"])
+            self.remove(anime_id)
+            self._anime[anime_id] = data
+
+            keys: dict[str, float] = {}
+            trigrams: set[str] = set()
+            for title in _titles(data):
+                normalized = _normalize(title)
+                if not normalized:
+                    continue
+                words = normalized.split(" ")
+                keys[normalized] = _TITLE_PREFIX
+                for i in range(1, len(words)):
+                    keys.setdefault(" ".join(words[i:]), _WORD_PREFIX)
+                trigrams |= _trigrams(normalized)
+
+            for key, quality in keys.items():
+                postings = self._postings.get(key)
+                if postings is None:
+                    postings = self._postings[key] = {}
+                    new_keys.append(key)
+                postings[anime_id] = quality
+            for trigram in trigrams:
+                self._trigram_postings.setdefault(trigram, set()).add(anime_id)
+            self._anime_keys[anime_id] = list(keys)
+            self._anime_trigrams[anime_id] = trigrams
+
+        # Insert a few keys in place, but re-sort on bulk loads
+        if len(new_keys) > len(self._keys) // 8:
+            self._keys.extend(new_keys)
+            self._keys.sort()
+        else:
+            for key in new_keys:
+                insort(self._keys, key)
+
+    def remove(self, anime_id: str):
+        """
+        :param anime_id: The ID of the anime to drop from the index
+        """
+        anime_id = str(anime_id)
+        if self._anime.pop(anime_id, None) is None:
+            return
+
+        for key in self._anime_keys.pop(anime_id):
+            postings = self._postings[key]
+            del postings[anime_id]
+            if not postings:
+                del self._postings[key]
+                del self._keys[bisect_left(self._keys, key)]
+        for trigram in self._anime_trigrams.pop(anime_id):
+            postings = self._trigram_postings[trigram]
+            postings.discard(anime_id)
+            if not postings:
+                del self._trigram_postings[trigram]
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 10,
+        rank_by: RANK_BY = "popularity",
+        fuzzy: bool = True,
+        min_similarity: float = MIN_SIMILARITY,
+        raw: bool = False,
+        client: Optional["Client"] = None,
+    ) -> list[Union[Anime, dict]]:
+        """
+        Search the indexed titles. Unlike `search_anime`, queries of any length are accepted.
+        :param query: The search query
+        :param limit: The max number of anime returned
+        :param rank_by: Order equally good matches by "popularity" or "mean" score
+        :param fuzzy: Also match titles sharing most of the query's trigrams
+        :param min_similarity: The share of the query's trigrams a fuzzy match must contain
+        :param raw: Return the indexed payloads as dicts instead of Anime
+        :param client: The client used by the returned Anime to fetch related anime
+        :return: list[Anime | dict]
+        """
+        if rank_by not in get_args(RANK_BY):
+            raise InputError(
+                f"Unknown Rank '{rank_by}', Expected One Of: {', '.join(get_args(RANK_BY))}"
+            )
+        query = _normalize(query)
+        if not query or limit <= 0:
+            return []
+
+        scores: dict[str, float] = {}
+        for i in range(bisect_left(self._keys, query), len(self._keys)):
+            key = self._keys[i]
+            if not key.startswith(query):
+                break
+            bonus = _EXACT_BONUS if key == query else 0.0
+            for anime_id, quality in self._postings[key].items():
+                if quality + bonus > scores.get(anime_id, 0.0):
+                    scores[anime_id] = quality + bonus
+
+        # Fuzzy matches always rank below prefix matches, so skip them once there are enough
+        if fuzzy and len(query) >= 3 and len(scores) < limit:
+            trigrams = sorted(
+                _trigrams(query),
+                key=lambda trigram: len(self._trigram_postings.get(trigram, ())),
+            )
+            required = max(1, ceil(min_similarity * len(trigrams)))
+            # A match shares at least one of the rarest trigrams beyond the ones it may miss,
+            # so only their postings are scanned for candidates
+            candidates: set[str] = set()
+            for trigram in trigrams[: len(trigrams) - required + 1]:
+                candidates.update(self._trigram_postings.get(trigram, ()))
+            for anime_id in candidates - scores.keys():
+                anime_trigrams = self._anime_trigrams[anime_id]
+                shared = sum(trigram in anime_trigrams for trigram in trigrams)
+                if shared >= required:
+                    scores[anime_id] = shared / len(trigrams)
+
+        order = self._popularity if rank_by == "popularity" else self._mean
+        best = heapq.nsmallest(
+            limit, scores, key=lambda anime_id: (-scores[anime_id], order(anime_id))
+        )
+        if raw:
+            return [self._anime[anime_id] for anime_id in best]
+        return [Anime(self._anime[anime_id], client=client) for anime_id in best]
+
+    async def search_or_fetch(
+        self,
+        query: str,
+        *,
+        client: "Client",
+        limit: int = 10,
+        rank_by: RANK_BY = "popularity",
+        raw: bool = False,
+    ) -> list[Union[Anime, dict]]:
+        """
+        Search the indexed titles, and fall back to `search_anime` when nothing matches.
+        The anime fetched by the fallback are added to the index.
+        :param query: The search query
+        :param client: The client used to search MyAnimeList
+        :param limit: The max number of anime returned
+        :param rank_by: Order equally good matches by "popularity" or "mean" score
+        :param raw: Return payloads as dicts instead of Anime
+        :return: list[Anime | dict]
+        """
+        results = self.search(
+            query, limit=limit, rank_by=rank_by, raw=raw, client=client
+        )
+        # The API rejects queries shorter than 3 characters
+        if results or len(query.strip()) < 3:
+            return results
+
+        payloads = await client.search_anime(
+            query=query.strip(),
+            limit=max(limit, FALLBACK_LIMIT),
+            fields=INDEX_FIELDS,
+            raw=True,
+        )
+        self.add(payloads)
+        # MyAnimeList matches more loosely than the index, keep its results if the index can't
+        results = self.search(
+            query, limit=limit, rank_by=rank_by, raw=raw, client=client
+        )
+        if results:
+            return results
+        payloads = payloads[:limit]
+        return payloads if raw else [Anime(data, client=client) for data in payloads]
+
+    def _popularity(self, anime_id: str) -> float:
+        popularity = self._anime[anime_id].get("popularity")
+        return popularity if popularity is not None else inf
+
+    def _mean(self, anime_id: str) -> float:
+        mean = self._anime[anime_id].get("mean")
+        return -mean if mean is not None else inf
+
+    def __repr__(self):
+        return f"<TitleIndex(anime={len(self._anime)}, keys={len(self._keys)})>"
@@ -0,0 +1,216 @@
+from abc import ABC, abstractmethod
+import asyncio
+import time
+from typing import TYPE_CHECKING, Hashable, Optional
+
+from mal.errors import AuthenticationError
+from mal.models import Auth
+
+if TYPE_CHECKING:
+    from mal.client import Client
+
+REFRESH_MARGIN = 300.0
+
+
+class TokenStore(ABC):
+    """
+    Interface for stores holding each user's OAuth tokens.
+    Implement it to persist tokens, e.g. in a database, using `Auth.to_dict()`.
+    """
+
+    @abstractmethod
+    def get(self, user_id: Hashable) -> Optional[Auth]:
+        """
+        Get a user's tokens
+        :param user_id: Identifies the user within the app
+        :return: Auth, or None if none are stored for the user
+        """
+
+    @abstractmethod
+    def set(self, user_id: Hashable, auth: Auth):
+        """
+        Store a user's tokens, replacing the previous ones
+        :param user_id: Identifies the user within the app
+        :param auth: The user's tokens
+        """
+
+    @abstractmethod
+    def delete(self, user_id: Hashable):
+        pass
+
+
+class MemoryTokenStore(TokenStore):
+    """In-memory token store, tokens are lost when the process exits"""
+
+    def __init__(self):
+        self._tokens: dict[Hashable, Auth] = {}
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def get(self, user_id: Hashable) -> Optional[Auth]:
+        return self._tokens.get(user_id)
+
+    def set(self, user_id: Hashable, auth: Auth):
+        self._tokens[user_id] = auth
+
+    def delete(self, user_id: Hashable):
+        self._tokens.pop(user_id, None)
+
+
+class ManagedToken:
+    """
+    A user's token, kept fresh by a TokenManager.
+    Pass it as the `token` of any client call in place of an access token.
+    """
+
+    __slots__ = ("_manager", "user_id")
+
+    def __init__(self, manager: "TokenManager", user_id: Hashable):
+        self._manager = manager
+        self.user_id = user_id
+
+    async def access_token(self) -> str:
+        return await self._manager.access_token(self.user_id)
+
+    async def refresh(self, *, stale_token: Optional[str] = None) -> str:
+        auth = await self._manager.refresh(self.user_id, stale_token=stale_token)
+        return auth.access_token
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ManagedToken)
+            and other._manager is self._manager
+            and other.user_id == self.user_id
+        )
+
+    def __hash__(self):
+        return hash((id(self._manager), self.user_id))
+
+    def __repr__(self):
+        return f"<ManagedToken(user_id={self.user_id!r})>"
+
+
+class TokenManager:
+    """
+    Tracks when each user's access token expires and refreshes it before it does.
+    Tokens are refreshed in the background once they are within `refresh_margin` seconds of
+    expiring, and in place once they have expired. Only one refresh runs per user at a time,
+    concurrent callers wait for it and share its result.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        *,
+        store: Optional[TokenStore] = None,
+        refresh_margin: float = REFRESH_MARGIN,
+    ):
+        """
+        :param client: The client used to refresh tokens
+        :param store: Holds the users' tokens, defaults to an in-memory store
+        :param refresh_margin: Seconds before expiry at which a token is refreshed
+        """
+        self._client = client
+        self.store = store if store is not None else MemoryTokenStore()
+        self.refresh_margin = refresh_margin
+        self._refreshes: dict[Hashable, asyncio.Task] = {}
+
+    def add(self, user_id: Hashable, auth: Auth) -> ManagedToken:
+        """
+        Start managing a user's tokens
+        :param user_id: Identifies the user within the app
+        :param auth: The tokens returned by `get_access_token` or `refresh_token`
+        :return: ManagedToken
+        """
+        self.store.set(user_id, auth)
+        return ManagedToken(self, user_id)
+
+    def token(self, user_id: Hashable) -> ManagedToken:
+        """
+        Get a handle on the tokens of a user that were previously added
+        :param user_id: Identifies the user within the app
+        :return: ManagedToken
+        """
+        return ManagedToken(self, user_id)
+
+    def remove(self, user_id: Hashable):
+        self.store.delete(user_id)
+
+    def _get_auth(self, user_id: Hashable) -> Auth:
+        auth = self.store.get(user_id)
+        if auth is None:
+            raise AuthenticationError(f"No Tokens Stored For User: {user_id}")
+        return auth
+
+    async def access_token(self, user_id: Hashable) -> str:
+        """
+        Get a user's access token, refreshing it first if it has expired
+        :param user_id: Identifies the user within the app
+        :return: The access token
+        """
+        auth = self._get_auth(user_id)
+        if auth.expires_at is None:
+            return auth.access_token
+
+        expires_in = auth.expires_at - time.time()
+        if expires_in <= 0:
+            auth = await self.refresh(user_id, stale_token=auth.access_token)
+        elif expires_in <= self.refresh_margin:
+            self._refresh_in_background(user_id, auth.access_token)
+        return auth.access_token
+
+    async def refresh(
+        self, user_id: Hashable, *, stale_token: Optional[str] = None
+    ) -> Auth:
+        """
+        Refresh a user's tokens, or join the refresh already running for them
+        :param user_id: Identifies the user within the app
+        :param stale_token: The access token found to be expired, the refresh is skipped if the
+        stored token has already been replaced
+        :return: The user's new tokens
+        """
+        auth = self._get_auth(user_id)
+        if stale_token is not None and auth.access_token != stale_token:
+            return auth
+        task = self._refreshes.get(user_id)
+        if task is None:
+            # Callers going away must not cancel it: once the refresh token is sent MAL
+            # rotates it, so the new tokens have to be stored or the user is logged out
+            task = asyncio.ensure_future(self._refresh(user_id))
+            self._refreshes[user_id] = task
+            task.add_done_callback(lambda _: self._refresh_done(user_id, task))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, user_id: Hashable) -> Auth:
+        auth = self._get_auth(user_id)
+        if not auth.refresh_token:
+            raise AuthenticationError(f"No Refresh Token Stored For User: {user_id}")
+
+        refreshed = await self._client.refresh_token(auth.refresh_token)
+        if not refreshed.refresh_token:
+            refreshed = Auth(
+                {**refreshed.to_dict(), "refresh_token": auth.refresh_token}
+            )
+        self.store.set(user_id, refreshed)
+        return refreshed
+
+    def _refresh_done(self, user_id: Hashable, task: asyncio.Task):
+        if self._refreshes.get(user_id) is task:
+            del self._refreshes[user_id]
+        # Retrieve the error in case every caller went away before it finished
+        if not task.cancelled():
+            task.exception()
+
+    async def close(self):
+        """Wait for the refreshes in flight, so that the tokens they rotate are stored"""
+        if self._refreshes:
+            await asyncio.gather(*self._refreshes.values(), return_exceptions=True)
+
+    def _refresh_in_background(self, user_id: Hashable, stale_token: str):
+        if user_id in self._refreshes:
+            return
+
+        task = self._client._spawn(self.refresh(user_id, stale_token=stale_token))
+        # A failed background refresh is retried on the next call, or raised once expired
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
@@ -0,0 +1,403 @@
+from abc import ABC, abstractmethod
+import asyncio
+from http import HTTPStatus
+import inspect
+import json
+import re
+import time
+from typing import Any, Awaitable, Callable, Mapping, Optional, Pattern, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from mal.instrumentation import RequestMetrics
+
+CONNECTOR_LIMIT = 100
+CONNECTOR_LIMIT_PER_HOST = 30
+KEEPALIVE_TIMEOUT = 30.0
+DNS_CACHE_TTL = 300
+
+
+class Response:
+    """
+    A response received by a transport, its body already read.
+    It mirrors the parts of aiohttp.ClientResponse that were read from HTTPError.response,
+    which used to be one: `status`, `reason`, `headers`, `content_type`, and the coroutines
+    `read()`, `text()` and `json()`.
+    """
+
+    __slots__ = ("method", "url", "status", "headers", "body")
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+    ):
+        """
+        :param method: The HTTP method of the request
+        :param url: The URL of the request
+        :param status: The response's status code
+        :param headers: The response's headers, looked up case-insensitively
+        :param body: The response's body
+        """
+        self.method = method
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def get_encoding(self) -> str:
+        """
+        :return: The charset of the Content-Type header, defaults to utf-8
+        """
+        content_type = self.headers.get("Content-Type", "")
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    @property
+    def reason(self) -> str:
+        """The status code's reason phrase, e.g. Not Found"""
+        try:
+            return HTTPStatus(self.status).phrase
+        except ValueError:
+            return ""
+
+    @property
+    def content_type(self) -> str:
+        """The Content-Type header's media type, without its parameters"""
+        return self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self.body.decode(encoding or self.get_encoding())
+
+    async def json(self) -> Any:
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"<Response(method={self.method}, url={self.url}, status={self.status})>"
+
+
+class Transport(ABC):
+    """
+    Interface for the transports sending the client's requests.
+    Implement it to send requests over another HTTP library, or to serve them without a network.
+    """
+
+    @abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+        trace: Optional[Any] = None,
+    ) -> Response:
+        """
+        Send a request and read its response
+        :param method: The HTTP method
+        :param url: The full URL, including the query string
+        :param headers: The request's headers
+        :param data: Sent as a form-encoded body
+        :param trace: Passed to the aiohttp trace callbacks, transports may ignore it
+        :return: Response
+        """
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(Transport):
+    """Sends requests over a single pooled aiohttp session, the client's default transport"""
+
+    def __init__(
+        self,
+        *,
+        session: Optional[aiohttp.ClientSession] = None,
+        connector_limit: int = CONNECTOR_LIMIT,
+        connector_limit_per_host: int = CONNECTOR_LIMIT_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: Optional[int] = DNS_CACHE_TTL,
+        trace_configs: Optional[list[aiohttp.TraceConfig]] = None,
+    ):
+        """
+        :param session: An externally managed session, the transport will not close it
+        :param connector_limit: Max number of open connections in the pool
+        :param connector_limit_per_host: Max number of open connections per host
+        :param keepalive_timeout: Seconds an idle connection is kept alive for reuse
+        :param dns_cache_ttl: Seconds resolved addresses are cached for (None caches forever)
+        :param trace_configs: Added to the session the transport creates
+        """
+        self._session = session
+        self._owns_session = session is None
+        self._connector_limit = connector_limit
+        self._connector_limit_per_host = connector_limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_cache_ttl = dns_cache_ttl
+        self._trace_configs = trace_configs
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self._connector_limit,
+            limit_per_host=self._connector_limit_per_host,
+            keepalive_timeout=self._keepalive_timeout,
+            ttl_dns_cache=self._dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        return aiohttp.ClientSession(
+            connector=connector, trace_configs=self._trace_configs
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session, lazily creating it on first use (or after close)
+        so that it is bound to the running event loop
+        :return: aiohttp.ClientSession
+        """
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = self._create_session()
+            self._owns_session = True
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+        trace: Optional[Any] = None,
+    ) -> Response:
+        session = self._get_session()
+        async with session.request(
+            method, url, headers=headers, data=data, trace_request_ctx=trace
+        ) as resp:
+            body = await resp.read()
+        return Response(method, url, resp.status, resp.headers, body)
+
+    async def close(self):
+        """
+        Close the pooled session and release its connections.
+        Externally provided sessions are left open for their owner to close.
+        """
+        if self._session and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+
+class HTTP2Transport(Transport):
+    """
+    Sends requests over HTTP/2 with httpx, multiplexing concurrent requests to a host as
+    streams of a single connection instead of opening a socket per request in flight.
+    Requires the `http2` extra. Servers without HTTP/2 support are spoken to over HTTP/1.1.
+    """
+
+    def __init__(
+        self,
+        *,
+        http_client: Optional["httpx.AsyncClient"] = None,
+        max_connections: int = CONNECTOR_LIMIT,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        timeout: Optional[float] = 300.0,
+    ):
+        """
+        :param http_client: An externally managed httpx client, the transport will not close it
+        :param max_connections: Max number of open connections, only reached by HTTP/1.1 hosts
+        :param keepalive_timeout: Seconds an idle connection is kept alive for reuse
+        :param timeout: Seconds connecting, sending or reading a response may each take
+            (None waits forever)
+        """
+        if httpx is None:
+            raise ImportError(
+                "HTTP2Transport requires httpx, install mal-py[http2] to use it"
+            )
+        self._http_client = http_client
+        self._owns_client = http_client is None
+        self._max_connections = max_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        """
+        Get the httpx client, lazily creating it on first use (or after close)
+        :return: httpx.AsyncClient
+        """
+        if self._http_client is None or (
+            self._owns_client and self._http_client.is_closed
+        ):
+            self._http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    keepalive_expiry=self._keepalive_timeout,
+                ),
+                timeout=self._timeout,
+            )
+            self._owns_client = True
+        return self._http_client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+        trace: Optional[Any] = None,
+    ) -> Response:
+        client = self._get_client()
+        request = client.build_request(method, url, headers=headers, data=data)
+        # Surface failures as the aiohttp errors the retry policy and callers handle
+        try:
+            resp = await client.send(request, stream=True)
+            try:
+                if isinstance(trace, RequestMetrics):
+                    trace.first_byte = time.perf_counter() - trace.started
+                body = await resp.aread()
+            finally:
+                await resp.aclose()
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            raise aiohttp.ClientConnectionError(str(e)) from e
+        return Response(method, url, resp.status_code, resp.headers, body)
+
+    async def close(self):
+        """
+        Close the httpx client and release its connections.
+        Externally provided clients are left open for their owner to close.
+        """
+        if self._http_client and self._owns_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+class Request:
+    """A request received by a MemoryTransport"""
+
+    __slots__ = ("method", "url", "path", "query", "headers", "data", "match")
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        data: Optional[dict[str, Any]],
+        match: Optional[re.Match] = None,
+    ):
+        """
+        :param method: The HTTP method
+        :param url: The full URL
+        :param headers: The request's headers
+        :param data: The request's form
+        :param match: The match of the route's path pattern, holding its groups
+        """
+        split = urlsplit(url)
+        self.method = method
+        self.url = url
+        self.path = split.path
+        self.query = dict(parse_qsl(split.query))
+        self.headers = headers
+        self.data = data
+        self.match = match
+
+    def __repr__(self):
+        return f"<Request(method={self.method}, url={self.url})>"
+
+
+# What a route's handler returns: a JSON payload served with a 200, a (status, payload) pair,
+# or a full Response
+RouteResult = Union[Response, tuple[int, Any], dict, list]
+RouteHandler = Callable[[Request], Union[RouteResult, Awaitable[RouteResult]]]
+
+
+class MemoryTransport(Transport):
+    """
+    Serves requests from handlers in the same process, for tests and examples.
+    Requests no route matches get a 404.
+    """
+
+    def __init__(self, *, latency: float = 0.0):
+        """
+        :param latency: Seconds every response is delayed by, e.g. to let concurrent requests
+            overlap
+        """
+        self.latency = latency
+        self.requests: list[Request] = []
+        self._routes: list[
+            tuple[str, Pattern[str], Union[RouteResult, RouteHandler]]
+        ] = []
+
+    def add_route(
+        self,
+        method: str,
+        path: Union[str, Pattern[str]],
+        handler: Union[RouteResult, RouteHandler],
+    ):
+        r"""
+        Serve the requests matching a route, routes added first take precedence
+        :param method: The HTTP method, "*" matches any
+        :param path: A regex matched against the end of the URL's path, e.g. r"/anime/(\d+)"
+        :param handler: Called with the Request, or returned as is when it is not callable
+        """
+        if isinstance(path, str):
+            path = re.compile(path)
+        self._routes.append((method.upper(), path, handler))
+
+    def _match(self, method: str, path: str):
+        for route_method, pattern, handler in self._routes:
+            if route_method not in ("*", method):
+                continue
+            for match in pattern.finditer(path):
+                if match.end() == len(path):
+                    return handler, match
+        return None, None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+        trace: Optional[Any] = None,
+    ) -> Response:
+        request = Request(method, url, dict(headers or {}), data)
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        handler, request.match = self._match(method, request.path)
+        if handler is None:
+            result = (404, {"error": "not_found", "message": ""})
+        elif callable(handler):
+            result = handler(request)
+            if inspect.isawaitable(result):
+                result = await result
+        else:
+            result = handler
+
+        if isinstance(result, Response):
+            return result
+        status, payload = result if isinstance(result, tuple) else (200, result)
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        headers = CIMultiDict({"Content-Type": "application/json; charset=utf-8"})
+        return Response(method, url, status, headers, body)
+
+    def __repr__(self):
+        return f"<MemoryTransport(routes={len(self._routes)}, requests={len(self.requests)})>"
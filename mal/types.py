@@ -30,6 +30,9 @@ ANIME_SOURCE = Literal[
     "music",
 ]
 
+FIELD_PROFILE = Literal["minimal", "list", "full"]
+PRIORITY = Literal["interactive", "normal", "background"]
+
 ANIME_RATING = Literal["g", "pg", "pg_13", "r", "r+", "rx"]
 RELATION_TYPE = Literal[
     "sequel",
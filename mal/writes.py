@@ -0,0 +1,187 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable, Hashable, Optional
+
+from mal.models import WatchStatus
+from mal.types import USER_ANIME_STATUS
+
+if TYPE_CHECKING:
+    from mal.client import TOKEN, Client
+
+WRITE_DEBOUNCE = 2.0
+WRITE_MAX_DELAY = 30.0
+WRITE_CONCURRENCY = 4
+
+
+def _retrieve_exception(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+class _PendingWrite:
+    __slots__ = ("update", "futures", "timer", "queued_at")
+
+    def __init__(self, queued_at: float):
+        self.update: dict = {}
+        self.futures: list[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.queued_at = queued_at
+
+
+class WriteQueue:
+    """
+    Write-behind queue for watch status updates.
+    Updates of the same anime for the same token are merged while pending, keeping the latest
+    episode and status, and sent once no update has arrived for `debounce` seconds (or once
+    the first one has waited for `max_delay` seconds). Updates of an anime are sent in order,
+    and every update's future resolves to the WatchStatus returned by the write that sent it.
+    The futures need not be awaited, failed writes are counted in `failed` and passed to
+    `on_error`.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        *,
+        debounce: float = WRITE_DEBOUNCE,
+        max_delay: float = WRITE_MAX_DELAY,
+        concurrency: int = WRITE_CONCURRENCY,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        """
+        :param client: The client used to send the writes
+        :param debounce: Seconds without a new update of an anime before it is sent
+        :param max_delay: The max number of seconds an update is held back for
+        :param concurrency: The max number of writes in flight at once
+        :param on_error: Called with the anime's ID and the error when a write fails
+        """
+        self._client = client
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.concurrency = max(1, concurrency)
+        self.on_error = on_error
+        self.sent = 0
+        self.merged = 0
+        self.failed = 0
+        self._pending: dict[Hashable, _PendingWrite] = {}
+        self._sending: dict[Hashable, asyncio.Task] = {}
+        # Created on first use so that it binds to the loop the queue is used from
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def update_watch_status(
+        self,
+        *,
+        anime_id: str,
+        episode: int,
+        status: USER_ANIME_STATUS = "watching",
+        start_date: str = "",
+        finish_date: str = "",
+        token: Optional["TOKEN"] = None,
+    ) -> "asyncio.Future[WatchStatus]":
+        """
+        Queue an update of the watch status of an anime in a user's watchlist
+        :param anime_id: The ID of the anime
+        :param episode: The episode that is being watched
+        :param status: The status to update the anime to
+        :param start_date: The date the user started watching the anime, kept from earlier
+        pending updates when empty
+        :param finish_date: The date the user finished watching the anime, kept from earlier
+        pending updates when empty
+        :param token: The user's access token, or a ManagedToken
+        :return: A future resolving to the WatchStatus once the update is sent
+        """
+        self._client._watch_status_body(
+            anime_id=anime_id,
+            episode=episode,
+            status=status,
+            start_date=start_date,
+            finish_date=finish_date,
+        )
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        key = (token, str(anime_id))
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingWrite(now)
+        else:
+            pending.timer.cancel()
+            self.merged += 1
+
+        pending.update.update(episode=episode, status=status)
+        if start_date:
+            pending.update["start_date"] = start_date
+        if finish_date:
+            pending.update["finish_date"] = finish_date
+
+        future = loop.create_future()
+        # Mark errors as retrieved, callers firing and forgetting learn of them via on_error
+        future.add_done_callback(_retrieve_exception)
+        pending.futures.append(future)
+        delay = min(self.debounce, max(0.0, pending.queued_at + self.max_delay - now))
+        pending.timer = loop.call_later(delay, self._flush_key, key)
+        return future
+
+    async def flush(self):
+        """Send every pending update now, and wait for every write to complete"""
+        while self._pending or self._sending:
+            for key in list(self._pending):
+                self._flush_key(key)
+            await asyncio.gather(*self._sending.values(), return_exceptions=True)
+
+    def _flush_key(self, key: Hashable):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+
+        pending.timer.cancel()
+        previous = self._sending.get(key)
+        task = self._client._spawn(self._send(key, pending, previous))
+        self._sending[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._sending.get(key) is task:
+            del self._sending[key]
+
+    async def _send(
+        self,
+        key: Hashable,
+        pending: _PendingWrite,
+        previous: Optional[asyncio.Task],
+    ):
+        token, anime_id = key
+        try:
+            if previous is not None:
+                # Keep the writes of an anime in order
+                await asyncio.wait((previous,))
+
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+            async with self._semaphore:
+                # Safe to retry, as the queue never has two writes of an anime in flight
+                watch_status = await self._client.update_watch_status(
+                    anime_id=anime_id, token=token, retry=True, **pending.update
+                )
+        except asyncio.CancelledError:
+            for future in pending.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            self.failed += 1
+            for future in pending.futures:
+                if not future.done():
+                    future.set_exception(e)
+            if self.on_error is not None:
+                self.on_error(anime_id, e)
+            return
+
+        self.sent += 1
+        for future in pending.futures:
+            if not future.done():
+                future.set_result(watch_status)
+
+    def __repr__(self):
+        return f"<WriteQueue(pending={len(self._pending)}, sending={len(self._sending)}, sent={self.sent}, merged={self.merged}, failed={self.failed})>"
@@ -0,0 +1,51 @@
+from typing import Callable
+from urllib.parse import urlencode
+
+import pytest
+
+from benchmarks.payloads import anime_payload
+from mal import MemoryTransport
+
+
+def anime_details(request) -> dict:
+    """Serve an anime holding the requested fields, like the API does"""
+    return anime_payload(int(request.match[1]), request.query["fields"].split(","))
+
+
+# The number of anime search_results finds for any query
+SEARCH_RESULTS = 250
+
+
+def search_results(request) -> dict:
+    """Serve a page of search results, linking to the next page like the API does"""
+    offset, limit = int(request.query.get("offset", 0)), int(request.query["limit"])
+    fields = request.query["fields"].split(",")
+    last = min(offset + limit, SEARCH_RESULTS)
+    paging = {}
+    if last < SEARCH_RESULTS:
+        query = urlencode({**request.query, "offset": last})
+        paging["next"] = request.url.split("?")[0] + "?" + query
+    return {
+        "data": [
+            {"node": anime_payload(i, fields)} for i in range(offset + 1, last + 1)
+        ],
+        "paging": paging,
+    }
+
+
+def memory_transport(latency: float = 0.0) -> MemoryTransport:
+    transport = MemoryTransport(latency=latency)
+    transport.add_route("GET", r"/anime/(\d+)", anime_details)
+    transport.add_route("GET", r"/anime", search_results)
+    return transport
+
+
+@pytest.fixture
+def transport() -> MemoryTransport:
+    return memory_transport()
+
+
+@pytest.fixture
+def make_transport() -> Callable[..., MemoryTransport]:
+    """Build transports serving anime details, e.g. with a latency"""
+    return memory_transport
@@ -0,0 +1,66 @@
+import asyncio
+
+from benchmarks.payloads import anime_payload
+from mal import Client, MemoryTransport, NotFoundError
+
+
+def counting_transport() -> tuple[MemoryTransport, dict]:
+    """Serve anime details slowly, tracking the most requests handled at once"""
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    async def anime_details(request):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            state["in_flight"] -= 1
+        anime_id = int(request.match[1])
+        if anime_id >= 400:
+            return 404, {"error": "not_found"}
+        return anime_payload(anime_id, request.query["fields"].split(","))
+
+    transport = MemoryTransport()
+    transport.add_route("GET", r"/anime/(\d+)", anime_details)
+    return transport, state
+
+
+def test_results_keep_the_input_order_with_errors_in_place():
+    transport, _ = counting_transport()
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            return await client.get_anime_details_many(
+                anime_ids=["3", "404", "1", "3"], fields="minimal"
+            )
+
+    results = asyncio.run(main())
+    assert results[0].id == "3"
+    assert isinstance(results[1], NotFoundError)
+    assert results[2].id == "1"
+    # Duplicates are fetched once and returned at every position
+    assert results[3] is results[0]
+    assert len(transport.requests) == 3
+
+
+def test_requests_in_flight_stay_within_concurrency():
+    transport, state = counting_transport()
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            many = await client.get_anime_details_many(
+                anime_ids=[str(i) for i in range(1, 11)], concurrency=3
+            )
+            streamed = [
+                anime_id
+                async for anime_id, _ in client.iter_anime_details_many(
+                    anime_ids=["11", "12", "11", "13"], concurrency=2
+                )
+            ]
+            return many, streamed
+
+    many, streamed = asyncio.run(main())
+    assert [anime.id for anime in many] == [str(i) for i in range(1, 11)]
+    assert sorted(streamed) == ["11", "12", "13"]
+    assert state["max_in_flight"] == 3
+    assert len(transport.requests) == 13
@@ -0,0 +1,69 @@
+import asyncio
+import sqlite3
+import time
+
+from mal import Client, MemoryCache, SQLiteCache
+
+
+def test_full_entry_serves_fewer_fields(transport):
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, cache=MemoryCache()
+        ) as client:
+            await client.get_anime_details(anime_id="1", fields="full")
+            anime = await client.get_anime_details(anime_id="1", fields=["mean"])
+            many = await client.get_anime_details_many(
+                anime_ids=["1"], fields="minimal"
+            )
+            return anime, many
+
+    anime, many = asyncio.run(main())
+    assert len(transport.requests) == 1
+    assert anime.id == "1" and many[0].id == "1"
+
+
+def test_missing_fields_are_fetched_with_the_cached_ones(transport):
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, cache=MemoryCache()
+        ) as client:
+            await client.get_anime_details(anime_id="1", fields=["mean"])
+            await client.get_anime_details(anime_id="1", fields=["rank"])
+            await client.get_anime_details(anime_id="1", fields=["mean", "rank"])
+
+    asyncio.run(main())
+    assert len(transport.requests) == 2
+    fields = transport.requests[1].query["fields"].split(",")
+    assert {"mean", "rank"} <= set(fields)
+
+
+def test_sqlite_writes_do_not_block_the_loop(transport, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, vacuum_interval=None, busy_timeout=2.0)
+    # Another process holding the write lock
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        asyncio.get_running_loop().call_later(0.3, writer.rollback)
+        async with Client(client_id="test", transport=transport, cache=cache) as client:
+            started = time.monotonic()
+            await client.get_anime_details(anime_id="1")
+            elapsed = time.monotonic() - started
+        ticker.cancel()
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(main())
+    writer.close()
+    cache.close()
+    assert elapsed >= 0.25
+    assert ticks >= 10
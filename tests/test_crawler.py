@@ -0,0 +1,20 @@
+import asyncio
+
+import pytest
+
+from mal import Client, FieldNotFetchedError, RelationCrawler
+
+
+def test_graph_anime_only_hold_the_crawled_fields(transport):
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            return await RelationCrawler(client, max_depth=1).crawl("1")
+
+    graph = asyncio.run(main())
+    assert graph.neighbours("1") == ["2", "3", "4"]
+    assert graph.depths["4"] == 1
+
+    anime = graph.anime("2")
+    assert anime.title.canonical
+    with pytest.raises(FieldNotFetchedError):
+        anime.mean
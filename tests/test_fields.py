@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from mal import Client, FieldNotFetchedError, InputError
+from mal.fields import resolve_fields
+
+
+def test_unknown_field_names_are_rejected():
+    with pytest.raises(InputError, match="meen"):
+        resolve_fields(["meen"])
+    with pytest.raises(InputError):
+        resolve_fields("everything")
+    assert resolve_fields(["mean"]) == ("id", "main_picture", "mean", "title")
+
+
+def test_alternative_titles_raise_when_not_fetched(transport):
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            minimal = await client.get_anime_details(anime_id="1", fields="minimal")
+            full = await client.get_anime_details(anime_id="1", fields="full")
+            return minimal, full
+
+    minimal, full = asyncio.run(main())
+    assert minimal.title.canonical == full.title.canonical
+    repr(minimal.title)
+    with pytest.raises(FieldNotFetchedError):
+        minimal.title.english
+    with pytest.raises(FieldNotFetchedError):
+        minimal.title.synonyms
+    assert full.title.english is not None
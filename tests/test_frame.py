@@ -0,0 +1,77 @@
+import pytest
+
+import mal.frame
+from mal import AnimeFrame
+
+
+def anime(anime_id: int, mean, media_type: str, genres: list[str]) -> dict:
+    return {
+        "id": anime_id,
+        "title": f"Anime {anime_id}",
+        "mean": mean,
+        "media_type": media_type,
+        "genres": [{"id": i, "name": name} for i, name in enumerate(genres)],
+    }
+
+
+@pytest.fixture(params=["numpy", "array"])
+def frame(request, monkeypatch) -> AnimeFrame:
+    """The same anime on NumPy arrays and on array buffers"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(mal.frame, "np", None)
+    return AnimeFrame(
+        [
+            anime(1, 8.5, "tv", ["Action", "Comedy"]),
+            anime(2, None, "movie", ["Drama"]),
+            anime(3, 7.0, "tv", ["Action"]),
+            anime(4, 8.5, "ova", []),
+            anime(5, 9.1, "tv", ["Comedy"]),
+        ]
+    )
+
+
+def ids(frame: AnimeFrame) -> list[int]:
+    return [int(anime_id) for anime_id in frame.ids]
+
+
+def test_filter_ranges(frame):
+    assert ids(frame.filter(mean=(8, None))) == [1, 4, 5]
+    assert ids(frame.filter(mean=(None, 8))) == [3]
+    assert ids(frame.filter(mean=8.5)) == [1, 4]
+    assert ids(frame.filter(mean=(None, None))) == [1, 3, 4, 5]
+
+
+def test_filter_categories_and_genres(frame):
+    assert ids(frame.filter(media_type="tv")) == [1, 3, 5]
+    assert ids(frame.filter(media_type=["movie", "ova", "music"])) == [2, 4]
+    assert ids(frame.filter(genres="Action")) == [1, 3]
+    assert ids(frame.filter(genres=["Drama", "Comedy"])) == [1, 2, 5]
+    assert ids(frame.filter(media_type="tv").filter(genres="Comedy")) == [1, 5]
+    assert ids(frame.filter([True, False, True, False, True], mean=(8, None))) == [1, 5]
+
+
+def test_sort_places_missing_values_last(frame):
+    assert ids(frame.sort("mean")) == [3, 1, 4, 5, 2]
+    assert ids(frame.sort("mean", descending=True)) == [5, 1, 4, 3, 2]
+
+
+def test_top_k_breaks_ties_by_position(frame):
+    assert ids(frame.top_k("mean", 2)) == [5, 1]
+    assert ids(frame.top_k("mean", 3, descending=False)) == [3, 1, 4]
+    assert ids(frame.top_k("mean", 10)) == [5, 1, 4, 3]
+    assert ids(frame.top_k([1, 3, 3, 2, 0], 2)) == [2, 3]
+    assert ids(frame.top_k("mean", 0)) == []
+
+
+def test_group_counts(frame):
+    assert list(frame.group_counts("media_type").items()) == [
+        ("tv", 3),
+        ("movie", 1),
+        ("ova", 1),
+    ]
+    assert list(frame.filter(media_type="tv").group_counts("genres").items()) == [
+        ("Action", 2),
+        ("Comedy", 2),
+    ]
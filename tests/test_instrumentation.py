@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from mal import CallbackSink, Client, HistogramSink, Instrumentation, NotFoundError
+
+
+def test_requests_and_builds_are_recorded_per_endpoint(transport):
+    histograms = HistogramSink()
+    requests, builds = [], []
+    sinks = [
+        histograms,
+        CallbackSink(requests.append, lambda *args: builds.append(args)),
+    ]
+
+    async def main():
+        async with Client(
+            client_id="test",
+            transport=transport,
+            instrumentation=Instrumentation(sinks),
+        ) as client:
+            await client.get_anime_details(anime_id="1")
+            await client.get_anime_details(anime_id="2", fields="minimal")
+            with pytest.raises(NotFoundError):
+                await client.get_user_details(token="token")
+
+    asyncio.run(main())
+    snapshot = histograms.snapshot()
+
+    details = snapshot["get_anime_details"]
+    assert (details["requests"], details["errors"]) == (2, 0)
+    assert details["statuses"] == {200: 2}
+    assert details["bytes_received"] == sum(
+        metrics.bytes_received
+        for metrics in requests
+        if metrics.endpoint == "get_anime_details"
+    )
+    assert details["bytes_received"] > 0
+    # MemoryTransport has no connection to trace
+    assert sorted(details["timings"]) == ["build", "decode", "total"]
+    assert details["timings"]["decode"]["count"] == 2
+    assert details["timings"]["build"]["count"] == 2
+    assert [endpoint for endpoint, _ in builds] == ["get_anime_details"] * 2
+
+    user = snapshot["get_user_details"]
+    assert (user["requests"], user["errors"]) == (1, 1)
+    assert user["statuses"] == {404: 1}
+    assert "build" not in user["timings"]
+    assert isinstance(requests[-1].error, NotFoundError)
+
+    histograms.reset()
+    assert histograms.snapshot() == {}
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from mal import (
+    Client,
+    FieldNotFetchedError,
+    ListSyncer,
+    MemoryTransport,
+    SQLiteSnapshotStore,
+)
+
+
+def list_entry(anime_id: int, episodes: int, updated_at: str) -> dict:
+    return {
+        "id": anime_id,
+        "title": f"Anime {anime_id}",
+        "main_picture": {},
+        "my_list_status": {
+            "status": "watching",
+            "num_episodes_watched": episodes,
+            "updated_at": updated_at,
+        },
+    }
+
+
+def user_list_endpoint(transport: MemoryTransport, entries: list) -> None:
+    def animelist(request):
+        return {"data": [{"node": entry} for entry in entries], "paging": {}}
+
+    transport.add_route("GET", r"/users/@me/animelist", animelist)
+
+
+def test_sync_reports_changes_and_persists_snapshots(tmp_path):
+    transport = MemoryTransport()
+    entries = [
+        list_entry(2, 3, "2024-01-02T00:00:00+00:00"),
+        list_entry(1, 1, "2024-01-01T00:00:00+00:00"),
+    ]
+    user_list_endpoint(transport, entries)
+    store = SQLiteSnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            syncer = ListSyncer(client, store=store)
+            first = await syncer.sync("user", token="t")
+            entries[0] = list_entry(2, 4, "2024-01-03T00:00:00+00:00")
+            second = await syncer.sync("user", token="t")
+            del entries[1]
+            third = await syncer.sync("user", token="t", full=True)
+            return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert sorted((change.kind, change.anime_id) for change in first) == [
+        ("added", "1"),
+        ("added", "2"),
+    ]
+    assert [(change.kind, change.anime_id) for change in second] == [("changed", "2")]
+    assert [(change.kind, change.anime_id) for change in third] == [("removed", "1")]
+    assert third[0].anime.title.canonical == "Anime 1"
+    with pytest.raises(FieldNotFetchedError):
+        third[0].anime.mean
+    assert list(store.get("user").entries) == ["2"]
+    store.close()
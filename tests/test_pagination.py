@@ -0,0 +1,62 @@
+import asyncio
+
+from mal import Client
+
+
+def test_iteration_follows_next_links_past_the_offset_limit(transport):
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            return [
+                anime.id
+                async for anime in client.iter_search_anime(
+                    query="bebop", page_size=100, fields="minimal"
+                )
+            ]
+
+    ids = asyncio.run(main())
+    # The last page starts at offset 200, past the 100 the offset parameter is capped at
+    assert ids == [str(i) for i in range(1, 251)]
+    assert [request.query["offset"] for request in transport.requests] == [
+        "0",
+        "100",
+        "200",
+    ]
+
+
+def test_breaking_out_cancels_the_prefetched_page(make_transport):
+    transport = make_transport(latency=0.1)
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            pages = client.iter_search_anime(
+                query="bebop", page_size=10, fields="minimal"
+            )
+            async for anime in pages:
+                # Let the prefetch of the next page reach the transport
+                await asyncio.sleep(0.01)
+                break
+            await pages.aclose()
+            await asyncio.sleep(0.01)
+            return anime, asyncio.all_tasks() - {asyncio.current_task()}
+
+    anime, pending = asyncio.run(main())
+    assert anime.id == "1"
+    assert pending == set()
+    # The second page was requested, then cancelled before its response arrived
+    assert len(transport.requests) == 2
+
+
+def test_prefetch_can_be_disabled(make_transport):
+    transport = make_transport()
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            pages = client.iter_search_anime(
+                query="bebop", page_size=10, fields="minimal", prefetch=False
+            )
+            async for anime in pages:
+                break
+            await pages.aclose()
+
+    asyncio.run(main())
+    assert len(transport.requests) == 1
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import time
+
+import pytest
+
+from mal import Client, MemoryTransport, RateLimiter, TokenBucket, TooManyRequestsError
+from mal.ratelimit import parse_retry_after
+from mal.transport import Response
+
+
+def elapsed(coro_factory) -> float:
+    async def main():
+        started = time.monotonic()
+        await coro_factory()
+        return time.monotonic() - started
+
+    return asyncio.run(main())
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate():
+    bucket = TokenBucket(rate=20, burst=3)
+
+    async def burst():
+        for _ in range(3):
+            await bucket.acquire()
+
+    assert elapsed(burst) < 0.02
+    # Empty, so the next token takes 1/20s to refill
+    assert 0.03 < elapsed(bucket.acquire) < 0.2
+
+
+def test_throttled_bucket_waits_and_halves_its_rate():
+    bucket = TokenBucket(rate=20, burst=3)
+    bucket.throttle(0.1)
+    assert bucket.rate == 10
+    assert 0.08 < elapsed(bucket.acquire) < 0.3
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("3", 3.0), ("0.5", 0.5), ("-1", 0.0), (None, None), ("", None), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_tokens_have_their_own_buckets():
+    limiter = RateLimiter(rate=5, burst=1, token_rate=2, token_burst=1)
+    assert limiter.bucket("alice") is limiter.bucket("alice")
+    assert limiter.bucket("alice") is not limiter.bucket("bobby")
+    assert limiter.bucket(None) is limiter.app
+
+    limiter.throttle("alice", 10)
+
+    async def others():
+        await limiter.acquire("bobby")
+        await limiter.acquire()
+
+    assert elapsed(others) < 0.02
+    assert limiter.bucket("alice").rate == 1
+    assert limiter.bucket("bobby").rate == 2
+
+
+def test_429_throttles_the_bucket_of_its_token():
+    transport = MemoryTransport()
+    transport.add_route(
+        "GET",
+        "/users/@me",
+        lambda request: Response(
+            request.method, request.url, 429, {"Retry-After": "7"}, b"{}"
+        ),
+    )
+    limiter = RateLimiter(rate=5, burst=1, token_rate=2, token_burst=1)
+
+    async def main():
+        async with Client(
+            client_id="test",
+            transport=transport,
+            rate_limiter=limiter,
+            retry_policy=None,
+        ) as client:
+            with pytest.raises(TooManyRequestsError) as error:
+                await client.get_user_details(token="alice")
+        return error.value
+
+    assert asyncio.run(main()).retry_after == 7
+    assert limiter.bucket("alice").rate == 1
+    assert limiter.bucket("bobby").rate == 2
+    assert limiter.app.rate == 5
+
+
+def test_throttle_waits_a_default_without_retry_after():
+    limiter = RateLimiter()
+    limiter.throttle("alice")
+
+    async def main():
+        # RETRY_AFTER_DEFAULT is several seconds
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire("alice"), 0.1)
+
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from mal import (
+    Client,
+    Exchange,
+    MemoryTransport,
+    RecordingTransport,
+    ReplayError,
+    ReplayTransport,
+    load_exchanges,
+)
+
+URL = "https://api.myanimelist.net/v1/users/@me"
+
+
+def exchange(body: str = "{}", *, error=None, headers=None) -> Exchange:
+    return Exchange(
+        offset=0.0,
+        method="GET",
+        url=URL,
+        headers=headers or {},
+        data=None,
+        status=None if error else 200,
+        response_headers={},
+        body=body.encode(),
+        latency=0.0,
+        error=error,
+    )
+
+
+def test_matches_are_served_in_order_then_the_last_again():
+    replay = ReplayTransport([exchange("1"), exchange("2")], speed=None)
+
+    async def main():
+        return [(await replay.request("GET", URL)).body for _ in range(3)]
+
+    assert asyncio.run(main()) == [b"1", b"2", b"2"]
+    assert replay.replayed == 3
+
+
+def test_strict_replay_raises_once_used_up():
+    replay = ReplayTransport([exchange("1")], speed=None, strict=True)
+
+    async def main():
+        await replay.request("GET", URL)
+        with pytest.raises(ReplayError):
+            await replay.request("GET", URL)
+        with pytest.raises(ReplayError):
+            await replay.request("GET", URL + "/animelist")
+
+    asyncio.run(main())
+    assert replay.misses == 2
+
+
+def test_recorded_failures_are_raised_again():
+    replay = ReplayTransport(
+        [exchange(error="timeout"), exchange(error="connection")], speed=None
+    )
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await replay.request("GET", URL)
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await replay.request("GET", URL)
+
+    asyncio.run(main())
+
+
+def test_each_user_is_replayed_their_own_responses(tmp_path):
+    path = str(tmp_path / "recording.jsonl")
+    transport = MemoryTransport()
+    transport.add_route(
+        "GET",
+        "/users/@me",
+        lambda request: {"id": 1, "name": request.headers["Authorization"][-5:]},
+    )
+
+    async def main():
+        recording = RecordingTransport(transport, path)
+        async with Client(client_id="test", transport=recording) as client:
+            for token in ("alice", "bobby"):
+                await client.get_user_details(token=token)
+            # Each exchange is flushed as it completes
+            exchanges = load_exchanges(path)
+
+        replay = ReplayTransport(path, speed=None, strict=True)
+        async with Client(client_id="test", transport=replay) as client:
+            users = [
+                await client.get_user_details(token=token)
+                for token in ("bobby", "alice")
+            ]
+            with pytest.raises(ReplayError):
+                await client.get_user_details(token="alice")
+
+        # The recorded digest stands in for the token it replaced
+        replay = ReplayTransport(path, speed=None)
+        async with Client(client_id="test", transport=replay) as client:
+            digest = exchanges[0].headers["Authorization"]
+            users.append(await client.get_user_details(token=digest))
+        return exchanges, users
+
+    exchanges, users = asyncio.run(main())
+    assert len(exchanges) == 2
+    assert all("alice" not in e.headers["Authorization"] for e in exchanges)
+    assert [user.name for user in users] == ["bobby", "alice", "alice"]
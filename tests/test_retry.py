@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from mal import Client, FairScheduler, MemoryTransport, RetryPolicy
+
+
+def test_deadline_cancels_a_hung_attempt():
+    transport = MemoryTransport(latency=5)
+    policy = RetryPolicy(attempts=3, deadline=0.2)
+
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, retry_policy=policy
+        ) as client:
+            started = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_anime_details(anime_id="1")
+            return time.monotonic() - started
+
+    assert asyncio.run(main()) < 1
+    assert len(transport.requests) == 1
+
+
+def test_deadline_ignores_time_queued_for_a_slot(make_transport):
+    transport = make_transport(latency=0.3)
+    policy = RetryPolicy(deadline=0.5)
+    scheduler = FairScheduler(max_concurrency=1)
+
+    async def main():
+        async with Client(
+            client_id="test",
+            transport=transport,
+            retry_policy=policy,
+            scheduler=scheduler,
+        ) as client:
+            return await asyncio.gather(
+                *(client.get_anime_details(anime_id=str(i)) for i in range(1, 4))
+            )
+
+    assert [anime.id for anime in asyncio.run(main())] == ["1", "2", "3"]
+    assert len(transport.requests) == 3
+
+
+def test_transient_failures_are_retried():
+    transport = MemoryTransport()
+    responses = iter([(503, {}), (503, {}), {"id": 1, "title": "Cowboy Bebop"}])
+    transport.add_route("GET", r"/anime/\d+", lambda request: next(responses))
+    policy = RetryPolicy(attempts=3, base_delay=0.01)
+
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, retry_policy=policy
+        ) as client:
+            return await client.get_anime_details(anime_id="1")
+
+    assert asyncio.run(main()).title.canonical == "Cowboy Bebop"
+    assert len(transport.requests) == 3
+
+
+def test_clients_do_not_share_the_default_policy():
+    first, second = Client(client_id="test"), Client(client_id="test")
+    assert isinstance(first.retry_policy, RetryPolicy)
+    assert first.retry_policy is not second.retry_policy
+    assert Client(client_id="test", retry_policy=None).retry_policy is None
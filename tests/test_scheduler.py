@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from mal import Client, FairScheduler, RequestShedError
+
+
+def test_background_requests_are_shed_under_pressure(make_transport):
+    transport = make_transport(latency=0.2)
+    scheduler = FairScheduler(max_concurrency=1, shed_after=0.05)
+    scheduler.throttled()
+
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, scheduler=scheduler
+        ) as client:
+            interactive = asyncio.ensure_future(
+                client.get_anime_details(anime_id="1", priority="interactive")
+            )
+            await asyncio.sleep(0)
+            with pytest.raises(RequestShedError):
+                await client.get_anime_details(anime_id="2", priority="background")
+            return await interactive
+
+    anime = asyncio.run(main())
+    assert anime.id == "1"
+    assert scheduler.stats.shed == 1
+    assert [request.path for request in transport.requests] == ["/v1/anime/1"]
+
+
+def test_background_requests_wait_without_pressure(make_transport):
+    transport = make_transport(latency=0.1)
+    scheduler = FairScheduler(max_concurrency=1, shed_after=0.02)
+
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, scheduler=scheduler
+        ) as client:
+            return await asyncio.gather(
+                client.get_anime_details(anime_id="1", priority="interactive"),
+                client.get_anime_details(anime_id="2", priority="background"),
+            )
+
+    results = asyncio.run(main())
+    assert [anime.id for anime in results] == ["1", "2"]
+    assert scheduler.stats.shed == 0
@@ -0,0 +1,69 @@
+import asyncio
+
+from mal import Client
+from mal.singleflight import SingleFlight
+
+
+def test_concurrent_gets_share_one_request(make_transport):
+    transport = make_transport(latency=0.05)
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            return await asyncio.gather(
+                *(client.get_anime_details(anime_id="1") for _ in range(5))
+            )
+
+    results = asyncio.run(main())
+    assert [anime.id for anime in results] == ["1"] * 5
+    assert len(transport.requests) == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_others(make_transport):
+    transport = make_transport(latency=0.05)
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            first = asyncio.ensure_future(client.get_anime_details(anime_id="1"))
+            second = asyncio.ensure_future(client.get_anime_details(anime_id="1"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return first, await second
+
+    first, anime = asyncio.run(main())
+    assert first.cancelled()
+    assert anime.id == "1"
+    assert len(transport.requests) == 1
+
+
+def test_coalescing_can_be_disabled(make_transport):
+    transport = make_transport(latency=0.05)
+
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, coalesce_requests=False
+        ) as client:
+            await asyncio.gather(
+                *(client.get_anime_details(anime_id="1") for _ in range(3))
+            )
+
+    asyncio.run(main())
+    assert len(transport.requests) == 3
+
+
+def test_caller_after_the_last_waiter_left_starts_a_new_call():
+    flight = SingleFlight()
+    started = []
+
+    async def call():
+        started.append(None)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        return await flight.do("key", call)
+
+    assert asyncio.run(main()) == 2
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pytest
+
+from mal import SyncClient
+
+
+async def pending() -> set:
+    # Let cancellations reach the tasks they were passed on to
+    await asyncio.sleep(0.01)
+    return asyncio.all_tasks() - {asyncio.current_task()}
+
+
+def test_threads_share_the_loop_and_its_requests(make_transport):
+    transport = make_transport(latency=0.2)
+    with SyncClient(client_id="test", transport=transport) as sync:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(
+                pool.map(lambda _: sync.get_anime_details(anime_id="1"), range(8))
+            )
+
+    assert [anime.id for anime in results] == ["1"] * 8
+    # Concurrent calls from every thread were coalesced on the one loop
+    assert len(transport.requests) == 1
+
+
+def test_closing_an_iterator_early_cancels_its_prefetch(make_transport):
+    transport = make_transport(latency=0.1)
+    with SyncClient(client_id="test", transport=transport) as sync:
+        results = sync.iter_search_anime(query="bebop", page_size=10, fields="minimal")
+        assert next(results).id == "1"
+        results.close()
+
+        assert sync.run(pending()) == set()
+    # The first page, and the prefetch of the second
+    assert len(transport.requests) == 2
+
+
+def test_timeout_cancels_the_call_on_the_loop(make_transport):
+    transport = make_transport(latency=0.3)
+    with SyncClient(client_id="test", transport=transport, timeout=0.05) as sync:
+        with pytest.raises(TimeoutError):
+            sync.get_anime_details(anime_id="1")
+
+        assert sync.run(pending()) == set()
+
+
+def test_a_closed_client_starts_again_on_next_use(transport):
+    sync = SyncClient(client_id="test", transport=transport)
+    assert sync.get_anime_details(anime_id="1").id == "1"
+    sync.close()
+    assert repr(sync) == "<SyncClient(running=False)>"
+
+    assert sync.get_anime_details(anime_id="2").id == "2"
+    assert repr(sync) == "<SyncClient(running=True)>"
+    sync.close()
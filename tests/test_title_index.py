@@ -0,0 +1,28 @@
+import pytest
+
+from benchmarks.payloads import anime_payload
+from mal import InputError, TitleIndex, to_record
+from mal.title_index import INDEX_FIELDS
+
+
+def payload(anime_id: int, title: str) -> dict:
+    return {**anime_payload(anime_id, INDEX_FIELDS), "title": title}
+
+
+def test_add_accepts_a_single_record():
+    index = TitleIndex()
+    index.add(to_record(payload(1, "Cowboy Bebop"), INDEX_FIELDS))
+    index.add(payload(2, "Trigun"))
+    assert len(index) == 2
+    assert [anime["id"] for anime in index.search("cowboy", raw=True)] == [1]
+
+
+def test_prefix_and_fuzzy_matches():
+    index = TitleIndex([payload(1, "Cowboy Bebop"), payload(2, "Bebop Tales")])
+    assert {anime["id"] for anime in index.search("bebop", raw=True)} == {1, 2}
+    assert [anime["id"] for anime in index.search("cowbay bebop", raw=True)] == [1]
+
+
+def test_unknown_rank_is_rejected():
+    with pytest.raises(InputError):
+        TitleIndex().search("bebop", rank_by="score")
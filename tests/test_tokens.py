@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+from mal import Auth, Client, MemoryTransport
+
+
+def expired_auth() -> Auth:
+    return Auth(
+        {
+            "token_type": "Bearer",
+            "access_token": "old",
+            "refresh_token": "old-refresh",
+            "expires_at": time.time() - 1,
+        }
+    )
+
+
+def rotating_token_endpoint(transport: MemoryTransport) -> asyncio.Event:
+    """Answer refreshes with a rotated token pair once the returned event is set"""
+    release = asyncio.Event()
+
+    async def token(request):
+        await release.wait()
+        return {
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "access_token": "new",
+            "refresh_token": "new-refresh",
+        }
+
+    transport.add_route("POST", r"/oauth2/token", token)
+    return release
+
+
+def oauth_client(transport: MemoryTransport) -> Client:
+    return Client(
+        client_id="id",
+        client_secret="secret",
+        callback_url="http://localhost/callback",
+        transport=transport,
+    )
+
+
+async def wait_for_request(transport: MemoryTransport):
+    while not transport.requests:
+        await asyncio.sleep(0)
+
+
+def test_cancelled_waiter_does_not_drop_rotated_token():
+    transport = MemoryTransport()
+
+    async def main():
+        release = rotating_token_endpoint(transport)
+        client = oauth_client(transport)
+        token = client.tokens.add("user", expired_auth())
+
+        waiter = asyncio.ensure_future(token.access_token())
+        await wait_for_request(transport)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        release.set()
+        await client.close()
+        return client.tokens.store.get("user")
+
+    auth = asyncio.run(main())
+    assert len(transport.requests) == 1
+    assert auth.access_token == "new"
+    assert auth.refresh_token == "new-refresh"
+
+
+def test_concurrent_refreshes_are_coalesced():
+    transport = MemoryTransport()
+
+    async def main():
+        release = rotating_token_endpoint(transport)
+        async with oauth_client(transport) as client:
+            token = client.tokens.add("user", expired_auth())
+            waiters = [asyncio.ensure_future(token.access_token()) for _ in range(5)]
+            await wait_for_request(transport)
+            release.set()
+            return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ["new"] * 5
+    assert len(transport.requests) == 1
@@ -0,0 +1,108 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from mal import (
+    Client,
+    HTTP2Transport,
+    HTTPError,
+    MemoryTransport,
+    NotFoundError,
+    RequestMetrics,
+)
+
+URL = "https://api.myanimelist.net/v1/users/@me"
+
+
+def test_unmatched_routes_get_a_404(transport):
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            with pytest.raises(NotFoundError) as error:
+                await client.get_user_details(token="token")
+        return error.value
+
+    error = asyncio.run(main())
+    assert isinstance(error, HTTPError)
+    assert [request.path for request in transport.requests] == ["/v1/users/@me"]
+
+    # HTTPError.response keeps the parts of aiohttp.ClientResponse callers read
+    response = error.response
+    assert (response.status, response.reason) == (404, "Not Found")
+    assert response.content_type == "application/json"
+    assert asyncio.run(response.json()) == {"error": "not_found", "message": ""}
+    assert asyncio.run(response.text()) == asyncio.run(response.read()).decode()
+
+
+def test_handlers_may_return_a_status():
+    transport = MemoryTransport()
+    transport.add_route("GET", "/users/@me", (403, {"error": "forbidden"}))
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            await client.get_user_details(token="token")
+
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(main())
+    assert error.value.code == 403
+
+
+def http2_transport(handler) -> HTTP2Transport:
+    httpx = pytest.importorskip("httpx")
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return HTTP2Transport(http_client=http_client)
+
+
+def test_http2_transport_reads_responses():
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):
+        assert request.headers["Authorization"] == "Bearer token"
+        return httpx.Response(
+            200, json={"id": 1, "name": "Spike"}, headers={"Retry-After": "3"}
+        )
+
+    transport = http2_transport(handler)
+
+    async def main():
+        metrics = RequestMetrics("get_user_details", "GET", URL)
+        resp = await transport.request(
+            "GET", URL, headers={"Authorization": "Bearer token"}, trace=metrics
+        )
+        await transport.close()
+        return resp, metrics
+
+    resp, metrics = asyncio.run(main())
+    assert resp.status == 200
+    assert resp.headers["retry-after"] == "3"
+    assert asyncio.run(resp.json()) == {"id": 1, "name": "Spike"}
+    assert metrics.first_byte is not None
+    # Clients passed in are left open for their owner
+    assert not transport._http_client.is_closed
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        ("ReadTimeout", asyncio.TimeoutError),
+        ("ConnectTimeout", asyncio.TimeoutError),
+        ("ConnectError", aiohttp.ClientConnectionError),
+        ("RemoteProtocolError", aiohttp.ClientConnectionError),
+    ],
+)
+def test_http2_transport_raises_aiohttp_errors(error, expected):
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):
+        raise getattr(httpx, error)("failed", request=request)
+
+    transport = http2_transport(handler)
+
+    async def main():
+        async with Client(
+            client_id="test", transport=transport, retry_policy=None
+        ) as client:
+            await client.get_user_details(token="token")
+
+    with pytest.raises(expected):
+        asyncio.run(main())
@@ -0,0 +1,81 @@
+import asyncio
+import gc
+
+from mal import Client, MemoryTransport
+
+
+def watch_status_endpoint(transport: MemoryTransport, sent: list, delays: dict):
+    async def put(request):
+        episode = int(request.data["num_watched_episodes"])
+        await asyncio.sleep(delays.get(episode, 0))
+        sent.append(episode)
+        return {"status": request.data["status"], "num_episodes_watched": episode}
+
+    transport.add_route("PUT", r"/anime/\d+/my_list_status", put)
+
+
+def test_writes_of_an_anime_are_sent_in_order():
+    transport = MemoryTransport()
+    sent = []
+    # The first write is the slowest, the second must still wait for it
+    watch_status_endpoint(transport, sent, {1: 0.05})
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            first = client.writes.update_watch_status(
+                anime_id="1", episode=1, token="t"
+            )
+            client.writes._flush_key(("t", "1"))
+            second = client.writes.update_watch_status(
+                anime_id="1", episode=2, token="t"
+            )
+            await client.writes.flush()
+            return await first, await second
+
+    first, second = asyncio.run(main())
+    assert sent == [1, 2]
+    assert second.num_episodes_watched == 2
+
+
+def test_pending_updates_are_merged():
+    transport = MemoryTransport()
+    sent = []
+    watch_status_endpoint(transport, sent, {})
+
+    async def main():
+        async with Client(client_id="test", transport=transport) as client:
+            futures = [
+                client.writes.update_watch_status(
+                    anime_id="1", episode=episode, token="t"
+                )
+                for episode in range(1, 6)
+            ]
+        return [future.result().num_episodes_watched for future in futures]
+
+    assert asyncio.run(main()) == [5] * 5
+    assert sent == [5]
+
+
+def test_failed_writes_are_reported_not_leaked():
+    transport = MemoryTransport()
+    transport.add_route("PUT", r"/anime/\d+/my_list_status", (400, {"error": "bad"}))
+    errors, unhandled = [], []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: unhandled.append(context)
+        )
+        client = Client(
+            client_id="test",
+            transport=transport,
+            on_write_error=lambda anime_id, e: errors.append((anime_id, e)),
+        )
+        # Fired and forgotten
+        client.writes.update_watch_status(anime_id="1", episode=1, token="t")
+        await client.close()
+        gc.collect()
+        return client.writes.failed
+
+    assert asyncio.run(main()) == 1
+    assert [anime_id for anime_id, _ in errors] == ["1"]
+    assert unhandled == []